@@ -10,11 +10,13 @@ from datetime import datetime
 import json
 from pathlib import Path
 import logging
+import os
 
 # Import our analytics system
 import sys
 sys.path.append(str(Path(__file__).parent))
 from website_analytics import WebsiteAnalytics
+from ingest_queue import IngestQueue, MAX_BATCH_EVENTS, apply_client_offsets
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,96 +27,77 @@ app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
 
 # Initialize analytics system
-analytics = WebsiteAnalytics()
+analytics = WebsiteAnalytics(os.environ.get('ANALYTICS_DB_PATH', 'analytics/website_analytics.db'))
+
+# Background writer: events are batched into one transaction every 50ms or 500 events
+ingest_queue = IngestQueue(analytics, max_batch=500, flush_interval_ms=50).start()
 
 @app.route('/api/analytics', methods=['POST'])
 def track_analytics():
-    """Receive and process analytics data"""
+    """Receive analytics data and queue it for the background writer"""
     try:
-        data = request.get_json()
+        data = request.get_json(force=True, silent=True)
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({'error': 'No data provided'}), 400
         
         event_type = data.get('event_type')
         
-        # Route to appropriate tracking method
-        if event_type == 'page_view':
-            result = handle_page_view(data)
-        elif event_type == 'session_start':
-            result = handle_session_start(data)
-        elif event_type == 'page_exit':
-            result = handle_page_exit(data)
-        elif event_type == 'custom_event':
-            result = handle_custom_event(data)
-        elif event_type == 'conversion':
-            result = handle_conversion(data)
-        else:
+        if event_type not in WebsiteAnalytics.INGEST_EVENT_TYPES:
             logger.warning(f"Unknown event type: {event_type}")
             return jsonify({'error': f'Unknown event type: {event_type}'}), 400
         
-        logger.info(f"Tracked {event_type} for session {data.get('session_id')}")
-        return jsonify({'success': True, 'result': result})
+        # Written in the next batch at the server receive time; respond without waiting on SQLite
+        data.pop('received_at', None)
+        if not ingest_queue.enqueue(data):
+            logger.warning("Ingest queue full, rejecting event")
+            return jsonify({'error': 'Analytics ingest queue is full, retry later'}), 503
+        
+        return jsonify({'success': True, 'queued': True}), 202
         
     except Exception as e:
         logger.error(f"Error processing analytics data: {e}")
         return jsonify({'error': str(e)}), 500
 
-def handle_page_view(data):
-    """Handle page view tracking"""
-    return analytics.track_page_view(
-        session_id=data.get('session_id'),
-        user_id=data.get('user_id'),
-        page_url=data.get('page_url'),
-        page_title=data.get('page_title'),
-        referrer=data.get('referrer'),
-        user_agent=data.get('user_agent'),
-        device_type=data.get('device_type'),
-        traffic_source=data.get('traffic_source')
-    )
-
-def handle_session_start(data):
-    """Handle session start tracking"""
-    return analytics.track_session(
-        session_id=data.get('session_id'),
-        user_id=data.get('user_id'),
-        is_new_user=data.get('is_new_user', False),
-        device_type=data.get('device_type'),
-        traffic_source=data.get('traffic_source'),
-        landing_page=data.get('landing_page'),
-        user_agent=data.get('user_agent')
-    )
-
-def handle_page_exit(data):
-    """Handle page exit tracking"""
-    # Update the last page view with time on page
-    analytics.update_page_time(
-        session_id=data.get('session_id'),
-        page_url=data.get('page_url'),
-        time_on_page=data.get('time_on_page', 0)
-    )
-    return {'tracked': True}
-
-def handle_custom_event(data):
-    """Handle custom event tracking"""
-    return analytics.track_custom_event(
-        session_id=data.get('session_id'),
-        user_id=data.get('user_id'),
-        event_name=data.get('event_name'),
-        properties=data.get('properties', {}),
-        page_url=data.get('page_url')
-    )
-
-def handle_conversion(data):
-    """Handle conversion tracking"""
-    return analytics.track_conversion(
-        session_id=data.get('session_id'),
-        user_id=data.get('user_id'),
-        event_type=data.get('conversion_type'),
-        value=data.get('value', 0),
-        currency=data.get('currency', 'USD'),
-        page_url=data.get('page_url')
-    )
+@app.route('/api/analytics/batch', methods=['POST'])
+def track_analytics_batch():
+    """Receive a batch of analytics events (tracking script beacon payload)"""
+    try:
+        # sendBeacon posts text/plain, so parse the body regardless of content type
+        data = request.get_json(force=True, silent=True)
+        
+        if isinstance(data, list):
+            events, sent_at = data, None
+        elif isinstance(data, dict):
+            events, sent_at = data.get('events'), data.get('sent_at')
+        else:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        if not isinstance(events, list) or not events:
+            return jsonify({'error': 'Expected a non-empty events array'}), 400
+        if len(events) > MAX_BATCH_EVENTS:
+            return jsonify({'error': f'Batch exceeds {MAX_BATCH_EVENTS} events'}), 413
+        
+        valid_events = [
+            event for event in events
+            if isinstance(event, dict) and event.get('event_type') in WebsiteAnalytics.INGEST_EVENT_TYPES
+        ]
+        apply_client_offsets(valid_events, sent_at)
+        
+        # The whole batch is written in one transaction by the background writer
+        if valid_events and not ingest_queue.enqueue_batch(valid_events):
+            logger.warning("Ingest queue full, rejecting batch")
+            return jsonify({'error': 'Analytics ingest queue is full, retry later'}), 503
+        
+        return jsonify({
+            'success': True,
+            'queued': len(valid_events),
+            'rejected': len(events) - len(valid_events)
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Error processing analytics batch: {e}")
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analytics/dashboard', methods=['GET'])
 def get_dashboard_data():
@@ -122,7 +105,7 @@ def get_dashboard_data():
     try:
         days = request.args.get('days', 30, type=int)
         
-        # Get summary data
+        # Cached until new events land (or 60s), so concurrent viewers share one scan
         summary = analytics.get_summary_report(days)
         
         return jsonify(summary)
@@ -171,6 +154,8 @@ def health_check():
             'status': 'healthy',
             'database': 'connected',
             'page_views_tracked': page_views_count,
+            'ingest_queue': ingest_queue.get_stats(),
+            'report_cache': analytics.report_cache.get_stats(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -190,6 +175,7 @@ def index():
         'version': '1.0.0',
         'endpoints': {
             'POST /api/analytics': 'Track analytics events',
+            'POST /api/analytics/batch': 'Track a batch of analytics events',
             'GET /api/analytics/dashboard': 'Get dashboard data',
             'GET /api/analytics/reports/<type>': 'Get specific reports',
             'GET /api/analytics/health': 'Health check'
@@ -216,4 +202,4 @@ if __name__ == '__main__':
     # Initialize database if it doesn't exist
     analytics.init_database()
     
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    app.run(host='0.0.0.0', port=5001, debug=os.environ.get('FLASK_ENV') != 'production')
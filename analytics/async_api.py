@@ -0,0 +1,296 @@
+"""
+Async Analytics Ingestion Service (ASGI)
+Dependency-free ASGI app for the tracking endpoints. Requests are answered on the
+event loop without touching SQLite; a single writer task drains an asyncio queue
+and writes each batch in one transaction on a dedicated thread.
+
+Run next to (or instead of) the Flask API for ingestion:
+    pip install uvicorn
+    python async_api.py --port 5002
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+from ingest_queue import BatchedWriter, MAX_BATCH_EVENTS, apply_client_offsets
+
+# Try to import uvicorn to serve the app, any ASGI server works
+try:
+    import uvicorn
+    UVICORN_AVAILABLE = True
+except ImportError:
+    UVICORN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted (a full batch of events is well under this)
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class AsyncIngestQueue(BatchedWriter):
+    """asyncio counterpart of IngestQueue: one writer task, batches every N ms or M events"""
+
+    def __init__(
+        self,
+        analytics: WebsiteAnalytics,
+        max_batch: int = 500,
+        flush_interval_ms: int = 50,
+        max_queue: int = 100000,
+        sessionize_interval: float = 5.0
+    ):
+        """
+        Args:
+            analytics: WebsiteAnalytics instance whose ingest_events() writes a batch
+            max_batch: Flush as soon as this many events are buffered
+            flush_interval_ms: Flush at most this long after the first buffered event
+            max_queue: Queued items (single events or client batches) held in memory
+                       before enqueue_batch() starts refusing
+            sessionize_interval: Seconds between incremental sessionizer runs
+                                 after writes (when analytics.derive_sessions)
+        """
+        super().__init__(analytics, max_batch, flush_interval_ms, sessionize_interval)
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self):
+        """Create the queue and writer task on the running loop (idempotent)"""
+        if self._task is None or self._task.done():
+            # SQLite calls block, so they run on one dedicated thread, never on the loop
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analytics-writer')
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Write what is queued, then stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def enqueue_batch(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Queue events as one unit without waiting; they are written in one transaction
+
+        Returns:
+            False if the queue is full (the whole batch is refused)
+        """
+        if self._queue is None:
+            return False
+        return self._offer(events, self._put)
+
+    def _put(self, events: List[Dict[str, Any]]) -> bool:
+        try:
+            self._queue.put_nowait(events)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._new_batch(await self._queue.get())
+            while True:
+                wait = batch.wait_time()
+                if wait is None:
+                    break
+                try:
+                    batch.add(await asyncio.wait_for(self._queue.get(), wait) if wait > 0
+                              else self._queue.get_nowait())
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+
+            # The write and any due sessionizer run happen on the writer thread, off the loop
+            await loop.run_in_executor(self._executor, self._write, batch.events)
+            for _ in range(batch.items):
+                self._queue.task_done()
+
+    def _queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def _running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+class AnalyticsASGIApp:
+    """Tracking endpoints of api.py (single event, batch, health) as an ASGI application"""
+
+    def __init__(self, analytics: WebsiteAnalytics, **queue_options):
+        self.analytics = analytics
+        self.ingest_queue = AsyncIngestQueue(analytics, **queue_options)
+        self.routes = {
+            ('POST', '/api/analytics'): self.track_analytics,
+            ('POST', '/api/analytics/batch'): self.track_analytics_batch,
+            ('GET', '/api/analytics/health'): self.health_check
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            status, payload = await self._handle(scope, receive)
+            await self._respond(send, status, payload)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.ingest_queue.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.ingest_queue.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle(self, scope, receive):
+        method, path = scope['method'], scope['path'].rstrip('/') or '/'
+        if method == 'OPTIONS':
+            return 204, None  # CORS preflight
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return 404, {'error': 'Endpoint not found'}
+
+        # Servers without lifespan support: start the writer on first use
+        self.ingest_queue.start()
+        try:
+            body = await self._read_body(receive) if method == 'POST' else b''
+        except ValueError as e:
+            return 413, {'error': str(e)}
+        try:
+            return await handler(body)
+        except Exception as e:
+            logger.error(f"Error handling {method} {path}: {e}")
+            return 500, {'error': str(e)}
+
+    async def _read_body(self, receive) -> bytes:
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if len(body) > MAX_BODY_BYTES:
+                raise ValueError(f'Request body exceeds {MAX_BODY_BYTES} bytes')
+            if not message.get('more_body'):
+                return body
+
+    async def _respond(self, send, status: int, payload):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        headers = [
+            (b'access-control-allow-origin', b'*'),
+            (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+            (b'access-control-allow-headers', b'Content-Type'),
+            (b'content-length', str(len(body)).encode())
+        ]
+        if payload is not None:
+            headers.append((b'content-type', b'application/json'))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def _parse_json(body: bytes):
+        # sendBeacon posts text/plain, so parse the body regardless of content type
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    async def track_analytics(self, body: bytes):
+        """Receive one analytics event and queue it for the writer task"""
+        data = self._parse_json(body)
+        if not data or not isinstance(data, dict):
+            return 400, {'error': 'No data provided'}
+
+        event_type = data.get('event_type')
+        if event_type not in WebsiteAnalytics.INGEST_EVENT_TYPES:
+            return 400, {'error': f'Unknown event type: {event_type}'}
+
+        # Stored at the server receive time, never a client-supplied one
+        data.pop('received_at', None)
+        if not self.ingest_queue.enqueue_batch([data]):
+            return 503, {'error': 'Analytics ingest queue is full, retry later'}
+        return 202, {'success': True, 'queued': True}
+
+    async def track_analytics_batch(self, body: bytes):
+        """Receive a batch of analytics events (tracking script beacon payload)"""
+        data = self._parse_json(body)
+        if isinstance(data, list):
+            events, sent_at = data, None
+        elif isinstance(data, dict):
+            events, sent_at = data.get('events'), data.get('sent_at')
+        else:
+            return 400, {'error': 'No data provided'}
+
+        if not isinstance(events, list) or not events:
+            return 400, {'error': 'Expected a non-empty events array'}
+        if len(events) > MAX_BATCH_EVENTS:
+            return 413, {'error': f'Batch exceeds {MAX_BATCH_EVENTS} events'}
+
+        valid_events = [
+            event for event in events
+            if isinstance(event, dict) and event.get('event_type') in WebsiteAnalytics.INGEST_EVENT_TYPES
+        ]
+        apply_client_offsets(valid_events, sent_at)
+
+        if valid_events and not self.ingest_queue.enqueue_batch(valid_events):
+            return 503, {'error': 'Analytics ingest queue is full, retry later'}
+        return 202, {
+            'success': True,
+            'queued': len(valid_events),
+            'rejected': len(events) - len(valid_events)
+        }
+
+    async def health_check(self, body: bytes):
+        """Queue state only; no database round trip on the event loop"""
+        return 200, {
+            'status': 'healthy',
+            'server': 'asgi',
+            'ingest_queue': self.ingest_queue.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+# Module-level app for ASGI servers: uvicorn async_api:app
+app = AnalyticsASGIApp(
+    WebsiteAnalytics(os.environ.get('ANALYTICS_DB_PATH', 'analytics/website_analytics.db')),
+    max_batch=500,
+    flush_interval_ms=50
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Async analytics ingestion service')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5002)
+    args = parser.parse_args()
+
+    if not UVICORN_AVAILABLE:
+        print("❌ uvicorn is not installed: pip install uvicorn (or serve async_api:app with any ASGI server)")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    print("🚀 Starting RenewablePowerInsight async ingestion service")
+    print("📊 Database path:", app.analytics.db_path)
+    print(f"🌐 Tracking endpoint: http://localhost:{args.port}/api/analytics")
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Analytics Pipeline Load Benchmark
+Drives the analytics pipeline with synthetic visitors on temporary databases and
+writes a machine-readable results file:
+- ingest throughput of WebsiteAnalytics.ingest_events, the IngestQueue and the
+  Flask API batch endpoint (when Flask is installed), with DB growth per event
+- sessionization and rollup compaction time
+- per-report query latency and DB size at each table size
+
+Run from the analytics folder:
+    python benchmark_pipeline.py --sizes 10000 --output pipeline_results.json    # quick run
+    python benchmark_pipeline.py                                                 # 10k / 1M / 10M rows
+    python benchmark_pipeline.py --sizes 10000 100000 --baseline pipeline_results.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+from ingest_queue import IngestQueue
+from dashboard import AnalyticsDashboard
+from benchmark_reports import PAGES, SOURCES, DEVICES, BROWSERS, generate_synthetic_traffic
+
+DEFAULT_SIZES = [10000, 1000000, 10000000]
+
+# Page views bulk-loaded per generate_synthetic_traffic call (bounds memory at 10M)
+LOAD_CHUNK = 1000000
+
+REFERRERS = {
+    'direct': '',
+    'organic_search': 'https://www.google.com/search?q=solar+panels',
+    'social_facebook': 'https://www.facebook.com/',
+    'social_twitter': 'https://t.co/renewable',
+    'social_linkedin': 'https://www.linkedin.com/feed/',
+    'referral': 'https://cleantechnica.com/',
+    'email': 'https://mail.google.com/'
+}
+
+# Metrics where a larger value is better; every other timing/size is lower-is-better
+HIGHER_IS_BETTER = ('events_per_sec',)
+
+
+def generate_visitor_events(sessions: int, days: int = 7, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Tracking events for ``sessions`` synthetic visits, in arrival order
+
+    Each visit sends session_start, a page_view and page_exit per page (1-6 pages),
+    the occasional scroll custom_event and, for 3% of visits, a conversion. The
+    events carry received_at, so ingest stores them at their simulated time.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_ids = [f"bench_user_{i}" for i in range(max(1, sessions // 3))]
+    events = []
+
+    for n in range(sessions):
+        session_id, user_id = f"bench_session_{n}", rng.choice(user_ids)
+        source = rng.choice(SOURCES)
+        timestamp = now - timedelta(seconds=rng.randint(0, days * 86400))
+        base = {'session_id': session_id, 'user_id': user_id}
+
+        events.append({**base, 'event_type': 'session_start', 'received_at': timestamp.isoformat(),
+                       'device_type': rng.choice(DEVICES), 'traffic_source': source,
+                       'is_new_user': rng.random() < 0.4})
+        referrer = REFERRERS[source]
+        for _ in range(rng.choice([1, 1, 1, 2, 2, 3, 4, 6])):
+            page_url = rng.choice(PAGES)
+            events.append({**base, 'event_type': 'page_view', 'received_at': timestamp.isoformat(),
+                           'page_url': page_url, 'page_title': 'Renewable Power Insight', 'referrer': referrer,
+                           'user_agent': f"Mozilla/5.0 {rng.choice(BROWSERS)}"})
+            time_on_page = round(rng.uniform(5, 240), 1)
+            if rng.random() < 0.1:
+                events.append({**base, 'event_type': 'custom_event', 'event_name': 'scroll_depth',
+                               'received_at': (timestamp + timedelta(seconds=time_on_page / 2)).isoformat(),
+                               'properties': {'depth': rng.choice([25, 50, 75, 100])}, 'page_url': page_url})
+            timestamp += timedelta(seconds=time_on_page)
+            events.append({**base, 'event_type': 'page_exit', 'received_at': timestamp.isoformat(),
+                           'page_url': page_url, 'time_on_page': time_on_page})
+            referrer = page_url
+
+        if rng.random() < 0.03:
+            events.append({**base, 'event_type': 'conversion', 'received_at': timestamp.isoformat(),
+                           'conversion_type': rng.choice(['newsletter_signup', 'download', 'contact_form']),
+                           'page_url': referrer, 'value': rng.choice([None, 10.0, 25.0])})
+
+    events.sort(key=lambda event: event['received_at'])
+    return events
+
+
+def db_bytes(analytics: WebsiteAnalytics) -> int:
+    """Database size on disk after checkpointing the WAL into the main file"""
+    with analytics.pool.connection() as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    return sum(
+        path.stat().st_size
+        for path in (analytics.db_path, Path(f"{analytics.db_path}-wal"))
+        if path.exists()
+    )
+
+
+def _timed(func: Callable) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _median_ms(func: Callable, runs: int) -> float:
+    return round(statistics.median(_timed(func) * 1000 for _ in range(runs)), 2)
+
+
+def _ingest_direct(analytics: WebsiteAnalytics, events: List[Dict[str, Any]], batch_size: int):
+    for i in range(0, len(events), batch_size):
+        analytics.ingest_events(events[i:i + batch_size])
+
+
+def _ingest_queue(analytics: WebsiteAnalytics, events: List[Dict[str, Any]], batch_size: int):
+    queue = IngestQueue(analytics, max_batch=500, flush_interval_ms=50).start()
+    for i in range(0, len(events), batch_size):
+        while not queue.enqueue_batch(events[i:i + batch_size]):
+            time.sleep(0.01)
+    queue.flush(timeout=600)
+    queue.stop()
+
+
+def _ingest_api(db_path: Path, events: List[Dict[str, Any]], batch_size: int) -> Optional[WebsiteAnalytics]:
+    """
+    POST the events to api.py's batch endpoint with the Flask test client
+
+    The API stamps events with the server receive time, so these all land on today.
+    """
+    os.environ['ANALYTICS_DB_PATH'] = str(db_path)
+    try:
+        api = importlib.import_module('api')
+    except ImportError:
+        return None
+
+    client = api.app.test_client()
+    for i in range(0, len(events), batch_size):
+        client.post('/api/analytics/batch', data=json.dumps({'events': events[i:i + batch_size]}),
+                    content_type='text/plain')
+    api.ingest_queue.flush(timeout=600)
+    return api.analytics
+
+
+def run_ingest_benchmark(sessions: int, batch_size: int = 20) -> Dict[str, Any]:
+    """
+    Ingest the same synthetic visits through each entry point into its own database
+
+    Returns:
+        Dict of mode -> events, seconds, events/sec and DB bytes per event, plus the
+        time to sessionize what the direct mode ingested
+    """
+    events = generate_visitor_events(sessions)
+    results = {'sessions': sessions, 'events': len(events), 'batch_size': batch_size, 'modes': {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = {
+            'ingest_events': lambda analytics: _ingest_direct(analytics, events, batch_size),
+            'ingest_queue': lambda analytics: _ingest_queue(analytics, events, batch_size),
+        }
+        for mode, ingest in modes.items():
+            analytics = WebsiteAnalytics(str(Path(tmp) / f"{mode}.db"))
+            empty = db_bytes(analytics)
+            seconds = _timed(lambda: ingest(analytics))
+            results['modes'][mode] = _ingest_entry(len(events), seconds, db_bytes(analytics) - empty)
+
+            if mode == 'ingest_events':
+                results['sessionize_seconds'] = round(_timed(lambda: analytics.sessionize(full=True)), 3)
+            analytics.pool.close_all()
+
+        api_db = Path(tmp) / "api.db"
+        analytics = WebsiteAnalytics(str(api_db))
+        empty = db_bytes(analytics)
+        analytics.pool.close_all()
+        start = time.perf_counter()
+        analytics = _ingest_api(api_db, [dict(event) for event in events], batch_size)
+        if analytics is None:
+            results['modes']['flask_api'] = {'skipped': 'Flask is not installed'}
+        else:
+            seconds = time.perf_counter() - start
+            results['modes']['flask_api'] = _ingest_entry(len(events), seconds, db_bytes(analytics) - empty)
+            analytics.pool.close_all()
+
+    for mode, entry in results['modes'].items():
+        if 'events_per_sec' in entry:
+            print(f"📥 {mode:>13} | {entry['events_per_sec']:>9,.0f} events/s | "
+                  f"{entry['db_bytes_per_event']:>6.0f} DB bytes/event")
+    return results
+
+
+def _ingest_entry(events: int, seconds: float, growth: int) -> Dict[str, Any]:
+    return {
+        'seconds': round(seconds, 3),
+        'events_per_sec': round(events / seconds, 1),
+        'db_bytes': growth,
+        'db_bytes_per_event': round(growth / events, 1)
+    }
+
+
+def report_functions(analytics: WebsiteAnalytics, dashboard: AnalyticsDashboard, days: int) -> Dict[str, Callable]:
+    """Every report the API and dashboard serve, uncached"""
+    return {
+        'page_views': lambda: analytics.get_page_views(days),
+        'session_metrics': lambda: analytics.get_session_metrics(days),
+        'traffic_sources': lambda: analytics.get_traffic_sources(days),
+        'devices': lambda: analytics.get_device_metrics(days),
+        'conversions': lambda: analytics.get_conversion_metrics(days),
+        'exit_pages': lambda: analytics.get_exit_pages(days),
+        'time_on_page': lambda: analytics.get_time_on_page_metrics(days),
+        'comprehensive': lambda: analytics.generate_comprehensive_report(days),
+        'dashboard_html': lambda: dashboard._render_dashboard_html(days)
+    }
+
+
+def run_report_benchmark(size: int, days: int = 30, history_days: int = 90, runs: int = 3) -> Dict[str, Any]:
+    """
+    Load ``size`` page views of history, then time sessionization, compaction and each report
+
+    Returns:
+        Dict with row counts, DB sizes, preparation times and per-report median ms
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        analytics = WebsiteAnalytics(str(Path(tmp) / "benchmark.db"))
+        analytics.rollups.auto_compact = False
+        empty = db_bytes(analytics)
+
+        print(f"🔄 Loading {size:,} page views over {history_days} days...")
+        counts = {'page_views': 0, 'sessions': 0, 'conversions': 0}
+        start = time.perf_counter()
+        for chunk, offset in enumerate(range(0, size, LOAD_CHUNK)):
+            loaded = generate_synthetic_traffic(analytics, min(LOAD_CHUNK, size - offset), history_days, seed=42 + chunk)
+            for table, count in loaded.items():
+                counts[table] += count
+        entry = {'page_views': size, 'rows': counts, 'load_seconds': round(time.perf_counter() - start, 2)}
+        entry['db_bytes_raw'] = db_bytes(analytics)
+
+        entry['sessionize_seconds'] = round(_timed(lambda: analytics.sessionize(full=True)), 2)
+        entry['compaction_seconds'] = round(_timed(lambda: analytics.compact_rollups(full=True)), 2)
+        entry['db_bytes'] = db_bytes(analytics)
+        entry['db_bytes_per_page_view'] = round((entry['db_bytes'] - empty) / max(size, 1), 1)
+
+        dashboard = AnalyticsDashboard(str(analytics.db_path))
+        entry['reports_ms'] = {
+            name: _median_ms(report, runs)
+            for name, report in report_functions(analytics, dashboard, days).items()
+        }
+        analytics.get_summary_report(days)
+        entry['reports_ms']['summary_cached'] = _median_ms(lambda: analytics.get_summary_report(days), runs)
+        analytics.pool.close_all()
+
+    reports = entry['reports_ms']
+    print(f"📊 {size:>10,} views | {entry['db_bytes'] / 1e6:>8.1f} MB | sessionize {entry['sessionize_seconds']}s | "
+          f"comprehensive {reports['comprehensive']}ms | slowest {max(reports, key=reports.get)} "
+          f"{max(reports.values())}ms")
+    return entry
+
+
+def _flatten(results: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """Numeric leaves keyed by path, report sizes keyed by page view count"""
+    flat = {}
+    for key, value in results.items():
+        if key == 'sizes':
+            for entry in value:
+                flat.update(_flatten(entry, f"{prefix}sizes.{entry['page_views']}."))
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare_results(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float = 0.2) -> List[str]:
+    """
+    Timings, throughputs and sizes that got worse than the baseline by more than ``threshold``
+
+    Returns:
+        One line per regression, e.g. "sizes.10000.reports_ms.comprehensive: 12.0 -> 20.5 (+71%)"
+    """
+    old, new = _flatten(baseline), _flatten(results)
+    measured = ('_ms', 'seconds', 'events_per_sec', 'db_bytes', 'db_bytes_raw', '_per_event', '_per_page_view')
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        parts = key.split('.')
+        name = parts[-1]
+        if not ('reports_ms' in parts or name.endswith(measured)) or not old[key]:
+            continue
+        if name.endswith('_ms') and abs(new[key] - old[key]) < 1:
+            continue  # sub-millisecond jitter
+        change = (new[key] - old[key]) / old[key]
+        if name in HIGHER_IS_BETTER:
+            change = -change
+        if change > threshold:
+            regressions.append(f"{key}: {old[key]} -> {new[key]} ({change:+.0%})")
+    return regressions
+
+
+def run_pipeline_benchmark(sizes: List[int], ingest_sessions: int, days: int = 30, history_days: int = 90,
+                           runs: int = 3, batch_size: int = 20) -> Dict[str, Any]:
+    results = {
+        'generated_at': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform()
+        },
+        'report_days': days,
+        'history_days': history_days,
+        'runs': runs,
+        'ingest': run_ingest_benchmark(ingest_sessions, batch_size) if ingest_sessions else None,
+        'sizes': []
+    }
+    for size in sizes:
+        results['sizes'].append(run_report_benchmark(size, days, history_days, runs))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load benchmark for analytics ingest, sessionization and reports')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES,
+                        help='Page view counts for the report benchmark')
+    parser.add_argument('--ingest-sessions', type=int, default=20000,
+                        help='Synthetic visits sent through each ingest path (0 skips ingest)')
+    parser.add_argument('--batch-size', type=int, default=20, help='Events per ingest call / API request')
+    parser.add_argument('--days', type=int, default=30, help='Report window in days')
+    parser.add_argument('--history-days', type=int, default=90, help='Days of synthetic history')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per report (median is reported)')
+    parser.add_argument('--output', default='pipeline_benchmark.json', help='JSON results file')
+    parser.add_argument('--baseline', help='Earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    results = run_pipeline_benchmark(args.sizes, args.ingest_sessions, args.days, args.history_days,
+                                     args.runs, args.batch_size)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(json.load(f), results, args.threshold)
+        for line in regressions:
+            print(f"⚠️  {line}")
+        print(f"{'❌' if regressions else '✅'} {len(regressions)} regressions against {args.baseline}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
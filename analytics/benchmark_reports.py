@@ -0,0 +1,173 @@
+"""
+Report Latency Benchmark
+Times the comprehensive analytics report against table size: one call per
+metric (seven get_* round trips) versus the single-statement report, on raw
+rows and on compacted daily rollups
+
+Run from the analytics folder (uses a temporary database):
+    python benchmark_reports.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+
+PAGES = [f"/posts/category-{i % 8}/post-{i}.html" for i in range(400)] + ["/index.html", "/blog/index.html"]
+SOURCES = ['direct', 'organic_search', 'social_facebook', 'social_twitter', 'social_linkedin', 'referral', 'email']
+DEVICES = ['desktop', 'mobile', 'tablet']
+BROWSERS = ['Chrome', 'Safari', 'Firefox', 'Edge']
+
+
+def generate_synthetic_traffic(analytics: WebsiteAnalytics, page_views: int, days: int = 90,
+                               seed: int = 42) -> Dict[str, int]:
+    """
+    Bulk-insert realistic synthetic visits spread over the last ``days`` days
+
+    Sessions get 1-6 page views 5-240s apart; single-page visits under a minute
+    bounce, 3% of sessions convert, and social sources get a social_referrals row.
+
+    Returns:
+        Counts of inserted page views, sessions and conversions
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_ids = [f"user_{i}" for i in range(max(1, page_views // 10))]
+    page_rows, session_rows, social_rows, conversion_rows = [], [], [], []
+
+    while len(page_rows) < page_views:
+        session_id = uuid.uuid4().hex
+        user_id = rng.choice(user_ids)
+        start = now - timedelta(seconds=rng.randint(0, days * 86400))
+        views = min(rng.choice([1, 1, 1, 2, 2, 3, 4, 6]), page_views - len(page_rows))
+        source = rng.choice(SOURCES)
+
+        timestamp = start
+        for i in range(views):
+            time_on_page = rng.uniform(5, 240)
+            page_rows.append((
+                uuid.uuid4().hex, timestamp.isoformat(), session_id, user_id, rng.choice(PAGES),
+                "Renewable Power Insight", "", "", "", time_on_page, None, i == views - 1
+            ))
+            timestamp += timedelta(seconds=time_on_page)
+
+        duration = (timestamp - start).total_seconds()
+        session_rows.append((
+            session_id, user_id, start.isoformat(), timestamp.isoformat(), views, duration,
+            rng.choice(DEVICES), rng.choice(BROWSERS), source, rng.random() < 0.4,
+            views == 1 and duration < 60
+        ))
+        if source.startswith('social_'):
+            social_rows.append((session_id, source.replace('social_', '')))
+        if rng.random() < 0.03:
+            conversion_rows.append((
+                uuid.uuid4().hex, session_id, user_id, timestamp.isoformat(),
+                rng.choice(['newsletter_signup', 'download', 'contact_form']), page_rows[-1][4],
+                rng.choice([None, 10.0, 25.0])
+            ))
+
+    with analytics.pool.transaction() as cursor:
+        cursor.executemany('''
+            INSERT INTO page_views (
+                id, timestamp, session_id, user_id, page_url, page_title,
+                referrer, user_agent, ip_address, time_on_page, scroll_depth, exit_page
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', page_rows)
+        cursor.executemany('''
+            INSERT INTO sessions (
+                id, user_id, start_time, end_time, page_views, duration,
+                device_type, browser, traffic_source, is_new_user, bounce
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', session_rows)
+        cursor.executemany('INSERT INTO social_referrals (session_id, platform) VALUES (?, ?)', social_rows)
+        cursor.executemany('''
+            INSERT INTO conversions (id, session_id, user_id, timestamp, event_type, page_url, value)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', conversion_rows)
+
+    return {'page_views': len(page_rows), 'sessions': len(session_rows), 'conversions': len(conversion_rows)}
+
+
+def per_metric_report(analytics: WebsiteAnalytics, days: int) -> Dict[str, Any]:
+    """The report assembled from one get_* call per metric"""
+    return {
+        'page_views': analytics.get_page_views(days),
+        'sessions': analytics.get_session_metrics(days),
+        'traffic_sources': analytics.get_traffic_sources(days),
+        'devices': analytics.get_device_metrics(days),
+        'conversions': analytics.get_conversion_metrics(days),
+        'exit_pages': analytics.get_exit_pages(days),
+        'time_on_page': analytics.get_time_on_page_metrics(days)
+    }
+
+
+def _median_ms(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def run_benchmark(sizes: List[int], days: int = 30, history_days: int = 90, runs: int = 5) -> Dict[str, Any]:
+    results = {'report_days': days, 'history_days': history_days, 'runs': runs, 'sizes': []}
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            analytics = WebsiteAnalytics(str(Path(tmp) / "benchmark.db"))
+            analytics.rollups.auto_compact = False
+
+            print(f"🔄 Generating {size:,} page views over {history_days} days...")
+            counts = generate_synthetic_traffic(analytics, size, history_days)
+
+            entry = {'page_views': size, 'rows': counts}
+            entry['raw_per_metric_ms'] = _median_ms(lambda: per_metric_report(analytics, days), runs)
+            entry['raw_single_query_ms'] = _median_ms(lambda: analytics.generate_comprehensive_report(days), runs)
+
+            start = time.perf_counter()
+            analytics.compact_rollups(full=True)
+            entry['compaction_seconds'] = round(time.perf_counter() - start, 2)
+
+            entry['rollup_per_metric_ms'] = _median_ms(lambda: per_metric_report(analytics, days), runs)
+            entry['rollup_single_query_ms'] = _median_ms(lambda: analytics.generate_comprehensive_report(days), runs)
+            analytics.pool.close_all()
+
+        results['sizes'].append(entry)
+        print(f"📊 {size:>10,} views | raw: {entry['raw_per_metric_ms']:>9.1f}ms per-metric, "
+              f"{entry['raw_single_query_ms']:>9.1f}ms single | rollup: {entry['rollup_per_metric_ms']:>7.1f}ms per-metric, "
+              f"{entry['rollup_single_query_ms']:>7.1f}ms single")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analytics report latency against table size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Page view counts to test')
+    parser.add_argument('--days', type=int, default=30, help='Report window in days')
+    parser.add_argument('--history-days', type=int, default=90, help='Days of synthetic history')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per measurement (median is reported)')
+    parser.add_argument('--output', help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.days, args.history_days, args.runs)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+SQLite Connection Pool for the Analytics Database
+Reuses tuned connections (WAL journal, relaxed fsync, larger page cache) so the
+API, the ingest writer and the dashboard can read and write concurrently
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Check-out/check-in pool of configured sqlite3 connections for one database file"""
+
+    def __init__(
+        self,
+        db_path,
+        max_idle: int = 8,
+        cache_size_kb: int = 16384,
+        synchronous: str = "NORMAL",
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256
+    ):
+        """
+        Args:
+            db_path: SQLite database file
+            max_idle: Connections kept open for reuse; extra ones are closed on release
+            cache_size_kb: Page cache per connection (PRAGMA cache_size)
+            synchronous: PRAGMA synchronous; NORMAL is durable across app crashes in WAL mode
+            busy_timeout_ms: How long a writer waits for the write lock
+            cached_statements: Prepared statements kept per connection (keyed by SQL text)
+        """
+        self.db_path = Path(db_path)
+        self.max_idle = max_idle
+        self.cache_size_kb = cache_size_kb
+        self.synchronous = synchronous
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0, "closed": 0}
+
+    def _create(self) -> sqlite3.Connection:
+        # A connection is only ever used by the thread that checked it out, but it
+        # may be checked out by a different thread next time
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self.stats["created"] += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                self.stats["reused"] += 1
+                return self._idle.pop()
+        return self._create()
+
+    def release(self, conn: sqlite3.Connection):
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self.stats["closed"] += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for reads (or manual transaction control)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Borrow a connection and run the block as one transaction (commit or rollback)"""
+        conn = self.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.stats["closed"] += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "idle": len(self._idle), "max_idle": self.max_idle}
+
+
+def get_pool(db_path, **kwargs) -> ConnectionPool:
+    """Shared pool per database file, so every component reuses the same connections"""
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, **kwargs)
+        return pool
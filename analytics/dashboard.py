@@ -8,15 +8,59 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 from pathlib import Path
 import sqlite3
+import sys
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from connection_pool import get_pool
+from rollups import DailyRollups, REPORT_QUERIES
+from report_cache import ReportCache
+from sessionizer import Sessionizer
+from traffic_sources import TrafficSourceClassifier
 
 class AnalyticsDashboard:
     """HTML dashboard generator for website analytics"""
     
-    def __init__(self, analytics_db_path: str = "analytics/website_analytics.db"):
+    def __init__(self, analytics_db_path: str = "analytics/website_analytics.db", cache_ttl: float = 60.0):
         self.db_path = Path(analytics_db_path)
+        self._rollups = None
+        self._sessionizer = None
+        # Rendered pages, keyed by (days, data watermark)
+        self.cache = ReportCache(ttl_seconds=cache_ttl, max_entries=16)
+        
+    def _get_rollups(self) -> DailyRollups:
+        # Created once: construction creates tables and compaction runs once a day
+        if self._rollups is None:
+            self._rollups = DailyRollups(get_pool(self.db_path))
+            # Same classifier as WebsiteAnalytics, so new sessions get the same source
+            # whichever process sessionizes them first
+            self._sessionizer = Sessionizer(self._rollups.pool, self._rollups, TrafficSourceClassifier().classify)
+        return self._rollups
         
     def generate_dashboard_html(self, days: int = 30) -> str:
-        """Generate complete HTML dashboard"""
+        """
+        Generate complete HTML dashboard
+        
+        The rendered page is cached until new events land or the cache TTL passes,
+        so repeated and concurrent loads do not re-query the database.
+        """
+        
+        if not self.db_path.exists():
+            return self._render_dashboard_html(days)
+        
+        try:
+            rollups = self._get_rollups()
+            # Sessions derived from page views that arrived since the last run
+            self._sessionizer.ensure_fresh()
+            rollups.ensure_fresh()
+            watermark = rollups.data_watermark()
+        except sqlite3.Error:
+            return self._render_dashboard_html(days)
+        
+        return self.cache.get_or_compute((days, watermark), lambda: self._render_dashboard_html(days))
+        
+    def _render_dashboard_html(self, days: int) -> str:
+        """Query the database and build the dashboard page"""
         
         # Get data from analytics database
         data = self._get_dashboard_data(days)
@@ -541,103 +585,60 @@ class AnalyticsDashboard:
             
         start_date = (datetime.now() - timedelta(days=days)).isoformat()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
+            # Whole past days come from the daily rollup tables, the rest from raw rows
+            rollups = self._get_rollups()
+            
+            # One statement for every rollup the dashboard needs
+            rows = rollups.query_many(start_date, REPORT_QUERIES)
+            pages = rows['pages']
+            session_rows = rows['sessions']
+            conversion_rows = rows['conversions']
+            
             # Page views
-            cursor.execute('SELECT COUNT(*) FROM page_views WHERE timestamp >= ?', (start_date,))
-            total_page_views = cursor.fetchone()[0]
+            total_page_views = sum(row[2] for row in pages)
             
             # Sessions
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total,
-                    AVG(duration) as avg_duration,
-                    AVG(page_views) as pages_per_session,
-                    COUNT(CASE WHEN bounce = 1 THEN 1 END) * 100.0 / COUNT(*) as bounce_rate,
-                    COUNT(CASE WHEN is_new_user = 1 THEN 1 END) as new_users,
-                    COUNT(CASE WHEN is_new_user = 0 THEN 1 END) as returning_users
-                FROM sessions 
-                WHERE start_time >= ?
-            ''', (start_date,))
-            session_data = cursor.fetchone()
+            sessions = sum(row[4] for row in session_rows)
+            bounces = sum(row[5] for row in session_rows)
+            page_views_sum = sum(row[6] or 0 for row in session_rows)
+            duration_sum = sum(row[7] or 0 for row in session_rows)
+            duration_count = sum(row[8] for row in session_rows)
+            session_data = (
+                sessions,
+                duration_sum / duration_count if duration_count else None,
+                page_views_sum / sessions if sessions else None,
+                bounces * 100.0 / sessions if sessions else None,
+                sum(row[4] for row in session_rows if row[3] == 1),
+                sum(row[4] for row in session_rows if row[3] == 0)
+            )
             
             # Conversions
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_conversions,
-                    COUNT(*) * 100.0 / (SELECT COUNT(*) FROM sessions WHERE start_time >= ?) as conversion_rate
-                FROM conversions 
-                WHERE timestamp >= ?
-            ''', (start_date, start_date))
-            conversion_data = cursor.fetchone()
-            
-            # Device breakdown
-            cursor.execute('''
-                SELECT device_type, COUNT(*) as sessions
-                FROM sessions 
-                WHERE start_time >= ?
-                GROUP BY device_type
-                ORDER BY sessions DESC
-            ''', (start_date,))
-            device_data = cursor.fetchall()
+            total_conversions = sum(row[1] for row in conversion_rows)
+            conversion_data = (total_conversions, total_conversions * 100.0 / sessions if sessions else None)
             
-            # Traffic sources
-            cursor.execute('''
-                SELECT traffic_source, COUNT(*) as sessions
-                FROM sessions 
-                WHERE start_time >= ?
-                GROUP BY traffic_source
-                ORDER BY sessions DESC
-            ''', (start_date,))
-            traffic_data = cursor.fetchall()
+            # Device breakdown and traffic sources
+            device_counts, traffic_counts = {}, {}
+            for row in session_rows:
+                device_counts[row[1]] = device_counts.get(row[1], 0) + row[4]
+                traffic_counts[row[0]] = traffic_counts.get(row[0], 0) + row[4]
+            device_data = sorted(device_counts.items(), key=lambda item: item[1], reverse=True)
+            traffic_data = sorted(traffic_counts.items(), key=lambda item: item[1], reverse=True)
             
             # Top pages
-            cursor.execute('''
-                SELECT 
-                    page_url, 
-                    page_title, 
-                    COUNT(*) as views,
-                    AVG(time_on_page) as avg_time,
-                    COUNT(CASE WHEN exit_page = 1 THEN 1 END) * 100.0 / COUNT(*) as exit_rate
-                FROM page_views 
-                WHERE timestamp >= ?
-                GROUP BY page_url, page_title
-                ORDER BY views DESC
-                LIMIT 10
-            ''', (start_date,))
-            top_pages_data = cursor.fetchall()
+            top_pages_data = [
+                (url, title, views, time_sum / time_count if time_count else None, exits * 100.0 / views)
+                for url, title, views, exits, time_sum, time_count in sorted(pages, key=lambda row: row[2], reverse=True)[:10]
+            ]
             
             # Daily page views for chart
-            cursor.execute('''
-                SELECT DATE(timestamp) as date, COUNT(*) as views
-                FROM page_views 
-                WHERE timestamp >= ?
-                GROUP BY DATE(timestamp)
-                ORDER BY date
-            ''', (start_date,))
-            daily_views = cursor.fetchall()
+            daily_views = sorted((row[0], row[1]) for row in rows['daily_pages'])
             
             # Conversion events
-            cursor.execute('''
-                SELECT event_type, COUNT(*) as count, SUM(value) as total_value
-                FROM conversions 
-                WHERE timestamp >= ?
-                GROUP BY event_type
-                ORDER BY count DESC
-            ''', (start_date,))
-            conversion_events = cursor.fetchall()
+            conversion_events = sorted(conversion_rows, key=lambda row: row[1], reverse=True)
             
             # Social referrals
-            cursor.execute('''
-                SELECT COUNT(*) FROM social_referrals sr
-                JOIN sessions s ON sr.session_id = s.id
-                WHERE s.start_time >= ?
-            ''', (start_date,))
-            social_referrals = cursor.fetchone()[0]
-            
-            conn.close()
+            social_referrals = sum(row[1] for row in rows['social'])
             
             # Process device data
             total_sessions = session_data[0] if session_data[0] else 1
@@ -680,7 +681,6 @@ class AnalyticsDashboard:
             }
             
         except Exception as e:
-            conn.close()
             return self._get_empty_data()
     
     def _get_empty_data(self) -> Dict[str, Any]:
@@ -0,0 +1,279 @@
+"""
+Write-Behind Event Ingestion Queue
+Accepts tracking events on the request thread and writes them to SQLite from a
+single background thread, one transaction per batch of events
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Largest client batch the batch endpoints accept
+MAX_BATCH_EVENTS = 500
+
+
+def parse_client_time(value):
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_client_offsets(events: List[Dict[str, Any]], sent_at):
+    """
+    Timestamp buffered events in server time
+
+    The tracking script holds events for up to a page lifetime before sending.
+    Each event's age is measured on the client clock (sent_at - timestamp) and
+    subtracted from the server receive time, so client clock skew cancels out.
+    """
+    now = datetime.now()
+    sent = parse_client_time(sent_at)
+    for event in events:
+        event_time = parse_client_time(event.get('timestamp'))
+        if sent is None or event_time is None or (sent.tzinfo is None) != (event_time.tzinfo is None):
+            age = timedelta(0)
+        else:
+            age = min(max(sent - event_time, timedelta(0)), timedelta(days=1))
+        event['received_at'] = (now - age).isoformat()
+
+
+def stamp_received_at(events: List[Dict[str, Any]]):
+    """Give events that were not stamped by apply_client_offsets the current server time"""
+    received_at = datetime.now().isoformat()
+    for event in events:
+        event.setdefault('received_at', received_at)
+
+
+class EventBatch:
+    """Queued items collected for one transaction: up to max_batch events, or flush_interval after the first"""
+
+    def __init__(self, first: List[Dict[str, Any]], max_batch: int, flush_interval: float):
+        self.events = list(first)
+        self.items = 1
+        self.max_batch = max_batch
+        self.deadline = time.monotonic() + flush_interval
+
+    def wait_time(self) -> Optional[float]:
+        """Seconds to wait for the next item (0 = only take what is queued), None once the batch is full"""
+        if len(self.events) >= self.max_batch:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def add(self, item: List[Dict[str, Any]]):
+        self.events.extend(item)
+        self.items += 1
+
+
+class BatchedWriter(ABC):
+    """
+    Batching, stats and the write step shared by IngestQueue and the asyncio
+    queue in async_api.py; subclasses supply the queue and the writer loop
+    """
+
+    def __init__(
+        self,
+        analytics,
+        max_batch: int = 500,
+        flush_interval_ms: int = 50,
+        sessionize_interval: float = 5.0
+    ):
+        self.analytics = analytics
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.sessionize_interval = sessionize_interval
+        self._sessionized_at = 0.0
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'skipped': 0,
+            'failed': 0,
+            'rejected': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'last_batch_ms': 0.0
+        }
+
+    def _offer(self, events: List[Dict[str, Any]], put) -> bool:
+        """Stamp a client batch and hand it to put(); put returns False if the queue is full"""
+        stamp_received_at(events)
+        accepted = put(events)
+        with self._stats_lock:
+            self.stats['enqueued' if accepted else 'rejected'] += len(events)
+        return accepted
+
+    def _new_batch(self, first: List[Dict[str, Any]]) -> EventBatch:
+        return EventBatch(first, self.max_batch, self.flush_interval)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Write one batch in a single transaction, then sessionize if due (blocking)"""
+        start = time.perf_counter()
+        try:
+            result = self.analytics.ingest_events(batch)
+            with self._stats_lock:
+                self.stats['written'] += result['applied']
+                self.stats['skipped'] += result['skipped']
+        except Exception as e:
+            with self._stats_lock:
+                self.stats['failed'] += len(batch)
+            logger.error(f"Failed to write batch of {len(batch)} analytics events: {e}")
+
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['last_batch_size'] = len(batch)
+            self.stats['last_batch_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+        if self.analytics.derive_sessions and time.monotonic() - self._sessionized_at >= self.sessionize_interval:
+            # Keep derived sessions close to live without a session write per event
+            self._sessionized_at = time.monotonic()
+            try:
+                self.analytics.sessionize()
+            except Exception as e:
+                logger.error(f"Failed to sessionize analytics events: {e}")
+
+    @abstractmethod
+    def _queued(self) -> int:
+        """Queued items not yet taken by the writer"""
+
+    @abstractmethod
+    def _running(self) -> bool:
+        """True while the writer is running"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            'queued': self._queued(),
+            'running': self._running(),
+            'max_batch': self.max_batch,
+            'flush_interval_ms': self.flush_interval * 1000
+        }
+
+
+class IngestQueue(BatchedWriter):
+    """Buffers analytics events and flushes them every N ms or M events"""
+
+    def __init__(
+        self,
+        analytics,
+        max_batch: int = 500,
+        flush_interval_ms: int = 50,
+        max_queue: int = 100000,
+        sessionize_interval: float = 5.0
+    ):
+        """
+        Args:
+            analytics: WebsiteAnalytics instance whose ingest_events() writes a batch
+            max_batch: Flush as soon as this many events are buffered
+            flush_interval_ms: Flush at most this long after the first buffered event
+            max_queue: Queued items (single events or client batches) held in memory
+                       before enqueue() starts refusing
+            sessionize_interval: Seconds between incremental sessionizer runs
+                                 after writes (when analytics.derive_sessions)
+        """
+        super().__init__(analytics, max_batch, flush_interval_ms, sessionize_interval)
+        # Items are lists of events so a client batch is never split across transactions
+        self._queue: "queue.Queue[List[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._done = threading.Condition()
+
+    def start(self) -> 'IngestQueue':
+        """Start the background writer (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='analytics-ingest', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what is buffered and stop the writer"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """
+        Queue one event for writing, timestamped with the server receive time
+        (a client-supplied received_at is overwritten)
+
+        Returns:
+            False if the queue is full (caller should report back-pressure)
+        """
+        event['received_at'] = datetime.now().isoformat()
+        return self.enqueue_batch([event])
+
+    def enqueue_batch(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Queue a client batch as one unit; it is written in a single transaction
+
+        Events without received_at get the current time. The batch endpoint sets
+        it from the client offsets (apply_client_offsets) before queueing.
+
+        Returns:
+            False if the queue is full (the whole batch is refused)
+        """
+        return self._offer(events, self._put)
+
+    def _put(self, events: List[Dict[str, Any]]) -> bool:
+        try:
+            self._queue.put_nowait(events)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every event queued so far has been written (or failed)"""
+        target = self.stats['enqueued']
+        deadline = time.monotonic() + timeout
+        with self._done:
+            while self._processed() < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+        return True
+
+    def _processed(self) -> int:
+        return self.stats['written'] + self.stats['skipped'] + self.stats['failed']
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+
+            batch = self._new_batch(first)
+            while True:
+                wait = batch.wait_time()
+                if wait is None:
+                    break
+                try:
+                    batch.add(self._queue.get(timeout=wait) if wait > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write(batch.events)
+            with self._done:
+                self._done.notify_all()
+
+    def _queued(self) -> int:
+        return self._queue.qsize()
+
+    def _running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
@@ -23,6 +23,9 @@ class AnalyticsIntegrator:
     // Analytics configuration
     const ANALYTICS_CONFIG = {
         apiEndpoint: '/api/analytics', // Update this to your analytics endpoint
+        batchEndpoint: '/api/analytics/batch',
+        maxBatchSize: 20,       // Flush once this many events are buffered
+        flushInterval: 15000,   // ...or every 15s while the page stays visible
         trackPageViews: true,
         trackSessions: true,
         trackEvents: true,
@@ -147,23 +150,37 @@ class AnalyticsIntegrator:
         sendAnalytics(conversionData);
     }
     
-    // Send data to analytics endpoint
+    // Events are buffered and sent in batches instead of one request each
+    let eventBuffer = [];
+    
     function sendAnalytics(data) {
-        // For now, log to console (replace with actual API call)
-        console.log('RPI Analytics:', data);
+        eventBuffer.push(data);
+        if (eventBuffer.length >= ANALYTICS_CONFIG.maxBatchSize) {
+            flushAnalytics();
+        }
+    }
+    
+    // Send buffered events as one batch payload
+    function flushAnalytics() {
+        if (eventBuffer.length === 0) return;
         
-        // Uncomment when you have an analytics endpoint:
-        /*
-        fetch(ANALYTICS_CONFIG.apiEndpoint, {
+        const payload = JSON.stringify({
+            sent_at: new Date().toISOString(),
+            events: eventBuffer
+        });
+        eventBuffer = [];
+        
+        // sendBeacon survives page unload; a plain-text body avoids a CORS preflight
+        if (navigator.sendBeacon && navigator.sendBeacon(ANALYTICS_CONFIG.batchEndpoint, payload)) {
+            return;
+        }
+        fetch(ANALYTICS_CONFIG.batchEndpoint, {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(data)
+            body: payload,
+            keepalive: true
         }).catch(error => {
             console.warn('Analytics tracking failed:', error);
         });
-        */
     }
     
     // Initialize tracking when page loads
@@ -188,27 +205,38 @@ class AnalyticsIntegrator:
             }, { passive: true });
         });
         
-        // Track page exit
-        window.addEventListener('beforeunload', () => {
+        // Track page exit and flush when the page is hidden (tab switch, navigation, close).
+        // visibilitychange is the last event mobile browsers reliably fire; pagehide
+        // follows it on navigation, so the exit is sent once until the page is visible again.
+        let exitSent = false;
+        function trackPageExit() {
+            if (exitSent) {
+                flushAnalytics();
+                return;
+            }
+            exitSent = true;
             const timeOnPage = (lastActivityTime - pageLoadTime) / 1000;
             
-            const exitData = {
+            sendAnalytics({
                 event_type: 'page_exit',
                 session_id: sessionId,
                 user_id: userId,
                 page_url: window.location.href,
                 time_on_page: timeOnPage,
                 timestamp: new Date().toISOString()
-            };
-            
-            // Use sendBeacon for reliable exit tracking
-            if (navigator.sendBeacon && ANALYTICS_CONFIG.apiEndpoint !== '/api/analytics') {
-                navigator.sendBeacon(
-                    ANALYTICS_CONFIG.apiEndpoint,
-                    JSON.stringify(exitData)
-                );
+            });
+            flushAnalytics();
+        }
+        
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') {
+                trackPageExit();
+            } else {
+                exitSent = false;
             }
         });
+        window.addEventListener('pagehide', trackPageExit);
+        setInterval(flushAnalytics, ANALYTICS_CONFIG.flushInterval);
         
         // Auto-track common events
         document.addEventListener('click', (e) => {
@@ -343,8 +371,40 @@ class AnalyticsIntegrator:
             print(f"Error adding tracking to {file_path}: {e}")
             return False
     
-    def integrate_all_pages(self, backup: bool = True) -> dict:
-        """Add analytics tracking to all HTML pages"""
+    def refresh_tracking_in_file(self, file_path: Path) -> bool:
+        """Replace an existing tracking block with the current script; False if unchanged"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            start_marker = '<!-- RenewablePowerInsight Analytics -->'
+            end_marker = '<!-- End RenewablePowerInsight Analytics -->'
+            start_pos = content.find(start_marker)
+            end_pos = content.find(end_marker)
+            if start_pos == -1 or end_pos == -1:
+                return False
+            
+            tracking_script = self.get_tracking_script().strip()
+            new_content = content[:start_pos] + tracking_script + content[end_pos + len(end_marker):]
+            if new_content == content:
+                return False
+            
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            return True
+            
+        except Exception as e:
+            print(f"Error refreshing tracking in {file_path}: {e}")
+            return False
+    
+    def integrate_all_pages(self, backup: bool = True, refresh: bool = False) -> dict:
+        """
+        Add analytics tracking to all HTML pages
+        
+        Args:
+            backup: Write a .backup copy before modifying a page
+            refresh: Also replace outdated tracking blocks with the current script
+        """
         html_files = self.find_html_files()
         
         results = {
@@ -356,7 +416,10 @@ class AnalyticsIntegrator:
         
         for html_file in html_files:
             if self.has_analytics_tracking(html_file):
-                results['skipped_files'].append(str(html_file))
+                if refresh and self.refresh_tracking_in_file(html_file):
+                    results['updated_files'].append(str(html_file))
+                else:
+                    results['skipped_files'].append(str(html_file))
                 continue
             
             if self.add_tracking_to_file(html_file, backup):
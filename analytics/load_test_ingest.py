@@ -0,0 +1,223 @@
+"""
+Ingestion Load Test: Flask API vs Async (ASGI) Service
+Drives the tracking endpoints with concurrent keep-alive clients and reports
+requests/sec and latency percentiles for each server
+
+Run from the analytics folder. Either point it at running servers:
+    python load_test_ingest.py --flask-url http://localhost:5001 --asgi-url http://localhost:5002
+or let it start both on temporary databases:
+    python load_test_ingest.py --spawn --requests 20000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+ANALYTICS_DIR = Path(__file__).parent
+
+
+def build_body(index: int, batch_size: int) -> bytes:
+    """One page_view event, or a beacon-style batch of batch_size events"""
+    def event(i):
+        return {
+            'event_type': 'page_view',
+            'session_id': f"load_session_{i // 5}",
+            'user_id': f"load_user_{i // 20}",
+            'page_url': f"/posts/load-test-{i % 200}.html",
+            'page_title': 'Load Test',
+            'referrer': 'https://www.google.com/',
+            'timestamp': datetime.now().isoformat()
+        }
+
+    if batch_size <= 1:
+        return json.dumps(event(index)).encode()
+    start = index * batch_size
+    return json.dumps({
+        'sent_at': datetime.now().isoformat(),
+        'events': [event(i) for i in range(start, start + batch_size)]
+    }).encode()
+
+
+async def _read_response(reader) -> tuple:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+
+    length, close = None, status_line.startswith(b'HTTP/1.0')
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            close = value == 'close'
+
+    if length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        close = True
+    return status, close
+
+
+async def _client(url, path: str, bodies, latencies: List[float], statuses: Dict[int, int]):
+    reader = writer = None
+    for body in bodies:
+        request = (
+            f"POST {path} HTTP/1.1\r\nHost: {url.hostname}:{url.port}\r\n"
+            f"Content-Type: text/plain\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode() + body
+        for attempt in range(2):
+            if writer is None:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port)
+            start = time.perf_counter()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, close = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Stale keep-alive connection: reconnect and retry once
+                writer.close()
+                writer = None
+                if attempt:
+                    statuses[0] = statuses.get(0, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if close:
+                writer.close()
+                writer = None
+            break
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(base_url: str, requests: int, concurrency: int, batch_size: int = 1) -> Dict[str, Any]:
+    """
+    Send ``requests`` POSTs over ``concurrency`` keep-alive connections
+
+    Returns:
+        Dict with requests/sec, events/sec, latency percentiles (ms) and status counts
+    """
+    url = urlparse(base_url)
+    path = '/api/analytics/batch' if batch_size > 1 else '/api/analytics'
+    bodies = [build_body(i, batch_size) for i in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(url, path, bodies[worker::concurrency], latencies, statuses)
+        for worker in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2) if latencies else None
+    return {
+        'url': base_url + path,
+        'requests': requests,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'seconds': round(elapsed, 2),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'events_per_sec': round(statuses.get(202, 0) * max(batch_size, 1) / elapsed, 1),
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1], 2) if latencies else None,
+        'mean_ms': round(statistics.mean(latencies), 2) if latencies else None,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def _wait_healthy(base_url: str, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/analytics/health", timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.3)
+    return False
+
+
+def _spawn(command: List[str], db_path: Path) -> subprocess.Popen:
+    env = {**os.environ, 'ANALYTICS_DB_PATH': str(db_path), 'FLASK_ENV': 'production'}
+    return subprocess.Popen(command, cwd=ANALYTICS_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Flask and ASGI ingestion throughput and latency')
+    parser.add_argument('--flask-url', default='http://localhost:5001')
+    parser.add_argument('--asgi-url', default='http://localhost:5002')
+    parser.add_argument('--spawn', action='store_true', help='Start both servers on temporary databases')
+    parser.add_argument('--only', choices=['flask', 'asgi'], help='Test one server')
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=1, help='Events per request (>1 uses the batch endpoint)')
+    parser.add_argument('--output', help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    servers = {'flask': args.flask_url, 'asgi': args.asgi_url}
+    if args.only:
+        servers = {args.only: servers[args.only]}
+
+    processes: List[subprocess.Popen] = []
+    tmp = tempfile.TemporaryDirectory()
+    results = {}
+    try:
+        if args.spawn:
+            commands = {
+                'flask': [sys.executable, 'api.py'],
+                'asgi': [sys.executable, 'async_api.py', '--port', str(urlparse(args.asgi_url).port)]
+            }
+            for name in servers:
+                processes.append(_spawn(commands[name], Path(tmp.name) / f"{name}.db"))
+
+        for name, base_url in servers.items():
+            if not _wait_healthy(base_url):
+                print(f"❌ {name} server not reachable at {base_url}")
+                continue
+            # Warm up connections, caches and the writer
+            asyncio.run(run_load(base_url, min(200, args.requests), min(10, args.concurrency), args.batch_size))
+            print(f"🔄 {name}: {args.requests:,} requests, {args.concurrency} connections...")
+            results[name] = asyncio.run(run_load(base_url, args.requests, args.concurrency, args.batch_size))
+            result = results[name]
+            print(f"📊 {name:>5} | {result['requests_per_sec']:>9,.1f} req/s | {result['events_per_sec']:>9,.1f} events/s | "
+                  f"p50 {result['p50_ms']}ms | p99 {result['p99_ms']}ms | statuses {result['statuses']}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+        tmp.cleanup()
+
+    if 'flask' in results and 'asgi' in results:
+        speedup = results['asgi']['requests_per_sec'] / max(results['flask']['requests_per_sec'], 0.1)
+        print(f"⚡ ASGI vs Flask: {speedup:.1f}x requests/sec, "
+              f"p99 {results['asgi']['p99_ms']}ms vs {results['flask']['p99_ms']}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
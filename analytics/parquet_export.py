@@ -0,0 +1,290 @@
+"""
+Parquet Export and Offline Reports for Website Analytics
+Exports the raw event tables to day-partitioned Parquet files, incrementally from
+a high-water mark, and answers the WebsiteAnalytics reports from those files with
+pyarrow/pandas, so long-range analysis never touches the live database
+
+Run from the analytics folder:
+    python parquet_export.py export --out parquet
+    python parquet_export.py report --out parquet --days 365
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import AnalyticsReports
+
+# Try to import pyarrow and pandas, export and offline reports need them
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# Exported tables: table -> (source query, partition column, timestamp columns, boolean columns)
+EXPORT_TABLES = {
+    'page_views': (
+        'SELECT * FROM page_views', 'timestamp', ('timestamp',), ('exit_page',)
+    ),
+    'sessions': (
+        'SELECT * FROM sessions', 'start_time', ('start_time', 'end_time'), ('is_new_user', 'bounce')
+    ),
+    'conversions': (
+        'SELECT * FROM conversions', 'timestamp', ('timestamp',), ()
+    ),
+    # Partitioned by the session's start so social reports prune like session reports
+    'social_referrals': (
+        '''SELECT sr.session_id, sr.platform, sr.campaign, sr.organic, s.start_time
+           FROM social_referrals sr JOIN sessions s ON sr.session_id = s.id''',
+        'start_time', ('start_time',), ('organic',)
+    )
+}
+
+STATE_FILE = '_export_state.json'
+
+# Declared SQLite column types -> Arrow types, so every day file has the same schema
+SQLITE_TYPES = {'TEXT': 'string', 'REAL': 'float64', 'INTEGER': 'int64', 'BOOLEAN': 'bool_'}
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+class ParquetExporter:
+    """Writes the analytics tables as <out>/<table>/date=YYYY-MM-DD/part-0.parquet"""
+
+    def __init__(self, pool, export_dir, lookback_days: int = 1):
+        """
+        Args:
+            pool: ConnectionPool for the live analytics database
+            export_dir: Root directory of the Parquet dataset
+            lookback_days: Days before the high-water mark re-exported on each run, to
+                           pick up page exits and session ends that update rows in place
+        """
+        self.pool = pool
+        self.export_dir = Path(export_dir)
+        self.lookback_days = lookback_days
+
+    def _load_state(self) -> Dict[str, str]:
+        path = self.export_dir / STATE_FILE
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _save_state(self, state: Dict[str, str]):
+        path = self.export_dir / STATE_FILE
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, path)
+
+    def _column_types(self, conn, names: List[str]) -> Dict[str, Any]:
+        declared = {}
+        for source in ('sessions', 'social_referrals', 'conversions', 'page_views'):
+            for _, name, col_type, _, _, _ in conn.execute(f"PRAGMA table_info({source})"):
+                declared[name] = col_type
+        return {name: getattr(pa, SQLITE_TYPES.get(declared.get(name), 'string'))() for name in names}
+
+    def _write_day(self, table: str, day: str, names: List[str], types: Dict[str, Any], rows: List[tuple]):
+        _, _, time_columns, bool_columns = EXPORT_TABLES[table]
+        columns = {}
+        for i, name in enumerate(names):
+            values = [row[i] for row in rows]
+            if name in time_columns:
+                columns[name] = pa.array(
+                    [datetime.fromisoformat(value) if value else None for value in values], pa.timestamp('us')
+                )
+            elif name in bool_columns:
+                columns[name] = pa.array([None if value is None else bool(value) for value in values], pa.bool_())
+            else:
+                columns[name] = pa.array(values, types[name])
+
+        day_dir = self.export_dir / table / f"date={day}"
+        day_dir.mkdir(parents=True, exist_ok=True)
+        # Replace the day's file atomically so readers never see a partial partition
+        tmp = day_dir / 'part-0.parquet.tmp'
+        pq.write_table(pa.table(columns), tmp, compression='zstd')
+        os.replace(tmp, day_dir / 'part-0.parquet')
+
+    def export(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Export new and recently changed days of every table
+
+        Each table is exported from (high-water day - lookback) onwards; every day in
+        that range is rewritten whole, so re-running is safe and late updates to
+        recent rows are picked up.
+
+        Args:
+            full: Ignore the high-water marks and rewrite the whole dataset
+
+        Returns:
+            Dict of table -> days and rows written, plus the new high-water marks
+        """
+        _require_pyarrow()
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        state = {} if full else self._load_state()
+        summary = {}
+
+        for table, (query, column, _, _) in EXPORT_TABLES.items():
+            high_water = state.get(table)
+            since = ''
+            if high_water:
+                since = (datetime.fromisoformat(high_water).date() - timedelta(days=self.lookback_days)).isoformat()
+            if full:
+                shutil.rmtree(self.export_dir / table, ignore_errors=True)
+
+            days_written, rows_written = set(), 0
+            with self.pool.connection() as conn:
+                cursor = conn.execute(
+                    f"SELECT * FROM ({query}) WHERE {column} >= ? ORDER BY {column}", (since,)
+                )
+                names = [description[0] for description in cursor.description]
+                types = self._column_types(conn, names)
+                position = names.index(column)
+                for day, day_rows in groupby(cursor, key=lambda row: row[position][:10]):
+                    day_rows = list(day_rows)
+                    self._write_day(table, day, names, types, day_rows)
+                    days_written.add(day)
+                    rows_written += len(day_rows)
+                    high_water = max(high_water or '', day_rows[-1][position])
+
+            # Days in the re-exported range that no longer have rows
+            for day_dir in (self.export_dir / table).glob('date=*'):
+                day = day_dir.name[len('date='):]
+                if day >= since and day not in days_written:
+                    shutil.rmtree(day_dir)
+
+            if high_water:
+                state[table] = high_water
+            summary[table] = {'days': len(days_written), 'rows': rows_written, 'high_water': high_water}
+
+        self._save_state(state)
+        return summary
+
+
+class ParquetAnalytics(AnalyticsReports):
+    """The WebsiteAnalytics reports (get_*, generate_comprehensive_report) over a Parquet export"""
+
+    def __init__(self, export_dir):
+        if not (PYARROW_AVAILABLE and PANDAS_AVAILABLE):
+            raise ImportError("Offline reports need pyarrow and pandas: pip install pyarrow pandas")
+        self.export_dir = Path(export_dir)
+
+    def load(self, table: str, start: Optional[datetime] = None, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        """
+        One table as a DataFrame, reading only the day partitions from ``start`` on
+
+        Args:
+            table: One of EXPORT_TABLES
+            start: Keep rows whose partition column is at or after this time
+            columns: Columns to read (all by default)
+        """
+        path = self.export_dir / table
+        column = EXPORT_TABLES[table][1]
+        if not path.exists():
+            return pd.DataFrame(columns=columns or [])
+
+        dataset = ds.dataset(
+            path, format='parquet',
+            partitioning=ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+        )
+        row_filter = None
+        if start is not None:
+            # The date filter prunes whole files; the timestamp filter trims the first day
+            row_filter = (ds.field('date') >= start.date().isoformat()) & (ds.field(column) >= start)
+        return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+    def _report_rows(self, days: int, *names: str) -> Dict[str, List[tuple]]:
+        """REPORT_QUERIES rows computed with pandas, in the same shapes the rollups return"""
+        start = datetime.now() - timedelta(days=days)
+        rows = {}
+
+        if 'pages' in names or 'daily_pages' in names:
+            views = self.load('page_views', start, ['page_url', 'page_title', 'timestamp', 'exit_page', 'time_on_page'])
+            if 'pages' in names:
+                rows['pages'] = _to_rows(views.groupby(['page_url', 'page_title'], dropna=False).agg(
+                    views=('page_url', 'size'),
+                    exits=('exit_page', lambda exit_page: int(exit_page.eq(True).sum())),
+                    time_on_page_sum=('time_on_page', lambda time: time.sum(min_count=1)),
+                    time_on_page_count=('time_on_page', 'count')
+                ))
+            if 'daily_pages' in names:
+                day = pd.to_datetime(views['timestamp']).dt.strftime('%Y-%m-%d')
+                rows['daily_pages'] = _to_rows(views.groupby(day).size())
+
+        if 'sessions' in names:
+            sessions = self.load('sessions', start, [
+                'traffic_source', 'device_type', 'browser', 'is_new_user', 'bounce', 'page_views', 'duration'
+            ])
+            sessions['is_new_user'] = sessions['is_new_user'].map({True: 1, False: 0})
+            rows['sessions'] = _to_rows(
+                sessions.groupby(['traffic_source', 'device_type', 'browser', 'is_new_user'], dropna=False).agg(
+                    sessions=('bounce', 'size'),
+                    bounces=('bounce', lambda bounce: int(bounce.eq(True).sum())),
+                    page_views_sum=('page_views', lambda views: views.sum(min_count=1)),
+                    duration_sum=('duration', lambda duration: duration.sum(min_count=1)),
+                    duration_count=('duration', 'count')
+                )
+            )
+
+        if 'conversions' in names:
+            conversions = self.load('conversions', start, ['event_type', 'value'])
+            rows['conversions'] = _to_rows(conversions.groupby('event_type', dropna=False).agg(
+                conversions=('event_type', 'size'),
+                value_sum=('value', lambda value: value.sum(min_count=1))
+            ))
+
+        if 'social' in names:
+            social = self.load('social_referrals', start, ['platform'])
+            rows['social'] = _to_rows(social.groupby('platform', dropna=False).size())
+
+        return rows
+
+
+def _to_rows(grouped) -> List[tuple]:
+    """Grouped pandas result -> list of plain-Python tuples (index columns first, NaN as None)"""
+    frame = grouped.reset_index()
+    return [
+        tuple(None if isinstance(value, float) and value != value else value for value in row)
+        for row in frame.to_dict('split')['data']
+    ]
+
+
+def main():
+    from website_analytics import WebsiteAnalytics
+
+    parser = argparse.ArgumentParser(description='Export analytics to Parquet and report from the export')
+    parser.add_argument('command', choices=['export', 'report'])
+    parser.add_argument('--db', default='website_analytics.db', help='Live analytics database (export)')
+    parser.add_argument('--out', default='parquet', help='Parquet dataset directory')
+    parser.add_argument('--full', action='store_true', help='Rewrite the whole export')
+    parser.add_argument('--days', type=int, default=365, help='Report window in days (report)')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        summary = WebsiteAnalytics(args.db).export_parquet(args.out, full=args.full)
+        for table, result in summary.items():
+            print(f"📦 {table}: {result['rows']:,} rows in {result['days']} day partitions "
+                  f"(high-water {result['high_water']})")
+    else:
+        report = ParquetAnalytics(args.out).generate_comprehensive_report(args.days)
+        print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Monthly Partitions, Retention and Archival for Analytics Events
+Keeps only recent months of raw events in the hot database. Older months are moved
+to one SQLite file per month (integer epoch timestamps) and exported to compressed
+columnar files; reports over those months keep working from the daily rollups.
+
+Run from the analytics folder, e.g. from cron:
+    python partitions.py --retention-months 3
+"""
+
+import argparse
+import calendar
+import gzip
+import json
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+
+# Try to import pyarrow for Parquet exports, use gzipped columnar JSON if not available
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Raw tables split by month: table -> (partition column, text time columns stored as epoch)
+PARTITIONED_TABLES = {
+    'sessions': ('start_time', ('start_time', 'end_time')),
+    'page_views': ('timestamp', ('timestamp',)),
+    'conversions': ('timestamp', ('timestamp',)),
+    'custom_events': ('timestamp', ('timestamp',))
+}
+EVENT_TABLES = ('page_views', 'conversions', 'custom_events')
+
+
+def _month_bounds(month: str) -> Tuple[str, str]:
+    """'2026-07' -> ('2026-07-01', '2026-08-01')"""
+    year, mon = (int(part) for part in month.split('-'))
+    lo = date(year, mon, 1)
+    hi = date(year + mon // 12, mon % 12 + 1, 1)
+    return lo.isoformat(), hi.isoformat()
+
+
+def _shift_month(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _to_epoch(column: str) -> str:
+    # Times are recorded as naive server-local ISO text; they are stored as seconds
+    # since the epoch of that wall-clock time (read back with datetime.utcfromtimestamp)
+    return f"CAST(strftime('%s', {column}) AS INTEGER) AS {column}"
+
+
+def _naive_epoch(moment: datetime) -> int:
+    """Epoch seconds of a naive datetime, matching _to_epoch"""
+    return calendar.timegm(moment.timetuple())
+
+
+class PartitionManager:
+    """Moves whole months of raw events from the hot database into archive partitions"""
+
+    def __init__(self, pool, rollups, archive_dir, retention_months: int = 3):
+        """
+        Args:
+            pool: ConnectionPool for the hot analytics database
+            rollups: DailyRollups for the same database; a month is only archived
+                     once all of its days are rolled up
+            archive_dir: Directory for the per-month database and export files
+            retention_months: Whole months kept in the hot database besides the current one
+        """
+        self.pool = pool
+        self.rollups = rollups
+        self.archive_dir = Path(archive_dir)
+        self.retention_months = retention_months
+        self.init_tables()
+
+    def init_tables(self):
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS partitions (
+                    month TEXT PRIMARY KEY,
+                    archive_path TEXT NOT NULL,
+                    export_paths TEXT NOT NULL,
+                    row_counts TEXT NOT NULL,
+                    archived_at TEXT NOT NULL
+                )
+            ''')
+
+    def partition_path(self, month: str) -> Path:
+        return self.archive_dir / f"analytics_{month.replace('-', '_')}.db"
+
+    def hot_months(self) -> List[str]:
+        """Months ('YYYY-MM') that still have raw rows in the hot database"""
+        months = set()
+        with self.pool.connection() as conn:
+            for table, (column, _) in PARTITIONED_TABLES.items():
+                rows = conn.execute(f"SELECT DISTINCT substr({column}, 1, 7) FROM {table}").fetchall()
+                months.update(row[0] for row in rows if row[0])
+        return sorted(months)
+
+    def list_partitions(self) -> List[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            rows = conn.execute('''
+                SELECT month, archive_path, export_paths, row_counts, archived_at
+                FROM partitions ORDER BY month
+            ''').fetchall()
+        return [
+            {
+                'month': month,
+                'archive_path': archive_path,
+                'export_paths': json.loads(export_paths),
+                'row_counts': json.loads(row_counts),
+                'archived_at': archived_at
+            }
+            for month, archive_path, export_paths, row_counts, archived_at in rows
+        ]
+
+    def _create_partition_tables(self, conn):
+        for table, (column, time_columns) in PARTITIONED_TABLES.items():
+            columns = [
+                f"{name} {'INTEGER' if name in time_columns else col_type}{' PRIMARY KEY' if pk else ''}"
+                for _, name, col_type, _, _, pk in conn.execute(f"PRAGMA main.table_info({table})")
+            ]
+            conn.execute(f"CREATE TABLE IF NOT EXISTS part.{table} ({', '.join(columns)})")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS part.idx_{table}_{column} ON {table} ({column})")
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS part.social_referrals (
+                session_id TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                campaign TEXT,
+                organic BOOLEAN
+            )
+        ''')
+
+    def archive_month(self, month: str) -> Dict[str, Any]:
+        """
+        Move one completed month of raw events out of the hot database
+
+        Rows move a session at a time: every session that started in the month moves
+        with all of its events, except a session still running past the month end,
+        which stays hot (with its events) and moves with the next month instead.
+        Events without a session row move by their own timestamp.
+
+        The rows are copied into the month's partition file (time columns as integer
+        epoch seconds) and exported to compressed columnar files; only then are they
+        deleted from the hot tables. Re-running for a month is safe.
+
+        Args:
+            month: 'YYYY-MM'
+
+        Returns:
+            Dict with the partition path, export paths and per-table row counts
+        """
+        lo, hi = _month_bounds(month)
+        if hi > date.today().replace(day=1).isoformat():
+            raise ValueError(f"Cannot archive {month}: the month is not over yet")
+
+        # Reports over archived days read the rollups, so they must be complete first
+        self.rollups.compact()
+        watermark = self.rollups.get_watermark()
+        if watermark is None or watermark < date.fromisoformat(hi) - timedelta(days=1):
+            raise ValueError(f"Cannot archive {month}: rollups are not compacted through the end of the month")
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = self.partition_path(month)
+        # Sessions left hot by earlier months because they ran past their month end
+        # are picked up here as well
+        archived_before = self.rollups.get_archived_before()
+        leftovers_before = min(lo, archived_before.isoformat()) if archived_before else lo
+        session_filter = "session_id IN (SELECT id FROM temp.archive_sessions)"
+        row_filters = {
+            'sessions': ("id IN (SELECT id FROM temp.archive_sessions)", ()),
+            **{
+                table: ('''
+                    timestamp < ? AND (session_id IN (SELECT id FROM temp.archive_sessions)
+                        OR (timestamp >= ? AND session_id NOT IN (SELECT id FROM main.sessions)))
+                ''', (hi, lo))
+                for table in EVENT_TABLES
+            }
+        }
+
+        with self.pool.connection() as conn:
+            conn.execute("ATTACH DATABASE ? AS part", (str(archive_path),))
+            try:
+                # 1. Pick the sessions to move and copy them into the partition file
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS temp.archive_sessions")
+                    running_past_month = ' OR '.join(
+                        f"EXISTS (SELECT 1 FROM main.{table} WHERE session_id = s.id AND timestamp >= ?)"
+                        for table in EVENT_TABLES
+                    )
+                    conn.execute(f'''
+                        CREATE TEMP TABLE archive_sessions AS
+                        SELECT id FROM main.sessions s
+                        WHERE start_time < ? AND (start_time >= ? OR start_time < ?)
+                            AND COALESCE(end_time, start_time) < ?
+                            AND NOT ({running_past_month})
+                    ''', (hi, lo, leftovers_before, hi) + (hi,) * len(EVENT_TABLES))
+
+                    self._create_partition_tables(conn)
+                    for table, (_, time_columns) in PARTITIONED_TABLES.items():
+                        names = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+                        select = ', '.join(_to_epoch(name) if name in time_columns else name for name in names)
+                        where, params = row_filters[table]
+                        conn.execute(f'''
+                            INSERT OR REPLACE INTO part.{table} ({', '.join(names)})
+                            SELECT {select} FROM main.{table} WHERE {where}
+                        ''', params)
+                    conn.execute(f"DELETE FROM part.social_referrals WHERE {session_filter}")
+                    conn.execute(f'''
+                        INSERT INTO part.social_referrals (session_id, platform, campaign, organic)
+                        SELECT session_id, platform, campaign, organic FROM main.social_referrals
+                        WHERE {session_filter}
+                    ''')
+
+                # 2. Export the partition to columnar files
+                row_counts, export_paths = {}, []
+                for table in list(PARTITIONED_TABLES) + ['social_referrals']:
+                    cursor = conn.execute(f"SELECT * FROM part.{table}")
+                    names = [description[0] for description in cursor.description]
+                    rows = cursor.fetchall()
+                    row_counts[table] = len(rows)
+                    export_paths.append(str(self._export_columnar(month, table, names, rows)))
+
+                # 3. Drop the month from the hot tables
+                with conn:
+                    conn.execute(f"DELETE FROM main.social_referrals WHERE {session_filter}")
+                    # Events before the sessions they are looked up by
+                    for table in reversed(PARTITIONED_TABLES):
+                        where, params = row_filters[table]
+                        conn.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+                    conn.execute('''
+                        INSERT OR REPLACE INTO main.partitions
+                            (month, archive_path, export_paths, row_counts, archived_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (month, str(archive_path), json.dumps(export_paths), json.dumps(row_counts),
+                          datetime.now().isoformat()))
+                    conn.execute('''
+                        INSERT INTO main.rollup_state (key, value) VALUES ('archived_before', ?)
+                        ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+                    ''', (hi,))
+                    self.rollups.bump_data_version(conn.cursor())
+            finally:
+                conn.execute("DROP TABLE IF EXISTS temp.archive_sessions")
+                conn.execute("DETACH DATABASE part")
+
+        return {'month': month, 'archive_path': str(archive_path), 'export_paths': export_paths,
+                'row_counts': row_counts}
+
+    def _export_columnar(self, month: str, table: str, names: List[str], rows: List[tuple]) -> Path:
+        """Write one table of a partition column by column (Parquet, or gzipped JSON arrays)"""
+        stem = f"{table}_{month.replace('-', '_')}"
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+        if PYARROW_AVAILABLE:
+            path = self.archive_dir / f"{stem}.parquet"
+            pq.write_table(pa.table(columns), path, compression='zstd')
+        else:
+            path = self.archive_dir / f"{stem}.columns.json.gz"
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump({'table': table, 'month': month, 'rows': len(rows), 'columns': columns}, f)
+        return path
+
+    def apply_retention(self, retention_months: Optional[int] = None, vacuum: bool = True) -> Dict[str, Any]:
+        """
+        Archive every month older than the retention window and shrink the hot file
+
+        Args:
+            retention_months: Override the configured number of whole months kept hot
+            vacuum: Reclaim the freed pages afterwards (rewrites the hot database)
+
+        Returns:
+            Dict with the archived months and the hot database size before and after
+        """
+        keep = self.retention_months if retention_months is None else retention_months
+        cutoff = _shift_month(date.today().replace(day=1), -keep).isoformat()[:7]
+        db_path = self.pool.db_path
+        size_before = db_path.stat().st_size if db_path.exists() else 0
+
+        # Months before archived_before only hold sessions that ran past their month
+        # end; they move with the next month
+        archived_before = self.rollups.get_archived_before()
+        skip_before = archived_before.isoformat()[:7] if archived_before else ''
+        archived = [
+            self.archive_month(month)['month']
+            for month in self.hot_months() if skip_before <= month < cutoff
+        ]
+
+        if archived and vacuum:
+            with self.pool.connection() as conn:
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        return {
+            'archived_months': archived,
+            'kept_from': cutoff,
+            'size_before_bytes': size_before,
+            'size_after_bytes': db_path.stat().st_size if db_path.exists() else 0
+        }
+
+    def iter_archived_rows(self, table: str, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Raw rows of an archived table in [start, end), opening only the overlapping months
+
+        Sessions that ran past a month end are archived with the next month, so the
+        month after ``end`` is opened too. Time columns are returned as integer epoch
+        seconds, as stored in the partitions.
+        """
+        if table not in PARTITIONED_TABLES:
+            raise ValueError(f"{table} is not a partitioned table")
+        column = PARTITIONED_TABLES[table][0]
+        first_month = start.strftime('%Y-%m')
+        last_month = _shift_month(end.date(), 1).isoformat()[:7]
+
+        for partition in self.list_partitions():
+            if not first_month <= partition['month'] <= last_month:
+                continue
+            conn = sqlite3.connect(f"file:{partition['archive_path']}?mode=ro", uri=True)
+            try:
+                cursor = conn.execute(
+                    f"SELECT * FROM {table} WHERE {column} >= ? AND {column} < ? ORDER BY {column}",
+                    (_naive_epoch(start), _naive_epoch(end))
+                )
+                names = [description[0] for description in cursor.description]
+                for row in cursor:
+                    yield dict(zip(names, row))
+            finally:
+                conn.close()
+
+
+def main():
+    from website_analytics import WebsiteAnalytics
+
+    parser = argparse.ArgumentParser(description='Archive old analytics months and apply retention')
+    parser.add_argument('--db', default='website_analytics.db', help='Hot analytics database')
+    parser.add_argument('--retention-months', type=int, default=3, help='Whole months kept in the hot database')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM after archiving')
+    parser.add_argument('--list', action='store_true', help='List archived partitions and exit')
+    args = parser.parse_args()
+
+    analytics = WebsiteAnalytics(args.db)
+
+    if args.list:
+        for partition in analytics.partitions.list_partitions():
+            print(f"📦 {partition['month']}: {partition['row_counts']} -> {partition['archive_path']}")
+        return
+
+    result = analytics.apply_retention(args.retention_months, vacuum=not args.no_vacuum)
+    print(f"🗄️ Archived months: {', '.join(result['archived_months']) or 'none'} (keeping {result['kept_from']} onwards)")
+    print(f"💾 Hot database: {result['size_before_bytes'] / 1024:.0f} KB -> {result['size_after_bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
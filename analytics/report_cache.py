@@ -0,0 +1,93 @@
+"""
+Report Result Cache
+Keeps recently computed reports and dashboard pages in memory, keyed by the
+report parameters and the data watermark, so repeated loads do not re-scan SQLite
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+class ReportCache:
+    """TTL- and size-bounded LRU cache; concurrent misses for one key compute once"""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 32):
+        """
+        Args:
+            ttl_seconds: Maximum age of a cached result, which also bounds how far a
+                         report's "last N days" window can drift
+            max_entries: Least recently used entries are evicted beyond this
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def _lookup(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key`` or compute and store it
+
+        Viewers that miss on the same key at the same time wait for the first one's
+        result instead of all running the queries.
+
+        Args:
+            key: Report parameters plus the data watermark they were computed at
+            compute: Builds the value on a miss
+
+        Returns:
+            The cached or freshly computed value (shared; callers must not mutate it)
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another viewer may have filled it while we waited
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry[1]
+
+            value = compute()
+            with self._lock:
+                self.stats['misses'] += 1
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+                self._key_locks.pop(key, None)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
@@ -0,0 +1,391 @@
+"""
+Daily Rollup Tables for Analytics Reports
+Pre-aggregates page views, sessions, conversions and social referrals per day so
+reports read O(days) rollup rows plus the raw rows of the current day instead of
+scanning every event in the window
+"""
+
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    """One rollup table: which raw rows it aggregates, by which dimensions"""
+    table: str
+    source: str
+    time_column: str
+    dimensions: Tuple[Tuple[str, str], ...]  # (raw SQL expression, rollup column)
+    measures: Tuple[Tuple[str, str], ...]    # (raw SQL aggregate, rollup column)
+
+
+PAGE_STATS = RollupSpec(
+    table='daily_page_stats',
+    source='page_views',
+    time_column='timestamp',
+    dimensions=(('page_url', 'page_url'), ('page_title', 'page_title')),
+    measures=(
+        ('COUNT(*)', 'views'),
+        ('COUNT(CASE WHEN exit_page = 1 THEN 1 END)', 'exits'),
+        ('SUM(time_on_page)', 'time_on_page_sum'),
+        ('COUNT(time_on_page)', 'time_on_page_count')
+    )
+)
+
+SESSION_STATS = RollupSpec(
+    table='daily_session_stats',
+    source='sessions',
+    time_column='start_time',
+    dimensions=(
+        ('traffic_source', 'traffic_source'), ('device_type', 'device_type'),
+        ('browser', 'browser'), ('is_new_user', 'is_new_user')
+    ),
+    measures=(
+        ('COUNT(*)', 'sessions'),
+        ('COUNT(CASE WHEN bounce = 1 THEN 1 END)', 'bounces'),
+        ('SUM(page_views)', 'page_views_sum'),
+        ('SUM(duration)', 'duration_sum'),
+        ('COUNT(duration)', 'duration_count')
+    )
+)
+
+CONVERSION_STATS = RollupSpec(
+    table='daily_conversion_stats',
+    source='conversions',
+    time_column='timestamp',
+    dimensions=(('event_type', 'event_type'),),
+    measures=(('COUNT(*)', 'conversions'), ('SUM(value)', 'value_sum'))
+)
+
+SOCIAL_STATS = RollupSpec(
+    table='daily_social_stats',
+    source='social_referrals sr JOIN sessions s ON sr.session_id = s.id',
+    time_column='s.start_time',
+    dimensions=(('sr.platform', 'platform'),),
+    measures=(('COUNT(*)', 'sessions'),)
+)
+
+ROLLUP_SPECS = (PAGE_STATS, SESSION_STATS, CONVERSION_STATS, SOCIAL_STATS)
+
+# Queries behind the reports: name -> (spec, by_date, dimensions)
+REPORT_QUERIES = {
+    'pages': (PAGE_STATS, False, True),
+    'daily_pages': (PAGE_STATS, True, False),
+    'sessions': (SESSION_STATS, False, True),
+    'conversions': (CONVERSION_STATS, False, True),
+    'social': (SOCIAL_STATS, False, True)
+}
+
+
+class DailyRollups:
+    """Maintains the daily rollup tables and answers windowed queries from them"""
+
+    def __init__(self, pool, lookback_days: int = 2):
+        """
+        Args:
+            pool: ConnectionPool for the analytics database
+            lookback_days: Already-compacted days recomputed on each compaction, to pick
+                           up late updates (page exits, session end) to recent rows
+        """
+        self.pool = pool
+        self.lookback_days = lookback_days
+        self._compact_lock = threading.Lock()
+        self._fresh_on: Optional[date] = None
+        # Set False to leave compaction to an explicit compact() call (e.g. a cron job)
+        self.auto_compact = True
+        self.init_tables()
+
+    def init_tables(self):
+        with self.pool.transaction() as cursor:
+            for spec in ROLLUP_SPECS:
+                columns = ['date TEXT NOT NULL']
+                columns += [f'{name}' for _, name in spec.dimensions]
+                columns += [f'{name} REAL' if name.endswith('_sum') else f'{name} INTEGER NOT NULL'
+                            for _, name in spec.measures]
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {spec.table} ({', '.join(columns)})")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{spec.table}_date ON {spec.table} (date)")
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS rollup_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+
+    def get_watermark(self) -> Optional[date]:
+        """Last day whose rollup rows are complete, or None before the first compaction"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM rollup_state WHERE key = 'rolled_through'").fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def get_archived_before(self) -> Optional[date]:
+        """First day whose raw rows are still in the hot database (see partitions.py)"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM rollup_state WHERE key = 'archived_before'").fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def data_watermark(self) -> tuple:
+        """
+        Cheap marker that changes whenever report data may have changed
+
+        Combines the last row id of each raw table (new events), the ingest data
+        version (page exits and other in-place updates) and the rollup watermark.
+        """
+        with self.pool.connection() as conn:
+            return conn.execute('''
+                SELECT
+                    (SELECT MAX(rowid) FROM page_views),
+                    (SELECT MAX(rowid) FROM sessions),
+                    (SELECT MAX(rowid) FROM conversions),
+                    (SELECT value FROM rollup_state WHERE key = 'data_version'),
+                    (SELECT value FROM rollup_state WHERE key = 'rolled_through')
+            ''').fetchone()
+
+    def bump_data_version(self, cursor):
+        """Record a write to the raw tables (call inside the writing transaction)"""
+        cursor.execute('''
+            INSERT INTO rollup_state (key, value) VALUES ('data_version', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        ''')
+
+    def _first_event_day(self, cursor) -> Optional[date]:
+        days = []
+        for spec in (PAGE_STATS, SESSION_STATS, CONVERSION_STATS):
+            value = cursor.execute(f"SELECT MIN({spec.time_column}) FROM {spec.source}").fetchone()[0]
+            if value:
+                days.append(datetime.fromisoformat(value).date())
+        return min(days) if days else None
+
+    def _rebuild_day(self, cursor, day: date):
+        lo, hi = day.isoformat(), (day + timedelta(days=1)).isoformat()
+        for spec in ROLLUP_SPECS:
+            dims = ', '.join(expr for expr, _ in spec.dimensions)
+            select = ', '.join([expr for expr, _ in spec.dimensions] + [expr for expr, _ in spec.measures])
+            cursor.execute(f"DELETE FROM {spec.table} WHERE date = ?", (lo,))
+            cursor.execute(f'''
+                INSERT INTO {spec.table}
+                SELECT ?, {select}
+                FROM {spec.source}
+                WHERE {spec.time_column} >= ? AND {spec.time_column} < ?
+                GROUP BY {dims}
+            ''', (lo, lo, hi))
+
+    def compact(self, full: bool = False) -> Dict[str, int]:
+        """
+        Roll up every completed day not yet compacted (plus the lookback days)
+
+        Each day is rebuilt from the raw tables in its own short transaction, so the
+        ingest writer is never blocked for long.
+
+        Args:
+            full: Rebuild all days from the first recorded event
+
+        Returns:
+            Dict with the number of days rebuilt
+        """
+        with self._compact_lock:
+            yesterday = date.today() - timedelta(days=1)
+            watermark = None if full else self.get_watermark()
+            # Days before this were archived: their raw rows are gone, the rollups stay
+            archived_before = self.get_archived_before()
+
+            if watermark is None:
+                with self.pool.connection() as conn:
+                    first_day = self._first_event_day(conn.cursor())
+                if full:
+                    with self.pool.transaction() as cursor:
+                        for spec in ROLLUP_SPECS:
+                            cursor.execute(f"DELETE FROM {spec.table} WHERE date >= ?",
+                                           ((archived_before or date.min).isoformat(),))
+                        # Reports fall back to raw rows until days are rebuilt
+                        cursor.execute("DELETE FROM rollup_state WHERE key = 'rolled_through'")
+                start = first_day or yesterday
+            else:
+                start = watermark - timedelta(days=self.lookback_days - 1)
+            if archived_before:
+                start = max(start, archived_before)
+
+            rebuilt = 0
+            day = start
+            while day <= yesterday:
+                with self.pool.transaction() as cursor:
+                    self._rebuild_day(cursor, day)
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('rolled_through', ?)
+                    ''', (max(day, watermark or day).isoformat(),))
+                rebuilt += 1
+                day += timedelta(days=1)
+
+            self._fresh_on = date.today()
+            return {'days_rebuilt': rebuilt}
+
+    def rewind(self, day: date) -> bool:
+        """
+        Mark rollups from ``day`` on as stale so the next compact() rebuilds them
+
+        Returns:
+            True if already-compacted days were affected
+        """
+        watermark = self.get_watermark()
+        if watermark is None or day > watermark:
+            return False
+        # compact() restarts lookback_days before the watermark; never move it forward
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                UPDATE rollup_state SET value = MIN(value, ?) WHERE key = 'rolled_through'
+            ''', ((day + timedelta(days=self.lookback_days - 1)).isoformat(),))
+        return True
+
+    def mark_stale(self, cursor, day: date) -> bool:
+        """
+        Record an in-place update to raw rows of ``day`` (call inside the writing transaction)
+
+        The watermark moves back to the day before, so reports read that day and later
+        ones from the raw rows until the next compact() rebuilds them.
+
+        Returns:
+            True if already-compacted days were affected
+        """
+        cursor.execute('''
+            UPDATE rollup_state SET value = ? WHERE key = 'rolled_through' AND value >= ?
+        ''', ((day - timedelta(days=1)).isoformat(), day.isoformat()))
+        return cursor.rowcount == 1
+
+    def ensure_fresh(self):
+        """
+        Compact once per calendar day, and again after mark_stale() moved the
+        watermark back; concurrent callers do not wait for it
+        """
+        if not self.auto_compact:
+            return
+        if self._fresh_on == date.today():
+            watermark = self.get_watermark()
+            if watermark is None or watermark >= date.today() - timedelta(days=1):
+                return
+        if self._compact_lock.locked():
+            return
+        self.compact()
+
+    def _window(self, start_date: str) -> Tuple[List[str], List[str], list]:
+        """
+        Split a ``>= start_date`` window into rolled-up days and raw remainder
+
+        Whole days after the (partial) first day and up to the watermark come from
+        the rollup tables; the partial first day and everything after the watermark
+        come from raw rows, so results match a full raw scan exactly (in-place updates
+        to compacted days move the watermark back, see mark_stale). A first day that
+        has been archived is read whole from the rollup instead.
+        """
+        watermark = self.get_watermark()
+        first_day = datetime.fromisoformat(start_date).date()
+        roll_from = first_day + timedelta(days=1)
+        archived_before = self.get_archived_before()
+        if archived_before and first_day < archived_before:
+            # The first day's raw rows are archived; count the whole day from the rollup
+            roll_from = first_day
+        if watermark is None or roll_from > watermark:
+            return [], ['{t} >= ?'], [start_date]
+        roll_after = (watermark + timedelta(days=1)).isoformat()
+        return (
+            [roll_from.isoformat(), watermark.isoformat()],
+            ['{t} >= ?', '({t} < ? OR {t} >= ?)'],
+            [start_date, roll_from.isoformat(), roll_after]
+        )
+
+    def _query_sql(self, spec: RollupSpec, window, by_date: bool, dimensions: bool) -> Tuple[str, list]:
+        roll_range, raw_conditions, raw_params = window
+
+        dim_names, raw_dims, raw_group = [], [], []
+        if by_date:
+            dim_names.append('date')
+            raw_dims.append(f'DATE({spec.time_column}) AS date')
+            raw_group.append(f'DATE({spec.time_column})')
+        if dimensions:
+            dim_names += [name for _, name in spec.dimensions]
+            raw_dims += [f'{expr} AS {name}' for expr, name in spec.dimensions]
+            raw_group += [expr for expr, _ in spec.dimensions]
+        measure_names = [name for _, name in spec.measures]
+        group_by = lambda columns: f"GROUP BY {', '.join(columns)}" if columns else ''
+
+        where = ' AND '.join(c.format(t=spec.time_column) for c in raw_conditions)
+        parts = [f'''
+            SELECT {', '.join(raw_dims + [f'{expr} AS {name}' for expr, name in spec.measures])}
+            FROM {spec.source}
+            WHERE {where}
+            {group_by(raw_group)}
+        ''']
+        params = list(raw_params)
+        if roll_range:
+            parts.append(f'''
+                SELECT {', '.join(dim_names + measure_names)}
+                FROM {spec.table}
+                WHERE date BETWEEN ? AND ?
+            ''')
+            params += roll_range
+
+        sql = f'''
+            SELECT {', '.join(dim_names + [f'SUM({name})' for name in measure_names])}
+            FROM ({' UNION ALL '.join(parts)})
+            {group_by(dim_names)}
+        '''
+        return sql, params
+
+    def query(self, spec: RollupSpec, start_date: str, by_date: bool = False,
+              dimensions: bool = True) -> List[tuple]:
+        """
+        Aggregate a rollup over the window starting at ``start_date``
+
+        Args:
+            spec: Which rollup to read
+            start_date: ISO timestamp; same semantics as ``time_column >= start_date``
+            by_date: Also group by day (date becomes the first column)
+            dimensions: Group by the rollup's dimensions (False gives window or per-day totals)
+
+        Returns:
+            Rows of ([date,] dimensions..., summed measures...), unordered
+        """
+        self.ensure_fresh()
+        sql, params = self._query_sql(spec, self._window(start_date), by_date, dimensions)
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_many(self, start_date: str, queries: Dict[str, tuple]) -> Dict[str, List[tuple]]:
+        """
+        Run several rollup queries over one window as a single statement
+
+        Each query becomes a CTE; the results are returned through one UNION ALL
+        (tagged and NULL-padded to a common width), so a whole report is one round
+        trip over one consistent snapshot.
+
+        Args:
+            start_date: ISO timestamp window start
+            queries: name -> (spec, by_date, dimensions)
+
+        Returns:
+            name -> rows, as ``query`` would return them
+        """
+        self.ensure_fresh()
+        window = self._window(start_date)
+
+        ctes, params, widths = [], [], {}
+        for name, (spec, by_date, dimensions) in queries.items():
+            sql, query_params = self._query_sql(spec, window, by_date, dimensions)
+            # Prefixed so report names cannot shadow the tables the CTEs read
+            ctes.append(f"q_{name} AS ({sql})")
+            params += query_params
+            widths[name] = int(by_date) + (len(spec.dimensions) if dimensions else 0) + len(spec.measures)
+
+        width = max(widths.values())
+        selects = [
+            f"SELECT '{name}', *{', NULL' * (width - widths[name])} FROM q_{name}"
+            for name in queries
+        ]
+        sql = f"WITH {', '.join(ctes)} {' UNION ALL '.join(selects)}"
+
+        results = {name: [] for name in queries}
+        with self.pool.connection() as conn:
+            for row in conn.execute(sql, params):
+                results[row[0]].append(row[1:1 + widths[row[0]]])
+        return results
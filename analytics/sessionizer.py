@@ -0,0 +1,377 @@
+"""
+Sessionization Engine for Website Analytics
+Derives session rows (start/end, page count, duration, bounce, exit pages) from the
+raw page views with an inactivity-gap rule, in one pass over the views sorted by
+user and time, instead of keeping sessions up to date with an UPDATE per event
+"""
+
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+
+# A session ends after this much inactivity (time since the last page view plus its time on page)
+DEFAULT_GAP_MINUTES = 30
+
+# Same rule as WebsiteAnalytics.end_session: one page view and under 10 seconds
+BOUNCE_SECONDS = 10
+
+# Tables whose newly ingested rows decide which sessions an incremental run rebuilds
+TRACKED_TABLES = ('page_views', 'conversions', 'custom_events')
+
+
+class Sessionizer:
+    """Rebuilds the sessions table from page_views, fully or incrementally"""
+
+    def __init__(self, pool, rollups, classify_referrer=None, gap_minutes: int = DEFAULT_GAP_MINUTES):
+        """
+        Args:
+            pool: ConnectionPool for the analytics database
+            rollups: DailyRollups to rebuild for the days whose sessions changed
+            classify_referrer: referrer -> traffic source, for sessions that have no
+                               row yet (existing rows keep the source set at ingest)
+            gap_minutes: Inactivity that starts a new session
+        """
+        self.pool = pool
+        self.rollups = rollups
+        self.classify_referrer = classify_referrer or (lambda referrer: 'referral' if referrer else 'direct')
+        self.gap = timedelta(minutes=gap_minutes)
+        self._fresh_at: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def get_watermark(self) -> Optional[str]:
+        """Timestamp of the newest page view already sessionized"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM rollup_state WHERE key = 'sessionized_through'").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _read_marks(cursor) -> Dict[str, int]:
+        """
+        Highest rowid of each tracked table already sessionized
+
+        Ingest is not in event-time order (batched events are back-dated to the
+        client's clock), so progress is tracked by insertion order, not by time.
+        """
+        marks = {}
+        for table in TRACKED_TABLES:
+            row = cursor.execute(
+                "SELECT value FROM rollup_state WHERE key = ?", (f'sessionized_rowid_{table}',)
+            ).fetchone()
+            mark = int(row[0]) if row else 0
+            # Rowids restart when archiving empties a table
+            max_rowid = cursor.execute(f'SELECT MAX(rowid) FROM {table}').fetchone()[0] or 0
+            marks[table] = mark if mark <= max_rowid else 0
+        return marks
+
+    @staticmethod
+    def mark_dirty(cursor, view_timestamp: str):
+        """
+        Record an in-place update (a page exit) to a view that may already be
+        sessionized, so the next run rebuilds its session (call inside the writing
+        transaction); the count lets a run clear only the marks it has seen
+        """
+        cursor.execute('''
+            INSERT INTO rollup_state (key, value) VALUES ('sessionize_dirty_since', ?)
+            ON CONFLICT(key) DO UPDATE SET value = MIN(value, excluded.value)
+        ''', (view_timestamp,))
+        cursor.execute('''
+            INSERT INTO rollup_state (key, value) VALUES ('sessionize_dirty_count', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        ''')
+
+    @staticmethod
+    def _read_dirty(cursor) -> tuple:
+        """(earliest updated view timestamp, update count) recorded by mark_dirty(), or (None, None)"""
+        rows = dict(cursor.execute('''
+            SELECT key, value FROM rollup_state
+            WHERE key IN ('sessionize_dirty_since', 'sessionize_dirty_count')
+        ''').fetchall())
+        return rows.get('sessionize_dirty_since'), rows.get('sessionize_dirty_count')
+
+    def _window_start(self, cursor, marks: Optional[Dict[str, int]], dirty_since: Optional[str]) -> Optional[str]:
+        """
+        Page views from this time on, plus every view of a session that reaches it, are
+        re-read so every session a newly ingested row or an updated view can belong to
+        or extend is rebuilt whole; '' rebuilds everything, None means there is nothing
+        to sessionize
+        """
+        if marks is None:
+            return ''
+        earliest = dirty_since
+        for table in TRACKED_TABLES:
+            row = cursor.execute(f'SELECT MIN(timestamp) FROM {table} WHERE rowid > ?', (marks[table],)).fetchone()
+            if row[0] and (earliest is None or row[0] < earliest):
+                earliest = row[0]
+        if earliest is None:
+            return None
+        # Sessions that ended more than one gap before the earliest new or updated row are final
+        return (datetime.fromisoformat(earliest) - self.gap).isoformat()
+
+    def sessionize(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Derive sessions from page views
+
+        Page views are read once, sorted by (user, time); a view more than the gap
+        after the previous activity of the same user opens a new session. Each
+        session keeps the id of the client session it started in (continuations
+        split off by the gap get '<id>-2', '<id>-3', ...), and the device, browser,
+        new-user flag and traffic source recorded for that client session.
+
+        Args:
+            full: Rebuild every session instead of resuming from the watermark
+
+        Returns:
+            Dict with the window start, page views read and sessions written
+        """
+        with self._lock:
+            return self._sessionize(full)
+
+    def _sessionize(self, full: bool) -> Dict[str, Any]:
+        # The reads below run before the first write opens the transaction, so the
+        # ingest writer is only blocked while the rebuilt rows are written
+        with self.pool.transaction() as cursor:
+            # Read before the views, so an update landing after this is not cleared unseen
+            dirty_since, dirty_count = self._read_dirty(cursor)
+            marks = None if full else self._read_marks(cursor)
+            cutoff = self._window_start(cursor, marks, dirty_since)
+            if cutoff is None:
+                self._fresh_at = self.rollups.data_watermark()[:4]
+                return {'since': None, 'page_views': 0, 'sessions': 0, 'merged': 0}
+
+            # Views after the cutoff and every view of a session still active at it
+            # (a UNION so both halves use their index)
+            in_window = '''
+                rowid IN (
+                    SELECT rowid FROM page_views WHERE timestamp >= :cutoff
+                    UNION
+                    SELECT rowid FROM page_views
+                    WHERE session_id IN (SELECT id FROM sessions WHERE end_time >= :cutoff)
+                )
+            '''
+            # Client session rows of the views in the window: their attributes are kept.
+            # Rows not sessionized yet or still active at the cutoff are rebuilt; older
+            # rows (a client session id reused after the gap) keep their id and views
+            attributes, rebuilt = {}, set()
+            for row in cursor.execute(f'''
+                SELECT id, device_type, browser, operating_system, traffic_source, is_new_user, end_time
+                FROM sessions
+                WHERE id IN (SELECT DISTINCT session_id FROM page_views WHERE {in_window})
+            ''', {'cutoff': cutoff}):
+                attributes[row[0]] = row[1:6]
+                if row[6] is None or row[6] >= cutoff:
+                    rebuilt.add(row[0])
+            views = cursor.execute(f'''
+                SELECT rowid, session_id, user_id, timestamp, referrer, time_on_page, exit_page
+                FROM page_views
+                WHERE {in_window}
+                ORDER BY user_id, timestamp
+            ''', {'cutoff': cutoff}).fetchall()
+            since = min([cutoff] + [view[3] for view in views]) if cutoff else ''
+
+            def taken(session_id: str) -> bool:
+                # Session rows outside the window keep their ids
+                return session_id not in rebuilt and cursor.execute(
+                    'SELECT 1 FROM sessions WHERE id = ?', (session_id,)
+                ).fetchone() is not None
+
+            sessions, view_updates, remapped, used_ids = [], [], {}, set()
+            for user_id, user_views in groupby(views, key=lambda view: view[2]):
+                run: List[tuple] = []
+                for view in user_views:
+                    seen_at = datetime.fromisoformat(view[3])
+                    if run and seen_at - last_activity > self.gap:
+                        sessions.append(self._close(run, user_id, attributes, used_ids, view_updates,
+                                                    remapped, taken))
+                        run = []
+                    if not run:
+                        last_activity = seen_at
+                    run.append(view)
+                    last_activity = max(last_activity, seen_at + timedelta(seconds=view[5] or 0))
+                sessions.append(self._close(run, user_id, attributes, used_ids, view_updates, remapped, taken))
+
+            # Conversions and custom events belong to the user's session in progress
+            event_updates = {}
+            for table in ('conversions', 'custom_events'):
+                event_updates[table] = self._assign_events(cursor, table, since, cutoff, sessions)
+            for session in sessions:
+                session['conversions'] = 0
+
+            self._write(cursor, rebuilt, sessions, view_updates, event_updates)
+            for table in TRACKED_TABLES:
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO rollup_state (key, value)
+                    SELECT 'sessionized_rowid_{table}', COALESCE(MAX(rowid), 0) FROM {table}
+                ''')
+            if views:
+                cursor.execute('''
+                    INSERT INTO rollup_state (key, value) VALUES ('sessionized_through', ?)
+                    ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+                ''', (max(view[3] for view in views),))
+            if dirty_count is not None:
+                cursor.execute('''
+                    DELETE FROM rollup_state
+                    WHERE key IN ('sessionize_dirty_since', 'sessionize_dirty_count')
+                      AND (SELECT value FROM rollup_state WHERE key = 'sessionize_dirty_count') = ?
+                ''', (dirty_count,))
+            self.rollups.bump_data_version(cursor)
+
+        # Rollups of compacted days whose sessions or exit pages may have changed
+        if not since:
+            self.rollups.compact(full=True)
+        elif sessions and self.rollups.rewind(datetime.fromisoformat(since).date()):
+            self.rollups.compact()
+        self._fresh_at = self.rollups.data_watermark()[:4]
+        merged = {client_id for client_id in remapped if client_id not in used_ids}
+        return {'since': since or None, 'page_views': len(views), 'sessions': len(sessions), 'merged': len(merged)}
+
+    def _close(self, run, user_id, attributes, used_ids, view_updates, remapped, taken) -> Dict[str, Any]:
+        """Turn one run of page views into a session row and queue the view fixes"""
+        client_id = run[0][1]
+        session_id, n = client_id, 1
+        while session_id in used_ids or taken(session_id):
+            # Ids held by sessions outside the window count as used too
+            used_ids.add(session_id)
+            n += 1
+            session_id = f"{client_id}-{n}"
+        used_ids.add(session_id)
+
+        start = datetime.fromisoformat(run[0][3])
+        end = max(datetime.fromisoformat(view[3]) + timedelta(seconds=view[5] or 0) for view in run)
+        duration = (end - start).total_seconds()
+
+        for i, (rowid, view_session, _, _, _, _, exit_page) in enumerate(run):
+            is_exit = i == len(run) - 1
+            if view_session != session_id or bool(exit_page) != is_exit:
+                view_updates.append((session_id, is_exit, rowid))
+            if view_session != session_id:
+                remapped.setdefault(view_session, session_id)
+
+        # Continuations split off by the gap inherit the client session's attributes
+        device_type, browser, operating_system, traffic_source, is_new_user = attributes.get(
+            client_id, ('desktop', 'unknown', 'unknown', None, False)
+        )
+        return {
+            'id': session_id,
+            'user_id': user_id,
+            'start_time': start.isoformat(),
+            'end_time': end.isoformat(),
+            'page_views': len(run),
+            'duration': duration,
+            'device_type': device_type,
+            'browser': browser,
+            'operating_system': operating_system,
+            'traffic_source': traffic_source or self.classify_referrer(run[0][4]),
+            'is_new_user': bool(is_new_user) and session_id == client_id,
+            'bounce': len(run) == 1 and duration < BOUNCE_SECONDS
+        }
+
+    @staticmethod
+    def _assign_events(cursor, table, since, cutoff, sessions):
+        """
+        Match each event in the window to the latest session of its user started at
+        or before it (the first one for events logged before the first page view)
+
+        Sessions that ended before the cutoff are not rebuilt, but an event in the
+        window can still belong to one of them.
+
+        Returns:
+            (rowid -> session id updates, session ids whose events changed)
+        """
+        starts = defaultdict(list)
+        for session in sessions:
+            starts[session['user_id']].append((session['start_time'], session['id']))
+
+        updates, touched = [], set()
+        # Events in the window, and events of rebuilt sessions logged before the window
+        # (before the user's first page view)
+        events = {row[0]: row for row in cursor.execute(f'''
+            SELECT rowid, session_id, user_id, timestamp FROM {table}
+            WHERE rowid IN (
+                SELECT rowid FROM {table} WHERE timestamp >= :since
+                UNION
+                SELECT rowid FROM {table}
+                WHERE session_id IN (SELECT id FROM sessions WHERE end_time >= :cutoff)
+            )
+        ''', {'since': since, 'cutoff': cutoff})}
+        if since:
+            # Events a user logged before their first session existed had nowhere to go
+            for user_id in starts:
+                if cursor.execute('SELECT 1 FROM sessions WHERE user_id = ? AND end_time < ? LIMIT 1',
+                                  (user_id, cutoff)).fetchone():
+                    continue
+                for row in cursor.execute(f'''
+                    SELECT rowid, session_id, user_id, timestamp FROM {table}
+                    WHERE user_id = ? AND timestamp < ?
+                ''', (user_id, since)):
+                    events[row[0]] = row
+
+        for rowid, session_id, user_id, timestamp in events.values():
+            user_starts = starts.get(user_id, [])
+            i = bisect_right(user_starts, (timestamp, '\uffff')) - 1
+            if i >= 0:
+                target = user_starts[i][1]
+            else:
+                # A user's sessions that ended before the cutoff precede the rebuilt
+                # ones: the event belongs to the latest of them started before it,
+                # or, logged before any page view, to the user's first session
+                kept = cursor.execute('''
+                    SELECT id FROM sessions WHERE user_id = ? AND end_time < ? AND start_time <= ?
+                    ORDER BY start_time DESC LIMIT 1
+                ''', (user_id, cutoff, timestamp)).fetchone() or cursor.execute('''
+                    SELECT id FROM sessions WHERE user_id = ? AND end_time < ?
+                    ORDER BY start_time LIMIT 1
+                ''', (user_id, cutoff)).fetchone()
+                if kept:
+                    target = kept[0]
+                elif user_starts:
+                    target = user_starts[0][1]
+                else:
+                    continue
+            touched.add(target)
+            if target != session_id:
+                updates.append((target, rowid))
+                touched.add(session_id)
+        return updates, touched
+
+    def _write(self, cursor, rebuilt, sessions, view_updates, event_updates):
+        replaced = [(session_id,) for session_id in rebuilt | {session['id'] for session in sessions}]
+        cursor.executemany('DELETE FROM sessions WHERE id = ?', replaced)
+        cursor.executemany('DELETE FROM social_referrals WHERE session_id = ?', replaced)
+
+        cursor.executemany('''
+            INSERT INTO sessions (
+                id, user_id, start_time, end_time, page_views, duration, device_type, browser,
+                operating_system, traffic_source, is_new_user, conversions, bounce
+            ) VALUES (
+                :id, :user_id, :start_time, :end_time, :page_views, :duration, :device_type, :browser,
+                :operating_system, :traffic_source, :is_new_user, :conversions, :bounce
+            )
+        ''', sessions)
+        cursor.executemany('''
+            INSERT INTO social_referrals (session_id, platform, organic) VALUES (?, ?, TRUE)
+        ''', [(session['id'], session['traffic_source'].replace('social_', '')) for session in sessions
+              if session['traffic_source'].startswith('social_')])
+
+        cursor.executemany('UPDATE page_views SET session_id = ?, exit_page = ? WHERE rowid = ?', view_updates)
+        for table, (updates, _) in event_updates.items():
+            cursor.executemany(f'UPDATE {table} SET session_id = ? WHERE rowid = ?', updates)
+
+        # Conversion counts of the rebuilt sessions and of older sessions that gained or lost one
+        counted = {session['id'] for session in sessions} | event_updates['conversions'][1]
+        cursor.executemany('''
+            UPDATE sessions
+            SET conversions = (SELECT COUNT(*) FROM conversions WHERE conversions.session_id = sessions.id)
+            WHERE id = ?
+        ''', [(session_id,) for session_id in counted])
+
+    def ensure_fresh(self):
+        """Sessionize incrementally if events landed since the last run in this process"""
+        if self._fresh_at is not None and self.rollups.data_watermark()[:4] == self._fresh_at:
+            return
+        with self._lock:
+            # Another thread may have caught up while this one waited
+            if self._fresh_at is None or self.rollups.data_watermark()[:4] != self._fresh_at:
+                self._sessionize(False)
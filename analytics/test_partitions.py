@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Regression test: a session running past midnight at a month end is archived whole
+"""
+
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+from partitions import _shift_month
+
+
+def _hot_views(analytics, session_id):
+    with analytics.pool.connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM page_views WHERE session_id = ?', (session_id,)).fetchone()[0]
+
+
+def test_session_across_month_end():
+    """The late-night reader's session and both of its views move together"""
+
+    print("🧪 Testing archival of a session across a month end")
+    for derive_sessions in (True, False):
+        with tempfile.TemporaryDirectory() as tmp:
+            analytics = WebsiteAnalytics(str(Path(tmp) / "analytics.db"))
+            analytics.derive_sessions = derive_sessions
+            first = _shift_month(date.today().replace(day=1), -4)
+            second = _shift_month(first, 1)
+            midnight = datetime.combine(second, datetime.min.time())
+
+            def view(session_id, at):
+                return {'event_type': 'page_view', 'session_id': session_id, 'user_id': f'u_{session_id}',
+                        'page_url': '/', 'received_at': at.isoformat()}
+
+            analytics.ingest_events([
+                view('early', midnight - timedelta(days=3)),
+                view('late', midnight - timedelta(minutes=10)),
+                view('late', midnight + timedelta(minutes=10)),
+                view('next', midnight + timedelta(days=3))
+            ])
+            if derive_sessions:
+                analytics.sessionize()
+            analytics.compact_rollups()
+            before = analytics.get_page_views(180)['total_views']
+
+            result = analytics.partitions.archive_month(first.isoformat()[:7])
+            print(f"   📦 {result['month']}: {result['row_counts']}")
+            assert result['row_counts']['sessions'] == 1 and result['row_counts']['page_views'] == 1
+            # The session crossing midnight stays hot with both of its views
+            assert _hot_views(analytics, 'late') == 2
+            assert analytics.get_page_views(180)['total_views'] == before
+
+            result = analytics.partitions.archive_month(second.isoformat()[:7])
+            print(f"   📦 {result['month']}: {result['row_counts']}")
+            assert result['row_counts']['sessions'] == 2 and result['row_counts']['page_views'] == 3
+            assert _hot_views(analytics, 'late') == 0
+            assert analytics.get_page_views(180)['total_views'] == before
+
+            month_start = datetime.combine(first, datetime.min.time())
+            sessions = [row['id'] for row in analytics.partitions.iter_archived_rows('sessions', month_start, midnight)]
+            assert sorted(sessions) == ['early', 'late']
+    print("   ✅ No session is split between the archive and the hot tables")
+
+
+if __name__ == "__main__":
+    test_session_across_month_end()
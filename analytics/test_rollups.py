@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Regression test: reports served from the rollups must match a raw scan
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+
+
+def _raw_avg_time_on_page(analytics, days):
+    start = (datetime.now() - timedelta(days=days)).isoformat()
+    with analytics.pool.connection() as conn:
+        total, timed = conn.execute('''
+            SELECT SUM(time_on_page), COUNT(time_on_page) FROM page_views WHERE timestamp >= ?
+        ''', (start,)).fetchone()
+    return round(total / timed, 2) if timed else 0
+
+
+def test_late_exit_on_compacted_day():
+    """A page exit for a view on an already-compacted day reaches the report"""
+
+    print("🧪 Testing a late page exit on a compacted day")
+    for derive_sessions in (True, False):
+        with tempfile.TemporaryDirectory() as tmp:
+            analytics = WebsiteAnalytics(str(Path(tmp) / "analytics.db"))
+            analytics.derive_sessions = derive_sessions
+            old_day = datetime.now() - timedelta(days=6)
+
+            events = []
+            for n in range(20):
+                viewed_at = old_day + timedelta(hours=n)
+                base = {'session_id': f's{n}', 'user_id': f'u{n}', 'page_url': f'/post-{n}'}
+                events.append({**base, 'event_type': 'page_view', 'received_at': viewed_at.isoformat()})
+                events.append({**base, 'event_type': 'page_exit', 'time_on_page': 50 + n,
+                               'received_at': (viewed_at + timedelta(seconds=50 + n)).isoformat()})
+            analytics.ingest_events(events)
+            if derive_sessions:
+                analytics.sessionize()
+            analytics.compact_rollups()
+            before = analytics.get_time_on_page_metrics(7)['avg_time_on_page']
+
+            # The exit of the first view arrives days later with a new time on page
+            analytics.ingest_events([{
+                'event_type': 'page_exit', 'session_id': 's0', 'user_id': 'u0',
+                'page_url': '/post-0', 'time_on_page': 100000
+            }])
+            if derive_sessions:
+                analytics.sessionize()
+            after = analytics.get_time_on_page_metrics(7)['avg_time_on_page']
+            raw = _raw_avg_time_on_page(analytics, 7)
+
+            print(f"   📊 derive_sessions={derive_sessions}: {before} -> {after} (raw {raw})")
+            assert after == raw != before
+    print("   ✅ Rollup-backed report matches the raw rows")
+
+
+if __name__ == "__main__":
+    test_late_exit_on_compacted_day()
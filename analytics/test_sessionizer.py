@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Regression test: an incremental sessionizer run must match a full rebuild
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from website_analytics import WebsiteAnalytics
+
+
+def _sessions(analytics):
+    with analytics.pool.connection() as conn:
+        return conn.execute('''
+            SELECT id, user_id, start_time, end_time, page_views, duration, bounce, conversions
+            FROM sessions ORDER BY id
+        ''').fetchall()
+
+
+def _view(session_id, user_id, page_url, at):
+    return {'event_type': 'page_view', 'session_id': session_id, 'user_id': user_id,
+            'page_url': page_url, 'received_at': at.isoformat()}
+
+
+def test_late_page_exit():
+    """A reader leaves after 40 minutes while other traffic keeps the window moving"""
+
+    print("🧪 Testing a late page exit against a full rebuild")
+    with tempfile.TemporaryDirectory() as tmp:
+        analytics = WebsiteAnalytics(str(Path(tmp) / "analytics.db"))
+        start = datetime.now() - timedelta(hours=3)
+
+        analytics.ingest_events([_view('reader', 'u_reader', '/long-read', start)])
+        analytics.sessionize()
+
+        # Other visitors arrive every 10 minutes and are sessionized as they come
+        for minute in range(10, 80, 10):
+            analytics.ingest_events([_view(f'other_{minute}', f'u_{minute}', '/', start + timedelta(minutes=minute))])
+            analytics.sessionize()
+
+        analytics.ingest_events([{
+            'event_type': 'page_exit', 'session_id': 'reader', 'user_id': 'u_reader',
+            'page_url': '/long-read', 'time_on_page': 2400,
+            'received_at': (start + timedelta(minutes=40)).isoformat()
+        }])
+        analytics.sessionize()
+        incremental = _sessions(analytics)
+
+        analytics.sessionize(full=True)
+        full = _sessions(analytics)
+
+        reader = next(row for row in incremental if row[0] == 'reader')
+        print(f"   📊 Incremental: duration {reader[5]}, bounce {reader[6]}")
+        assert reader[5] == 2400.0 and not reader[6]
+        assert incremental == full
+        print("   ✅ Incremental run matches the full rebuild")
+
+
+if __name__ == "__main__":
+    test_late_page_exit()
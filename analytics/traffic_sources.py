@@ -0,0 +1,151 @@
+"""
+Compiled Traffic Source Classifier
+Parses the referrer host once and matches it against the traffic source table with
+a reversed-label suffix trie (longest match wins), instead of a substring search
+per known domain; repeat referrers are answered from an LRU cache
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Dict-valued categories name one source per entry: social_media/facebook -> social_facebook
+SOURCE_PREFIXES = {'social_media': 'social'}
+
+# Default source table (WebsiteAnalytics.traffic_sources starts as a copy of it)
+DEFAULT_TRAFFIC_SOURCES = {
+    'organic_search': [
+        'google.com', 'bing.com', 'yahoo.com', 'duckduckgo.com',
+        'baidu.com', 'yandex.com', 'ecosia.org'
+    ],
+    'social_media': {
+        'facebook': ['facebook.com', 'fb.com', 'm.facebook.com'],
+        'twitter': ['twitter.com', 'x.com', 't.co'],
+        'linkedin': ['linkedin.com', 'lnkd.in'],
+        'instagram': ['instagram.com'],
+        'youtube': ['youtube.com', 'youtu.be'],
+        'tiktok': ['tiktok.com'],
+        'reddit': ['reddit.com'],
+        'pinterest': ['pinterest.com', 'pin.it']
+    },
+    'email': ['mail.google.com', 'outlook.com', 'yahoo.com/mail'],
+    'paid_search': ['googleads.', 'bingads.', 'ads.yahoo.']
+}
+
+_VALUE = '$'      # trie node key: source for this host suffix
+_PATHS = '/'      # trie node key: [(path prefix, source)] for entries like 'yahoo.com/mail'
+
+_REFERRER_RE = re.compile(r'^(?:[a-z][a-z0-9+.\-]*:)?//(?:[^@/?#]*@)?([^:/?#]*)(?::\d*)?([^?#]*)')
+
+
+def parse_referrer(referrer: str) -> Tuple[str, str]:
+    """Lower-cased (host, path) of a referrer URL; scheme-less 'host/path' is accepted"""
+    referrer = referrer.strip().lower()
+    match = _REFERRER_RE.match(referrer if '//' in referrer else '//' + referrer)
+    if not match:
+        return '', ''
+    return match.group(1).rstrip('.'), match.group(2)
+
+
+class TrafficSourceClassifier:
+    """Classifies referrers into direct / organic_search / social_* / email / paid_search / referral"""
+
+    def __init__(self, source_table: Dict[str, Union[List[str], Dict[str, List[str]]]] = None,
+                 cache_size: int = 65536):
+        """
+        Args:
+            source_table: Category -> domains, or category -> {name: domains} (the
+                          WebsiteAnalytics.traffic_sources layout; default
+                          DEFAULT_TRAFFIC_SOURCES). Entries are domains
+                          ('google.com', also matching subdomains), domain/path prefixes
+                          ('yahoo.com/mail') or host label prefixes ending in '.'
+                          ('googleads.'). Earlier categories win ties on the same domain.
+            cache_size: Referrers remembered by classify()
+        """
+        self._trie: Dict[str, dict] = {}
+        label_prefixes = []
+
+        for category, entries in (source_table or DEFAULT_TRAFFIC_SOURCES).items():
+            if isinstance(entries, dict):
+                prefix = SOURCE_PREFIXES.get(category, category)
+                groups = [(f"{prefix}_{name}", domains) for name, domains in entries.items()]
+            else:
+                groups = [(category, entries)]
+
+            for source, domains in groups:
+                for entry in domains:
+                    entry = entry.lower()
+                    if entry.endswith('.'):
+                        label_prefixes.append((entry, source))
+                    else:
+                        self._add(entry, source)
+
+        # Host label prefixes (ad click domains) are more specific than any domain suffix
+        self._label_prefixes = [
+            (re.compile(r'(?:^|\.)' + re.escape(pattern)), source) for pattern, source in label_prefixes
+        ]
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _add(self, entry: str, source: str):
+        host, _, path = entry.partition('/')
+        node = self._trie
+        for label in reversed(host.split('.')):
+            node = node.setdefault(label, {})
+        if path:
+            node.setdefault(_PATHS, []).append(('/' + path, source))
+        else:
+            node.setdefault(_VALUE, source)
+
+    def _match_host(self, labels: List[str], path: str) -> Optional[str]:
+        node, found = self._trie, None
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(_VALUE, found)
+            for prefix, source in node.get(_PATHS, ()):
+                if path.startswith(prefix):
+                    found = source
+                    break
+        return found
+
+    def _classify(self, referrer: Optional[str]) -> str:
+        if not referrer:
+            return "direct"
+
+        host, path = parse_referrer(referrer)
+        if not host:
+            return "referral"
+
+        for pattern, source in self._label_prefixes:
+            if pattern.search(host):
+                return source
+
+        labels = host.split('.')
+        source = self._match_host(labels, path)
+        if source is None and len(labels) > 2 and len(labels[-1]) == 2:
+            # Country variants: google.com.au -> google.com, google.co.uk -> google.com
+            base = labels[:-1]
+            if base[-1] == 'co':
+                base[-1] = 'com'
+            source = self._match_host(base, path)
+        return source or "referral"
+
+    def classify_many(self, referrers: Iterable[Optional[str]]) -> List[str]:
+        """
+        Classify a bulk of referrers (e.g. a backfill), each distinct one only once
+
+        Uses a per-call table rather than the LRU, so a backfill does not evict the
+        live traffic's cache.
+        """
+        seen: Dict[Optional[str], str] = {}
+        results = []
+        for referrer in referrers:
+            source = seen.get(referrer)
+            if source is None:
+                source = seen[referrer] = self._classify(referrer)
+            results.append(source)
+        return results
+
+    def cache_info(self):
+        return self.classify.cache_info()
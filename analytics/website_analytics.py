@@ -21,6 +21,7 @@ This system tracks and analyzes the following metrics:
 16. Event Tracking
 """
 
+import copy
 import json
 import sqlite3
 from datetime import datetime, timedelta
@@ -29,7 +30,19 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import uuid
 from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
 import statistics
+import sys
+from abc import ABC, abstractmethod
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from connection_pool import get_pool
+from rollups import DailyRollups, REPORT_QUERIES
+from report_cache import ReportCache
+from partitions import PartitionManager
+from traffic_sources import TrafficSourceClassifier, DEFAULT_TRAFFIC_SOURCES
+from sessionizer import Sessionizer
 
 @dataclass
 class PageView:
@@ -101,128 +114,345 @@ class SocialReferral:
     campaign: Optional[str] = None
     organic: bool = True
 
-class WebsiteAnalytics:
+class AnalyticsReports(ABC):
+    """
+    Report API built from REPORT_QUERIES rows (see rollups.py)
+    
+    Subclasses provide _report_rows(days, *names); the live database answers it from
+    the rollup tables, the Parquet export (parquet_export.py) with pandas.
+    """
+    
+    @abstractmethod
+    def _report_rows(self, days: int, *names: str) -> Dict[str, List[tuple]]:
+        """Rows of the named REPORT_QUERIES over the last `days` days, keyed by name"""
+    
+    def get_page_views(self, days: int = 30) -> Dict[str, Any]:
+        """Get page view metrics for the specified period"""
+        return self._page_view_metrics(self._report_rows(days, 'pages', 'daily_pages'))
+    
+    def _page_view_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        pages = rows['pages']
+        total_views = sum(row[2] for row in pages)
+        
+        # Top pages by views
+        top_pages = sorted(pages, key=lambda row: row[2], reverse=True)[:10]
+        
+        # Daily page views
+        daily_views = sorted((row[0], row[1]) for row in rows['daily_pages'])
+        
+        return {
+            'total_views': total_views,
+            'top_pages': [{'url': row[0], 'title': row[1], 'views': row[2]} for row in top_pages],
+            'daily_views': [{'date': row[0], 'views': row[1]} for row in daily_views]
+        }
+    
+    def _session_totals(self, session_rows: List[tuple]) -> Dict[str, Any]:
+        """Sum daily_session_stats rows (source, device, browser, is_new_user, measures...)"""
+        totals = {'sessions': 0, 'bounces': 0, 'page_views_sum': 0, 'duration_sum': 0.0,
+                  'duration_count': 0, 'new_users': 0, 'returning_users': 0}
+        for _, _, _, is_new_user, sessions, bounces, page_views_sum, duration_sum, duration_count in session_rows:
+            totals['sessions'] += sessions
+            totals['bounces'] += bounces
+            totals['page_views_sum'] += page_views_sum or 0
+            totals['duration_sum'] += duration_sum or 0
+            totals['duration_count'] += duration_count
+            if is_new_user == 1:
+                totals['new_users'] += sessions
+            elif is_new_user == 0:
+                totals['returning_users'] += sessions
+        return totals
+    
+    def _sessions_by(self, session_rows: List[tuple], column: int) -> List[Tuple[Any, int]]:
+        """Session counts grouped by one dimension column, largest first"""
+        counts = defaultdict(int)
+        for row in session_rows:
+            counts[row[column]] += row[4]
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    
+    def get_session_metrics(self, days: int = 30) -> Dict[str, Any]:
+        """Get session-related metrics"""
+        return self._session_metrics(self._report_rows(days, 'sessions'))
+    
+    def _session_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        totals = self._session_totals(rows['sessions'])
+        
+        total_sessions = totals['sessions']
+        avg_duration = totals['duration_sum'] / totals['duration_count'] if totals['duration_count'] else 0
+        avg_pages_per_session = totals['page_views_sum'] / total_sessions if total_sessions else 0
+        bounce_rate = (totals['bounces'] / total_sessions * 100) if total_sessions > 0 else 0
+        
+        return {
+            'total_sessions': total_sessions,
+            'avg_session_duration': round(avg_duration, 2),
+            'avg_pages_per_session': round(avg_pages_per_session, 2),
+            'bounce_rate': round(bounce_rate, 2),
+            'new_users': totals['new_users'],
+            'returning_users': totals['returning_users']
+        }
+    
+    def get_traffic_sources(self, days: int = 30) -> Dict[str, Any]:
+        """Get traffic source breakdown"""
+        return self._traffic_source_metrics(self._report_rows(days, 'sessions', 'social'))
+    
+    def _traffic_source_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        traffic_sources = self._sessions_by(rows['sessions'], 0)
+        
+        # Social referrals detail
+        social_referrals = sorted(rows['social'], key=lambda row: row[1], reverse=True)
+        
+        return {
+            'traffic_sources': [{'source': row[0], 'sessions': row[1]} for row in traffic_sources],
+            'social_referrals': [{'platform': row[0], 'sessions': row[1]} for row in social_referrals]
+        }
+    
+    def get_device_metrics(self, days: int = 30) -> Dict[str, Any]:
+        """Get device type breakdown"""
+        return self._device_metrics(self._report_rows(days, 'sessions'))
+    
+    def _device_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        device_data = self._sessions_by(rows['sessions'], 1)
+        browser_data = self._sessions_by(rows['sessions'], 2)[:10]
+        
+        return {
+            'device_types': [{'device': row[0], 'sessions': row[1]} for row in device_data],
+            'browsers': [{'browser': row[0], 'sessions': row[1]} for row in browser_data]
+        }
+    
+    def get_conversion_metrics(self, days: int = 30) -> Dict[str, Any]:
+        """Get conversion metrics"""
+        return self._conversion_metrics(self._report_rows(days, 'conversions', 'sessions'))
+    
+    def _conversion_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        conversions_by_type = sorted(rows['conversions'], key=lambda row: row[1], reverse=True)
+        total_conversions = sum(row[1] for row in conversions_by_type)
+        
+        # Conversion rate
+        total_sessions = sum(row[4] for row in rows['sessions'])
+        conversion_rate = (total_conversions / total_sessions * 100) if total_sessions > 0 else 0
+        
+        # Revenue (if applicable)
+        total_revenue = sum(row[2] for row in conversions_by_type if row[2] is not None)
+        
+        return {
+            'total_conversions': total_conversions,
+            'conversion_rate': round(conversion_rate, 2),
+            'conversions_by_type': [{'type': row[0], 'count': row[1]} for row in conversions_by_type],
+            'total_revenue': total_revenue
+        }
+    
+    def get_exit_pages(self, days: int = 30) -> Dict[str, Any]:
+        """Get top exit pages"""
+        return self._exit_page_metrics(self._report_rows(days, 'pages'))
+    
+    def _exit_page_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        pages = rows['pages']
+        
+        # Top exit pages
+        exit_pages = sorted((row for row in pages if row[3] > 0), key=lambda row: row[3], reverse=True)[:10]
+        
+        # Exit rate by page (URL only), for pages with significant traffic;
+        # rounded half-up like SQLite's ROUND()
+        by_url = defaultdict(lambda: [0, 0])
+        for url, _, views, exits, *_ in pages:
+            by_url[url][0] += views
+            by_url[url][1] += exits
+        exit_rates = sorted(
+            ((url, views, exits, float(Decimal(repr(exits * 100.0 / views)).quantize(Decimal('0.01'), ROUND_HALF_UP)))
+             for url, (views, exits) in by_url.items() if views >= 10),
+            key=lambda row: row[3], reverse=True
+        )[:10]
+        
+        return {
+            'top_exit_pages': [{'url': row[0], 'title': row[1], 'exits': row[3]} for row in exit_pages],
+            'exit_rates': [{'url': row[0], 'total_views': row[1], 'exits': row[2], 'exit_rate': row[3]} for row in exit_rates]
+        }
+    
+    def get_time_on_page_metrics(self, days: int = 30) -> Dict[str, Any]:
+        """Get average time on page metrics"""
+        return self._time_on_page_metrics(self._report_rows(days, 'pages'))
+    
+    def _time_on_page_metrics(self, rows: Dict[str, List[tuple]]) -> Dict[str, Any]:
+        pages = rows['pages']
+        
+        # Overall average time on page
+        timed_views = sum(row[5] for row in pages)
+        avg_time_on_page = sum(row[4] or 0 for row in pages) / timed_views if timed_views else 0
+        
+        # Time on page by URL (pages with multiple timed views)
+        time_by_page = sorted(
+            ((row[0], row[1], row[4] / row[5], row[5]) for row in pages if row[5] >= 5),
+            key=lambda row: row[2], reverse=True
+        )[:10]
+        
+        return {
+            'avg_time_on_page': round(avg_time_on_page, 2),
+            'time_by_page': [
+                {
+                    'url': row[0], 
+                    'title': row[1], 
+                    'avg_time': round(row[2], 2), 
+                    'views': row[3]
+                } for row in time_by_page
+            ]
+        }
+    
+    def generate_comprehensive_report(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Generate a comprehensive analytics report
+        
+        All metrics come from a single _report_rows call; on the live database that
+        is one statement (one CTE per rollup query) over one consistent snapshot.
+        """
+        
+        rows = self._report_rows(days, *REPORT_QUERIES)
+        
+        return {
+            'report_period': f"Last {days} days",
+            'generated_at': datetime.now().isoformat(),
+            'page_views': self._page_view_metrics(rows),
+            'sessions': self._session_metrics(rows),
+            'traffic_sources': self._traffic_source_metrics(rows),
+            'devices': self._device_metrics(rows),
+            'conversions': self._conversion_metrics(rows),
+            'exit_pages': self._exit_page_metrics(rows),
+            'time_on_page': self._time_on_page_metrics(rows)
+        }
+
+class WebsiteAnalytics(AnalyticsReports):
     """Main analytics tracking and reporting class"""
     
     def __init__(self, db_path: str = "analytics/website_analytics.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
+        # Shared, WAL-mode connections reused across calls and threads
+        self.pool = get_pool(self.db_path)
         self.init_database()
+        self.rollups = DailyRollups(self.pool)
+        # Recent reports, keyed by (report, days, data watermark)
+        self.report_cache = ReportCache(ttl_seconds=60, max_entries=32)
+        # Older months of raw events are moved to per-month archive files
+        self.partitions = PartitionManager(self.pool, self.rollups, self.db_path.parent / "archive")
         
         # Traffic source patterns
-        self.traffic_sources = {
-            'organic_search': [
-                'google.com', 'bing.com', 'yahoo.com', 'duckduckgo.com',
-                'baidu.com', 'yandex.com', 'ecosia.org'
-            ],
-            'social_media': {
-                'facebook': ['facebook.com', 'fb.com', 'm.facebook.com'],
-                'twitter': ['twitter.com', 'x.com', 't.co'],
-                'linkedin': ['linkedin.com', 'lnkd.in'],
-                'instagram': ['instagram.com'],
-                'youtube': ['youtube.com', 'youtu.be'],
-                'tiktok': ['tiktok.com'],
-                'reddit': ['reddit.com'],
-                'pinterest': ['pinterest.com', 'pin.it']
-            },
-            'email': ['mail.google.com', 'outlook.com', 'yahoo.com/mail'],
-            'paid_search': ['googleads.', 'bingads.', 'ads.yahoo.']
-        }
+        self.traffic_sources = copy.deepcopy(DEFAULT_TRAFFIC_SOURCES)
+        # Rebuild after editing traffic_sources, then reclassify_traffic_sources()
+        self.source_classifier = TrafficSourceClassifier(self.traffic_sources)
+        # Session rows are derived from page views by the sessionizer rather than
+        # updated on every event; False restores the per-event session updates
+        self.derive_sessions = True
+        self.sessionizer = Sessionizer(self.pool, self.rollups, self.source_classifier.classify)
         
     def init_database(self):
         """Initialize SQLite database with all necessary tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Page Views table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS page_views (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                session_id TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                page_url TEXT NOT NULL,
-                page_title TEXT NOT NULL,
-                referrer TEXT,
-                user_agent TEXT,
-                ip_address TEXT,
-                time_on_page REAL,
-                scroll_depth REAL,
-                exit_page BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (session_id) REFERENCES sessions (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                start_time TEXT NOT NULL,
-                end_time TEXT,
-                page_views INTEGER DEFAULT 0,
-                duration REAL,
-                device_type TEXT DEFAULT 'desktop',
-                browser TEXT DEFAULT 'unknown',
-                operating_system TEXT DEFAULT 'unknown',
-                traffic_source TEXT DEFAULT 'direct',
-                is_new_user BOOLEAN DEFAULT TRUE,
-                conversions INTEGER DEFAULT 0,
-                bounce BOOLEAN DEFAULT FALSE,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                first_visit TEXT NOT NULL,
-                last_visit TEXT NOT NULL,
-                total_sessions INTEGER DEFAULT 1,
-                total_page_views INTEGER DEFAULT 1,
-                total_time_on_site REAL DEFAULT 0.0,
-                device_preferences TEXT,
-                conversion_events TEXT
-            )
-        ''')
-        
-        # Conversions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversions (
-                id TEXT PRIMARY KEY,
-                session_id TEXT NOT NULL,
-                user_id TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                event_type TEXT NOT NULL,
-                page_url TEXT NOT NULL,
-                value REAL,
-                FOREIGN KEY (session_id) REFERENCES sessions (id),
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Social Referrals table  
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS social_referrals (
-                session_id TEXT NOT NULL,
-                platform TEXT NOT NULL,
-                campaign TEXT,
-                organic BOOLEAN DEFAULT TRUE,
-                FOREIGN KEY (session_id) REFERENCES sessions (id)
-            )
-        ''')
-        
-        # Create indexes for better query performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_views_timestamp ON page_views (timestamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_views_session ON page_views (session_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions (start_time)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversions_timestamp ON conversions (timestamp)')
-        
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as cursor:
+            # Page Views table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS page_views (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    page_url TEXT NOT NULL,
+                    page_title TEXT NOT NULL,
+                    referrer TEXT,
+                    user_agent TEXT,
+                    ip_address TEXT,
+                    time_on_page REAL,
+                    scroll_depth REAL,
+                    exit_page BOOLEAN DEFAULT FALSE,
+                    FOREIGN KEY (session_id) REFERENCES sessions (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+        
+            # Sessions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    page_views INTEGER DEFAULT 0,
+                    duration REAL,
+                    device_type TEXT DEFAULT 'desktop',
+                    browser TEXT DEFAULT 'unknown',
+                    operating_system TEXT DEFAULT 'unknown',
+                    traffic_source TEXT DEFAULT 'direct',
+                    is_new_user BOOLEAN DEFAULT TRUE,
+                    conversions INTEGER DEFAULT 0,
+                    bounce BOOLEAN DEFAULT FALSE,
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+        
+            # Users table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    id TEXT PRIMARY KEY,
+                    first_visit TEXT NOT NULL,
+                    last_visit TEXT NOT NULL,
+                    total_sessions INTEGER DEFAULT 1,
+                    total_page_views INTEGER DEFAULT 1,
+                    total_time_on_site REAL DEFAULT 0.0,
+                    device_preferences TEXT,
+                    conversion_events TEXT
+                )
+            ''')
+        
+            # Conversions table
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS conversions (
+                    id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    page_url TEXT NOT NULL,
+                    value REAL,
+                    FOREIGN KEY (session_id) REFERENCES sessions (id),
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''')
+        
+            # Social Referrals table  
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS social_referrals (
+                    session_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    campaign TEXT,
+                    organic BOOLEAN DEFAULT TRUE,
+                    FOREIGN KEY (session_id) REFERENCES sessions (id)
+                )
+            ''')
+        
+            # Custom Events table (link clicks, scroll depth, etc. from the tracking script)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS custom_events (
+                    id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    event_name TEXT NOT NULL,
+                    properties TEXT,
+                    page_url TEXT,
+                    FOREIGN KEY (session_id) REFERENCES sessions (id)
+                )
+            ''')
+        
+            # Create indexes for better query performance
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_views_timestamp ON page_views (timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_views_session ON page_views (session_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_views_user ON page_views (user_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions (start_time)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_end ON sessions (end_time)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversions_timestamp ON conversions (timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversions_session ON conversions (session_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversions_user ON conversions (user_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_social_referrals_session ON social_referrals (session_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_events_timestamp ON custom_events (timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_events_session ON custom_events (session_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_events_user ON custom_events (user_id, timestamp)')
     
     def track_page_view(
         self, 
@@ -241,37 +471,33 @@ class WebsiteAnalytics:
         page_view_id = str(uuid.uuid4())
         timestamp = datetime.now().isoformat()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO page_views (
-                id, timestamp, session_id, user_id, page_url, page_title,
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO page_views (
+                    id, timestamp, session_id, user_id, page_url, page_title,
+                    referrer, user_agent, ip_address, time_on_page, scroll_depth
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                page_view_id, timestamp, session_id, user_id, page_url, page_title,
                 referrer, user_agent, ip_address, time_on_page, scroll_depth
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            page_view_id, timestamp, session_id, user_id, page_url, page_title,
-            referrer, user_agent, ip_address, time_on_page, scroll_depth
-        ))
-        
-        # Update session page view count
-        cursor.execute('''
-            UPDATE sessions 
-            SET page_views = page_views + 1,
-                end_time = ?
-            WHERE id = ?
-        ''', (timestamp, session_id))
-        
-        # Update user page view count
-        cursor.execute('''
-            UPDATE users 
-            SET total_page_views = total_page_views + 1,
-                last_visit = ?
-            WHERE id = ?
-        ''', (timestamp, user_id))
-        
-        conn.commit()
-        conn.close()
+            ))
+        
+            # Update session page view count (derived by the sessionizer otherwise)
+            if not self.derive_sessions:
+                cursor.execute('''
+                    UPDATE sessions 
+                    SET page_views = page_views + 1,
+                        end_time = ?
+                    WHERE id = ?
+                ''', (timestamp, session_id))
+        
+            # Update user page view count
+            cursor.execute('''
+                UPDATE users 
+                SET total_page_views = total_page_views + 1,
+                    last_visit = ?
+                WHERE id = ?
+            ''', (timestamp, user_id))
         
         return page_view_id
     
@@ -292,84 +518,77 @@ class WebsiteAnalytics:
         # Determine traffic source from referrer
         traffic_source = self._classify_traffic_source(referrer)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO sessions (
-                id, user_id, start_time, device_type, browser, operating_system,
-                traffic_source, is_new_user
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            session_id, user_id, timestamp, device_type, browser,
-            operating_system, traffic_source, is_new_user
-        ))
-        
-        # Track social referral if applicable
-        if traffic_source.startswith('social_'):
-            platform = traffic_source.replace('social_', '')
+        with self.pool.transaction() as cursor:
             cursor.execute('''
-                INSERT INTO social_referrals (session_id, platform, organic)
-                VALUES (?, ?, TRUE)
-            ''', (session_id, platform))
-        
-        # Update user session count
-        if not is_new_user:
-            cursor.execute('''
-                UPDATE users 
-                SET total_sessions = total_sessions + 1
-                WHERE id = ?
-            ''', (user_id,))
-        
-        conn.commit()
-        conn.close()
+                INSERT INTO sessions (
+                    id, user_id, start_time, device_type, browser, operating_system,
+                    traffic_source, is_new_user
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                session_id, user_id, timestamp, device_type, browser,
+                operating_system, traffic_source, is_new_user
+            ))
+        
+            # Track social referral if applicable
+            if traffic_source.startswith('social_'):
+                platform = traffic_source.replace('social_', '')
+                cursor.execute('''
+                    INSERT INTO social_referrals (session_id, platform, organic)
+                    VALUES (?, ?, TRUE)
+                ''', (session_id, platform))
+        
+            # Update user session count
+            if not is_new_user:
+                cursor.execute('''
+                    UPDATE users 
+                    SET total_sessions = total_sessions + 1
+                    WHERE id = ?
+                ''', (user_id,))
         
         return session_id
     
     def end_session(self, session_id: str, duration: Optional[float] = None):
         """End a user session and calculate metrics"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.pool.transaction() as cursor:
+            timestamp = datetime.now().isoformat()
         
-        timestamp = datetime.now().isoformat()
-        
-        # Get session info and page view count
-        cursor.execute('''
-            SELECT user_id, page_views, start_time FROM sessions WHERE id = ?
-        ''', (session_id,))
+            # Get session info and page view count
+            cursor.execute('''
+                SELECT user_id, page_views, start_time FROM sessions WHERE id = ?
+            ''', (session_id,))
         
-        result = cursor.fetchone()
-        if not result:
-            conn.close()
-            return
+            result = cursor.fetchone()
+            if not result:
+                return
             
-        user_id, page_views, start_time = result
-        
-        # Calculate duration if not provided
-        if duration is None:
-            start_dt = datetime.fromisoformat(start_time)
-            end_dt = datetime.now()
-            duration = (end_dt - start_dt).total_seconds()
-        
-        # Determine if it's a bounce (single page view, short duration)
-        is_bounce = page_views == 1 and duration < 10  # Less than 10 seconds
-        
-        cursor.execute('''
-            UPDATE sessions 
-            SET end_time = ?, duration = ?, bounce = ?
-            WHERE id = ?
-        ''', (timestamp, duration, is_bounce, session_id))
-        
-        # Update user total time on site
-        cursor.execute('''
-            UPDATE users 
-            SET total_time_on_site = total_time_on_site + ?
-            WHERE id = ?
-        ''', (duration, user_id))
-        
-        conn.commit()
-        conn.close()
+            user_id, page_views, start_time = result
+        
+            # Calculate duration if not provided
+            if duration is None:
+                start_dt = datetime.fromisoformat(start_time)
+                end_dt = datetime.now()
+                duration = (end_dt - start_dt).total_seconds()
+        
+            # Determine if it's a bounce (single page view, short duration)
+            is_bounce = page_views == 1 and duration < 10  # Less than 10 seconds
+        
+            # End time, duration and bounce are derived from the page views by the
+            # sessionizer otherwise; only the user's time on site is recorded here
+            if not self.derive_sessions:
+                cursor.execute('''
+                    UPDATE sessions 
+                    SET end_time = ?, duration = ?, bounce = ?
+                    WHERE id = ?
+                ''', (timestamp, duration, is_bounce, session_id))
+        
+            # Update user total time on site
+            cursor.execute('''
+                UPDATE users 
+                SET total_time_on_site = total_time_on_site + ?
+                WHERE id = ?
+            ''', (duration, user_id))
+            self.rollups.bump_data_version(cursor)
     
     def track_conversion(
         self,
@@ -384,42 +603,38 @@ class WebsiteAnalytics:
         conversion_id = str(uuid.uuid4())
         timestamp = datetime.now().isoformat()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO conversions (id, session_id, user_id, timestamp, event_type, page_url, value)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (conversion_id, session_id, user_id, timestamp, event_type, page_url, value))
-        
-        # Update session conversion count
-        cursor.execute('''
-            UPDATE sessions 
-            SET conversions = conversions + 1
-            WHERE id = ?
-        ''', (session_id,))
-        
-        # Update user conversion events
-        cursor.execute('''
-            SELECT conversion_events FROM users WHERE id = ?
-        ''', (user_id,))
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                INSERT INTO conversions (id, session_id, user_id, timestamp, event_type, page_url, value)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (conversion_id, session_id, user_id, timestamp, event_type, page_url, value))
+        
+            # Update session conversion count (derived by the sessionizer otherwise)
+            if not self.derive_sessions:
+                cursor.execute('''
+                    UPDATE sessions 
+                    SET conversions = conversions + 1
+                    WHERE id = ?
+                ''', (session_id,))
+        
+            # Update user conversion events
+            cursor.execute('''
+                SELECT conversion_events FROM users WHERE id = ?
+            ''', (user_id,))
         
-        result = cursor.fetchone()
-        if result and result[0]:
-            events = json.loads(result[0])
-        else:
-            events = []
+            result = cursor.fetchone()
+            if result and result[0]:
+                events = json.loads(result[0])
+            else:
+                events = []
             
-        events.append(event_type)
-        
-        cursor.execute('''
-            UPDATE users 
-            SET conversion_events = ?
-            WHERE id = ?
-        ''', (json.dumps(events), user_id))
+            events.append(event_type)
         
-        conn.commit()
-        conn.close()
+            cursor.execute('''
+                UPDATE users 
+                SET conversion_events = ?
+                WHERE id = ?
+            ''', (json.dumps(events), user_id))
         
         return conversion_id
     
@@ -431,423 +646,399 @@ class WebsiteAnalytics:
             
         timestamp = datetime.now().isoformat()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO users (id, first_visit, last_visit)
-                VALUES (?, ?, ?)
-            ''', (user_id, timestamp, timestamp))
-            
-            conn.commit()
+            with self.pool.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO users (id, first_visit, last_visit)
+                    VALUES (?, ?, ?)
+                ''', (user_id, timestamp, timestamp))
         except sqlite3.IntegrityError:
             # User already exists
             pass
             
-        conn.close()
         return user_id
     
     def _classify_traffic_source(self, referrer: str) -> str:
-        """Classify traffic source based on referrer"""
-        
-        if not referrer or referrer == "":
-            return "direct"
-            
-        referrer_lower = referrer.lower()
-        
-        # Check organic search
-        for search_engine in self.traffic_sources['organic_search']:
-            if search_engine in referrer_lower:
-                return "organic_search"
-        
-        # Check social media
-        for platform, domains in self.traffic_sources['social_media'].items():
-            for domain in domains:
-                if domain in referrer_lower:
-                    return f"social_{platform}"
-        
-        # Check email
-        for email_domain in self.traffic_sources['email']:
-            if email_domain in referrer_lower:
-                return "email"
-        
-        # Check paid search
-        for paid_pattern in self.traffic_sources['paid_search']:
-            if paid_pattern in referrer_lower:
-                return "paid_search"
-        
-        # Default to referral
-        return "referral"
+        """Classify traffic source based on referrer (compiled host lookup, LRU cached)"""
+        return self.source_classifier.classify(referrer)
     
-    # ANALYTICS REPORTING METHODS
+    def reclassify_traffic_sources(self) -> Dict[str, int]:
+        """
+        Re-run traffic source classification for stored sessions (e.g. after adding sources)
+        
+        Each session is classified from the referrer of its first page view; sessions
+        that change get their social_referrals row replaced, and the rollups of the
+        days still held in the hot database are rebuilt.
+        
+        Returns:
+            Dict with the number of sessions checked and changed
+        """
+        with self.pool.connection() as conn:
+            # Bare columns with MIN() come from the row holding the minimum
+            rows = conn.execute('''
+                SELECT pv.session_id, pv.referrer, MIN(pv.timestamp), s.traffic_source
+                FROM page_views pv JOIN sessions s ON s.id = pv.session_id
+                GROUP BY pv.session_id
+            ''').fetchall()
+        
+        sources = self.source_classifier.classify_many(row[1] for row in rows)
+        changed = [(row[0], row[3] or '', source) for row, source in zip(rows, sources) if source != row[3]]
+        
+        if changed:
+            with self.pool.transaction() as cursor:
+                cursor.executemany('UPDATE sessions SET traffic_source = ? WHERE id = ?',
+                                   [(new, session_id) for session_id, _, new in changed])
+                cursor.executemany('DELETE FROM social_referrals WHERE session_id = ?',
+                                   [(session_id,) for session_id, old, _ in changed if old.startswith('social_')])
+                cursor.executemany('''
+                    INSERT INTO social_referrals (session_id, platform, organic)
+                    VALUES (?, ?, TRUE)
+                ''', [(session_id, new.replace('social_', '')) for session_id, _, new in changed
+                      if new.startswith('social_')])
+                self.rollups.bump_data_version(cursor)
+            self.rollups.compact(full=True)
+        
+        return {'sessions': len(rows), 'changed': len(changed)}
     
-    def get_page_views(self, days: int = 30) -> Dict[str, Any]:
-        """Get page view metrics for the specified period"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total page views
-        cursor.execute('''
-            SELECT COUNT(*) FROM page_views 
-            WHERE timestamp >= ?
-        ''', (start_date,))
-        total_views = cursor.fetchone()[0]
-        
-        # Top pages by views
-        cursor.execute('''
-            SELECT page_url, page_title, COUNT(*) as views
-            FROM page_views 
-            WHERE timestamp >= ?
-            GROUP BY page_url, page_title
-            ORDER BY views DESC
-            LIMIT 10
-        ''', (start_date,))
-        top_pages = cursor.fetchall()
-        
-        # Daily page views
-        cursor.execute('''
-            SELECT DATE(timestamp) as date, COUNT(*) as views
-            FROM page_views 
-            WHERE timestamp >= ?
-            GROUP BY DATE(timestamp)
-            ORDER BY date
-        ''', (start_date,))
-        daily_views = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'total_views': total_views,
-            'top_pages': [{'url': row[0], 'title': row[1], 'views': row[2]} for row in top_pages],
-            'daily_views': [{'date': row[0], 'views': row[1]} for row in daily_views]
-        }
+    # ANALYTICS REPORTING METHODS
+    # Reports read the daily rollup tables for whole past days and raw rows only for
+    # the partial first day and the days not yet compacted (see rollups.py)
     
-    def get_session_metrics(self, days: int = 30) -> Dict[str, Any]:
-        """Get session-related metrics"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total sessions
-        cursor.execute('''
-            SELECT COUNT(*) FROM sessions 
-            WHERE start_time >= ?
-        ''', (start_date,))
-        total_sessions = cursor.fetchone()[0]
-        
-        # Average session duration
-        cursor.execute('''
-            SELECT AVG(duration) FROM sessions 
-            WHERE start_time >= ? AND duration IS NOT NULL
-        ''', (start_date,))
-        avg_duration = cursor.fetchone()[0] or 0
-        
-        # Average pages per session
-        cursor.execute('''
-            SELECT AVG(page_views) FROM sessions 
-            WHERE start_time >= ?
-        ''', (start_date,))
-        avg_pages_per_session = cursor.fetchone()[0] or 0
-        
-        # Bounce rate
-        cursor.execute('''
-            SELECT 
-                COUNT(CASE WHEN bounce = 1 THEN 1 END) as bounces,
-                COUNT(*) as total
-            FROM sessions 
-            WHERE start_time >= ?
-        ''', (start_date,))
-        bounce_data = cursor.fetchone()
-        bounce_rate = (bounce_data[0] / bounce_data[1] * 100) if bounce_data[1] > 0 else 0
-        
-        # New vs returning users
-        cursor.execute('''
-            SELECT 
-                COUNT(CASE WHEN is_new_user = 1 THEN 1 END) as new_users,
-                COUNT(CASE WHEN is_new_user = 0 THEN 1 END) as returning_users
-            FROM sessions 
-            WHERE start_time >= ?
-        ''', (start_date,))
-        user_data = cursor.fetchone()
-        
-        conn.close()
-        
-        return {
-            'total_sessions': total_sessions,
-            'avg_session_duration': round(avg_duration, 2),
-            'avg_pages_per_session': round(avg_pages_per_session, 2),
-            'bounce_rate': round(bounce_rate, 2),
-            'new_users': user_data[0],
-            'returning_users': user_data[1]
-        }
+    def sessionize(self, full: bool = False) -> Dict[str, Any]:
+        """Derive sessions from page views since the last run (full=True rebuilds all)"""
+        return self.sessionizer.sessionize(full=full)
     
-    def get_traffic_sources(self, days: int = 30) -> Dict[str, Any]:
-        """Get traffic source breakdown"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT traffic_source, COUNT(*) as sessions
-            FROM sessions 
-            WHERE start_time >= ?
-            GROUP BY traffic_source
-            ORDER BY sessions DESC
-        ''', (start_date,))
-        
-        traffic_sources = cursor.fetchall()
-        
-        # Social referrals detail
-        cursor.execute('''
-            SELECT sr.platform, COUNT(*) as sessions
-            FROM social_referrals sr
-            JOIN sessions s ON sr.session_id = s.id
-            WHERE s.start_time >= ?
-            GROUP BY sr.platform
-            ORDER BY sessions DESC
-        ''', (start_date,))
-        
-        social_referrals = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'traffic_sources': [{'source': row[0], 'sessions': row[1]} for row in traffic_sources],
-            'social_referrals': [{'platform': row[0], 'sessions': row[1]} for row in social_referrals]
-        }
+    def compact_rollups(self, full: bool = False) -> Dict[str, int]:
+        """Roll up completed days into the daily tables (full=True rebuilds everything)"""
+        return self.rollups.compact(full=full)
     
-    def get_device_metrics(self, days: int = 30) -> Dict[str, Any]:
-        """Get device type breakdown"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT device_type, COUNT(*) as sessions
-            FROM sessions 
-            WHERE start_time >= ?
-            GROUP BY device_type
-            ORDER BY sessions DESC
-        ''', (start_date,))
-        
-        device_data = cursor.fetchall()
-        
-        cursor.execute('''
-            SELECT browser, COUNT(*) as sessions
-            FROM sessions 
-            WHERE start_time >= ?
-            GROUP BY browser
-            ORDER BY sessions DESC
-            LIMIT 10
-        ''', (start_date,))
-        
-        browser_data = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'device_types': [{'device': row[0], 'sessions': row[1]} for row in device_data],
-            'browsers': [{'browser': row[0], 'sessions': row[1]} for row in browser_data]
-        }
+    def export_parquet(self, export_dir="analytics/parquet", full: bool = False) -> Dict[str, Any]:
+        """
+        Export page views, sessions, conversions and social referrals to Parquet
+        
+        Incremental from the export's high-water mark; query the result offline with
+        parquet_export.ParquetAnalytics (needs pyarrow, and pandas for reports).
+        """
+        from parquet_export import ParquetExporter
+        return ParquetExporter(self.pool, export_dir).export(full=full)
     
-    def get_conversion_metrics(self, days: int = 30) -> Dict[str, Any]:
-        """Get conversion metrics"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total conversions
-        cursor.execute('''
-            SELECT COUNT(*) FROM conversions 
-            WHERE timestamp >= ?
-        ''', (start_date,))
-        total_conversions = cursor.fetchone()[0]
-        
-        # Conversion rate
-        cursor.execute('''
-            SELECT COUNT(*) FROM sessions 
-            WHERE start_time >= ?
-        ''', (start_date,))
-        total_sessions = cursor.fetchone()[0]
-        
-        conversion_rate = (total_conversions / total_sessions * 100) if total_sessions > 0 else 0
-        
-        # Conversions by type
-        cursor.execute('''
-            SELECT event_type, COUNT(*) as count
-            FROM conversions 
-            WHERE timestamp >= ?
-            GROUP BY event_type
-            ORDER BY count DESC
-        ''', (start_date,))
-        conversions_by_type = cursor.fetchall()
-        
-        # Revenue (if applicable)
-        cursor.execute('''
-            SELECT SUM(value) FROM conversions 
-            WHERE timestamp >= ? AND value IS NOT NULL
-        ''', (start_date,))
-        total_revenue = cursor.fetchone()[0] or 0
-        
-        conn.close()
-        
-        return {
-            'total_conversions': total_conversions,
-            'conversion_rate': round(conversion_rate, 2),
-            'conversions_by_type': [{'type': row[0], 'count': row[1]} for row in conversions_by_type],
-            'total_revenue': total_revenue
-        }
+    def apply_retention(self, retention_months: Optional[int] = None, vacuum: bool = True) -> Dict[str, Any]:
+        """Archive raw events older than the retention window (see partitions.py)"""
+        return self.partitions.apply_retention(retention_months, vacuum=vacuum)
     
-    def get_exit_pages(self, days: int = 30) -> Dict[str, Any]:
-        """Get top exit pages"""
-        
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Top exit pages
-        cursor.execute('''
-            SELECT 
-                pv.page_url,
-                pv.page_title,
-                COUNT(*) as exits
-            FROM page_views pv
-            WHERE pv.timestamp >= ? 
-            AND pv.exit_page = 1
-            GROUP BY pv.page_url, pv.page_title
-            ORDER BY exits DESC
-            LIMIT 10
-        ''', (start_date,))
-        
-        exit_pages = cursor.fetchall()
-        
-        # Exit rate by page
-        cursor.execute('''
-            SELECT 
-                pv.page_url,
-                COUNT(*) as total_views,
-                COUNT(CASE WHEN pv.exit_page = 1 THEN 1 END) as exits,
-                ROUND(COUNT(CASE WHEN pv.exit_page = 1 THEN 1 END) * 100.0 / COUNT(*), 2) as exit_rate
-            FROM page_views pv
-            WHERE pv.timestamp >= ?
-            GROUP BY pv.page_url
-            HAVING COUNT(*) >= 10  -- Only pages with significant traffic
-            ORDER BY exit_rate DESC
-            LIMIT 10
-        ''', (start_date,))
-        
-        exit_rates = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'top_exit_pages': [{'url': row[0], 'title': row[1], 'exits': row[2]} for row in exit_pages],
-            'exit_rates': [{'url': row[0], 'total_views': row[1], 'exits': row[2], 'exit_rate': row[3]} for row in exit_rates]
-        }
+    # The get_* reports and generate_comprehensive_report (AnalyticsReports) are
+    # built from the rows returned here
     
-    def get_time_on_page_metrics(self, days: int = 30) -> Dict[str, Any]:
-        """Get average time on page metrics"""
-        
+    def _report_rows(self, days: int, *names: str) -> Dict[str, List[tuple]]:
+        """Fetch the named REPORT_QUERIES for the window in one statement"""
+        if self.derive_sessions:
+            self.sessionizer.ensure_fresh()
         start_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Overall average time on page
-        cursor.execute('''
-            SELECT AVG(time_on_page) FROM page_views 
-            WHERE timestamp >= ? AND time_on_page IS NOT NULL
-        ''', (start_date,))
-        avg_time_on_page = cursor.fetchone()[0] or 0
-        
-        # Time on page by URL
-        cursor.execute('''
-            SELECT 
-                page_url,
-                page_title,
-                AVG(time_on_page) as avg_time,
-                COUNT(*) as views
-            FROM page_views 
-            WHERE timestamp >= ? AND time_on_page IS NOT NULL
-            GROUP BY page_url, page_title
-            HAVING COUNT(*) >= 5  -- Only pages with multiple views
-            ORDER BY avg_time DESC
-            LIMIT 10
-        ''', (start_date,))
-        
-        time_by_page = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            'avg_time_on_page': round(avg_time_on_page, 2),
-            'time_by_page': [
-                {
-                    'url': row[0], 
-                    'title': row[1], 
-                    'avg_time': round(row[2], 2), 
-                    'views': row[3]
-                } for row in time_by_page
-            ]
-        }
+        return self.rollups.query_many(start_date, {name: REPORT_QUERIES[name] for name in names})
     
-    def generate_comprehensive_report(self, days: int = 30) -> Dict[str, Any]:
-        """Generate a comprehensive analytics report"""
-        
-        return {
-            'report_period': f"Last {days} days",
-            'generated_at': datetime.now().isoformat(),
-            'page_views': self.get_page_views(days),
-            'sessions': self.get_session_metrics(days),
-            'traffic_sources': self.get_traffic_sources(days),
-            'devices': self.get_device_metrics(days),
-            'conversions': self.get_conversion_metrics(days),
-            'exit_pages': self.get_exit_pages(days),
-            'time_on_page': self.get_time_on_page_metrics(days)
-        }
+    def get_summary_report(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Comprehensive report served from the report cache
+        
+        Reused until new events land (the data watermark moves) or it is older than
+        the cache TTL. The returned dict is shared between callers; do not mutate it.
+        """
+        if self.derive_sessions:
+            self.sessionizer.ensure_fresh()
+        self.rollups.ensure_fresh()
+        key = ('summary', days, self.rollups.data_watermark())
+        return self.report_cache.get_or_compute(key, lambda: self.generate_comprehensive_report(days))
     
     def mark_exit_page(self, page_view_id: str):
         """Mark a page view as an exit page"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE page_views 
-            SET exit_page = TRUE
-            WHERE id = ?
-        ''', (page_view_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                UPDATE page_views 
+                SET exit_page = TRUE
+                WHERE id = ?
+            ''', (page_view_id,))
+            row = cursor.execute('SELECT timestamp FROM page_views WHERE id = ?', (page_view_id,)).fetchone()
+            if row:
+                self._page_view_updated(cursor, row[0])
+            self.rollups.bump_data_version(cursor)
     
     def update_time_on_page(self, page_view_id: str, time_on_page: float):
         """Update time spent on a specific page"""
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self.pool.transaction() as cursor:
+            cursor.execute('''
+                UPDATE page_views 
+                SET time_on_page = ?
+                WHERE id = ?
+            ''', (time_on_page, page_view_id))
+            row = cursor.execute('SELECT timestamp FROM page_views WHERE id = ?', (page_view_id,)).fetchone()
+            if row:
+                self._page_view_updated(cursor, row[0])
+            self.rollups.bump_data_version(cursor)
+
+    # BATCH INGESTION (tracking script events)
+
+    INGEST_EVENT_TYPES = ('page_view', 'session_start', 'page_exit', 'custom_event', 'conversion')
+
+    # Raised by a handler for a malformed event (e.g. a dict where SQLite expects text)
+    MALFORMED_EVENT_ERRORS = (sqlite3.InterfaceError, sqlite3.ProgrammingError, sqlite3.IntegrityError,
+                              TypeError, ValueError, AttributeError)
+
+    def ingest_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Apply a batch of tracking-script events in a single transaction
+
+        Each event runs in its own savepoint, so a malformed event is rolled back
+        and counted as skipped without losing the rest of the batch.
+
+        Args:
+            events: Event dicts in the /api/analytics payload format. The optional
+                    'received_at' key (ISO time the server accepted the event) is
+                    used as the event timestamp; client clocks are not trusted.
+
+        Returns:
+            Dict with 'applied' and 'skipped' (invalid or unknown) event counts
+        """
+        handlers = {
+            'page_view': self._ingest_page_view,
+            'session_start': self._ingest_session_start,
+            'page_exit': self._ingest_page_exit,
+            'custom_event': self._ingest_custom_event,
+            'conversion': self._ingest_conversion
+        }
+        applied = skipped = 0
+        last_error = None
+
+        with self.pool.transaction() as cursor:
+            if not cursor.connection.in_transaction:
+                # Otherwise the first savepoint opens the transaction and its release commits
+                cursor.execute('BEGIN')
+            for event in events:
+                handler = handlers.get(event.get('event_type'))
+                timestamp = event.get('received_at') or datetime.now().isoformat()
+                if (handler is None or not event.get('session_id') or not event.get('user_id')
+                        or not self._valid_timestamp(timestamp)):
+                    skipped += 1
+                    continue
+
+                cursor.execute('SAVEPOINT ingest_event')
+                try:
+                    handled = handler(cursor, event, timestamp)
+                except self.MALFORMED_EVENT_ERRORS as e:
+                    cursor.execute('ROLLBACK TO ingest_event')
+                    handled, last_error = False, e
+                cursor.execute('RELEASE ingest_event')
+                if handled:
+                    applied += 1
+                else:
+                    skipped += 1
+            if applied:
+                # Page exits update rows in place; cached reports key on this version
+                self.rollups.bump_data_version(cursor)
+
+        if last_error is not None:
+            print(f"⚠️ Skipped malformed analytics event(s) in batch: {last_error}")
+        return {'applied': applied, 'skipped': skipped}
+
+    @staticmethod
+    def _valid_timestamp(timestamp) -> bool:
+        """True for an ISO time string the sessionizer and reports can parse"""
+        try:
+            return isinstance(timestamp, str) and datetime.fromisoformat(timestamp) is not None
+        except ValueError:
+            return False
+
+    def _ensure_user(self, cursor, user_id: str, timestamp: str):
+        cursor.execute('''
+            INSERT OR IGNORE INTO users (id, first_visit, last_visit, total_sessions, total_page_views)
+            VALUES (?, ?, ?, 0, 0)
+        ''', (user_id, timestamp, timestamp))
+
+    def _ensure_session(self, cursor, event: Dict[str, Any], timestamp: str, traffic_source: str) -> bool:
+        """Create the session row if missing; returns True if it was created"""
         cursor.execute('''
-            UPDATE page_views 
-            SET time_on_page = ?
+            INSERT OR IGNORE INTO sessions (
+                id, user_id, start_time, device_type, traffic_source, is_new_user
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            event['session_id'], event['user_id'], timestamp,
+            event.get('device_type') or 'desktop', traffic_source,
+            bool(event.get('is_new_user', False))
+        ))
+        if cursor.rowcount != 1:
+            return False
+
+        if traffic_source.startswith('social_'):
+            cursor.execute('''
+                INSERT INTO social_referrals (session_id, platform, organic)
+                VALUES (?, ?, TRUE)
+            ''', (event['session_id'], traffic_source.replace('social_', '')))
+        cursor.execute('''
+            UPDATE users
+            SET total_sessions = total_sessions + 1
             WHERE id = ?
-        ''', (time_on_page, page_view_id))
-        
-        conn.commit()
-        conn.close()
+        ''', (event['user_id'],))
+        return True
+
+    def _ingest_page_view(self, cursor, event: Dict[str, Any], timestamp: str) -> bool:
+        if not event.get('page_url'):
+            return False
+        referrer = event.get('referrer') or ""
+
+        self._ensure_user(cursor, event['user_id'], timestamp)
+        self._ensure_session(cursor, event, timestamp, self._classify_traffic_source(referrer))
+
+        if not self.derive_sessions:
+            # The session continued, so its previous page was not an exit page
+            cursor.execute('''
+                UPDATE page_views
+                SET exit_page = FALSE
+                WHERE session_id = ? AND exit_page = 1
+            ''', (event['session_id'],))
+
+        cursor.execute('''
+            INSERT INTO page_views (
+                id, timestamp, session_id, user_id, page_url, page_title,
+                referrer, user_agent, ip_address, time_on_page, scroll_depth
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            str(uuid.uuid4()), timestamp, event['session_id'], event['user_id'],
+            event['page_url'], event.get('page_title') or "", referrer,
+            event.get('user_agent') or "", event.get('ip_address') or "", None, None
+        ))
+        if not self.derive_sessions:
+            cursor.execute('''
+                UPDATE sessions
+                SET page_views = page_views + 1,
+                    end_time = ?
+                WHERE id = ?
+            ''', (timestamp, event['session_id']))
+        cursor.execute('''
+            UPDATE users
+            SET total_page_views = total_page_views + 1,
+                last_visit = ?
+            WHERE id = ?
+        ''', (timestamp, event['user_id']))
+        return True
+
+    def _ingest_session_start(self, cursor, event: Dict[str, Any], timestamp: str) -> bool:
+        self._ensure_user(cursor, event['user_id'], timestamp)
+        if not self._ensure_session(cursor, event, timestamp, event.get('traffic_source') or 'direct'):
+            # The page view arrived first and opened the session; fill in the details
+            cursor.execute('''
+                UPDATE sessions
+                SET is_new_user = ?, device_type = ?
+                WHERE id = ?
+            ''', (
+                bool(event.get('is_new_user', False)),
+                event.get('device_type') or 'desktop',
+                event['session_id']
+            ))
+        return True
+
+    def _ingest_page_exit(self, cursor, event: Dict[str, Any], timestamp: str) -> bool:
+        if self.derive_sessions:
+            # The sessionizer may have moved the view to a split-off session id, so
+            # look it up by user; exit flags, end time and bounce are derived later
+            cursor.execute('''
+                SELECT id, timestamp FROM page_views
+                WHERE user_id = ? AND page_url = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (event['user_id'], event.get('page_url')))
+        else:
+            cursor.execute('''
+                SELECT id, timestamp FROM page_views
+                WHERE session_id = ? AND page_url = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (event['session_id'], event.get('page_url')))
+        row = cursor.fetchone()
+        if not row:
+            return False
+
+        self._page_view_updated(cursor, row[1])
+        if self.derive_sessions:
+            cursor.execute('''
+                UPDATE page_views
+                SET time_on_page = ?
+                WHERE id = ?
+            ''', (event.get('time_on_page'), row[0]))
+            return True
+
+        cursor.execute('''
+            UPDATE page_views
+            SET time_on_page = ?, exit_page = TRUE
+            WHERE id = ?
+        ''', (event.get('time_on_page'), row[0]))
+
+        cursor.execute('SELECT page_views, start_time FROM sessions WHERE id = ?', (event['session_id'],))
+        session = cursor.fetchone()
+        if session:
+            page_views, start_time = session
+            duration = max(0.0, (datetime.fromisoformat(timestamp) - datetime.fromisoformat(start_time)).total_seconds())
+            cursor.execute('''
+                UPDATE sessions
+                SET end_time = ?, duration = ?, bounce = ?
+                WHERE id = ?
+            ''', (timestamp, duration, page_views == 1 and duration < 10, event['session_id']))
+            # Session rollups are keyed by the day the session started
+            self.rollups.mark_stale(cursor, datetime.fromisoformat(start_time).date())
+        return True
+
+    def _page_view_updated(self, cursor, view_timestamp: str):
+        """
+        Record an in-place update to a page view (call inside the writing transaction)
+
+        Compacted rollups of its day are rebuilt, and in derive mode its session is
+        re-derived by the next sessionizer run even if the session is long closed.
+        """
+        self.rollups.mark_stale(cursor, datetime.fromisoformat(view_timestamp).date())
+        if self.derive_sessions:
+            Sessionizer.mark_dirty(cursor, view_timestamp)
+
+    def _ingest_custom_event(self, cursor, event: Dict[str, Any], timestamp: str) -> bool:
+        if not event.get('event_name'):
+            return False
+        cursor.execute('''
+            INSERT INTO custom_events (id, session_id, user_id, timestamp, event_name, properties, page_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            str(uuid.uuid4()), event['session_id'], event['user_id'], timestamp,
+            event['event_name'], json.dumps(event.get('properties') or {}), event.get('page_url')
+        ))
+        return True
+
+    def _ingest_conversion(self, cursor, event: Dict[str, Any], timestamp: str) -> bool:
+        event_type = event.get('conversion_type') or event.get('conversion_event')
+        if not event_type:
+            return False
+        cursor.execute('''
+            INSERT INTO conversions (id, session_id, user_id, timestamp, event_type, page_url, value)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            str(uuid.uuid4()), event['session_id'], event['user_id'], timestamp,
+            event_type, event.get('page_url') or "", event.get('value')
+        ))
+        if not self.derive_sessions:
+            cursor.execute('''
+                UPDATE sessions
+                SET conversions = conversions + 1
+                WHERE id = ?
+            ''', (event['session_id'],))
+
+        cursor.execute('SELECT conversion_events FROM users WHERE id = ?', (event['user_id'],))
+        result = cursor.fetchone()
+        if result is not None:
+            events = json.loads(result[0]) if result[0] else []
+            events.append(event_type)
+            cursor.execute('''
+                UPDATE users
+                SET conversion_events = ?
+                WHERE id = ?
+            ''', (json.dumps(events), event['user_id']))
+        return True
 
 
 # Example usage and testing
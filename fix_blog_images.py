@@ -11,8 +11,13 @@ This script will fix common issues that prevent blog post thumbnails from showin
 
 import os
 import re
+import sys
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
+
 def fix_blog_images():
     """Fix image loading issues in blog pages"""
     
@@ -82,8 +87,7 @@ def fix_blog_images():
         
         # Save if changes were made
         if content != original_content:
-            with open(blog_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_if_changed(blog_file, content)
             print(f"  ✓ Fixed image loading issues")
         else:
             print(f"  ✓ No issues found")
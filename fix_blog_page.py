@@ -14,6 +14,11 @@ import re
 from pathlib import Path
 from datetime import datetime
 import json
+import sys
+
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
 
 def create_placeholder_images():
     """Create SVG placeholder images for blog categories"""
@@ -52,8 +57,7 @@ def create_placeholder_images():
 </svg>'''
         
         # Save SVG file
-        with open(blog_images_dir / f"placeholder-{category}.svg", 'w') as f:
-            f.write(svg_content)
+        write_if_changed(blog_images_dir / f"placeholder-{category}.svg", svg_content)
         
         print(f"  ✓ Created placeholder-{category}.svg")
 
@@ -507,8 +511,7 @@ def update_blog_index(posts_data):
 </html>'''
 
     # Write the updated HTML
-    with open(blog_index_path, 'w', encoding='utf-8') as f:
-        f.write(blog_html)
+    write_if_changed(blog_index_path, blog_html)
     
     print(f"  ✓ Updated blog index with {total_posts} posts")
     print(f"  ✓ Categories: Solar ({category_counts.get('solar', 0)}), Wind ({category_counts.get('wind', 0)}), Storage ({category_counts.get('battery', 0)}), Smart Grid ({category_counts.get('grid-tech', 0)}), Policy ({category_counts.get('policy', 0)})")
@@ -5,6 +5,12 @@ Fix individual blog post file navigation paths
 
 import os
 import glob
+import sys
+from pathlib import Path
+
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
 
 def fix_blog_post_paths():
     """Fix navigation paths in individual blog post files"""
@@ -47,8 +53,7 @@ def fix_blog_post_paths():
                 
                 # Write back if changes were made
                 if content != original_content:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
+                    write_if_changed(file_path, content)
                     print(f"  → Updated file")
                 else:
                     print(f"  → No changes needed")
@@ -5,8 +5,13 @@ Fix remaining absolute path issues (home page links)
 
 import os
 import re
+import sys
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
+
 def fix_home_links():
     """Fix home page links to use relative paths"""
     
@@ -61,8 +66,7 @@ def fix_home_links():
             
             # Write back if changes were made
             if content != original_content:
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                write_if_changed(html_file, content, base_dir)
                 print(f"✓ Fixed: {os.path.relpath(html_file, base_dir)}")
                 files_changed += 1
                 
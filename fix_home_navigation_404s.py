@@ -11,8 +11,13 @@ This script fixes all the broken home navigation links identified in the verific
 
 import os
 import re
+import sys
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
+
 def fix_navigation_links(base_dir):
     """Fix all navigation 404 issues"""
     
@@ -103,8 +108,7 @@ def fix_navigation_links(base_dir):
             
             # Save if changes were made
             if content != original_content:
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                write_if_changed(html_file, content, base_dir)
                 
                 files_fixed += 1
                 print(f"  ✓ Fixed navigation issues")
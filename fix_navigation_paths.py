@@ -18,8 +18,13 @@ It preserves existing functionality while making paths work in all hosting envir
 
 import os
 import re
+import sys
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
+
 def get_relative_path_prefix(file_path, base_dir):
     """
     Calculate the correct relative path prefix based on file depth
@@ -92,8 +97,7 @@ def fix_navigation_paths(file_path, base_dir):
         
         # Write back if changes were made
         if changes_made:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_if_changed(file_path, content, base_dir)
             print(f"  → Updated file with relative paths")
             return True
         else:
@@ -7,8 +7,13 @@ This script fixes remaining "/" home page links throughout the site.
 
 import os
 import re
+import sys
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from site_writer import write_if_changed
+
 def get_relative_path_prefix(file_path, base_dir):
     """Calculate the correct relative path prefix based on file depth"""
     relative_path = os.path.relpath(file_path, base_dir)
@@ -68,8 +73,7 @@ def fix_home_links_comprehensive(file_path, base_dir):
         
         # Write back if changes were made
         if changes_made:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_if_changed(file_path, content, base_dir)
             print(f"  → Updated file")
             return True
         else:
@@ -33,6 +33,8 @@ import textstat
 from datetime import datetime
 import glob
 
+from keyword_matcher import get_matcher
+
 # Download required NLTK data
 try:
     nltk.download('punkt', quiet=True)
@@ -188,11 +190,11 @@ class AdvancedEnergyDataPreprocessor:
             pass
         
         # Energy domain relevance
+        # One scan counts every term; terms listed in several categories count once per listing
         text_lower = text.lower()
-        energy_term_count = 0
-        for category in self.energy_terms.values():
-            for term in category:
-                energy_term_count += text_lower.count(term.lower())
+        all_terms = [term.lower() for category in self.energy_terms.values() for term in category]
+        term_counts = get_matcher(all_terms).counts(text_lower)
+        energy_term_count = sum(term_counts[term] for term in all_terms)
         
         if quality_metrics['word_count'] > 0:
             quality_metrics['energy_term_density'] = energy_term_count / quality_metrics['word_count']
@@ -228,13 +230,9 @@ class AdvancedEnergyDataPreprocessor:
         
         # Extract energy-specific terms
         text_lower = text.lower()
-        for tech in self.energy_terms['technologies']:
-            if tech in text_lower:
-                entities['technologies'].append(tech)
-        
-        for concept in self.energy_terms['concepts']:
-            if concept in text_lower:
-                entities['concepts'].append(concept)
+        found_terms = get_matcher(self.energy_terms['technologies'] + self.energy_terms['concepts']).find_all(text_lower)
+        entities['technologies'].extend(tech for tech in self.energy_terms['technologies'] if tech in found_terms)
+        entities['concepts'].extend(concept for concept in self.energy_terms['concepts'] if concept in found_terms)
         
         # Remove duplicates
         for key in entities:
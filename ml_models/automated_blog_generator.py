@@ -5,6 +5,7 @@ Includes automatic website integration and Git operations
 """
 
 import os
+import sys
 import json
 import re
 import subprocess
@@ -13,12 +14,39 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import random
 
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from content_index import ContentIndex
+from title_index import TitleIndex
+from keyword_matcher import get_matcher, first_matching_group
+
 class AutomatedBlogGenerator:
     """
     Generates complete HTML blog posts for the RenewablePowerInsight website
     Automatically saves posts to the posts/ directory
     """
     
+    # Keyword groups in priority order, used by categorize_content
+    CATEGORY_KEYWORDS = [
+        ("Solar Energy", ['solar', 'photovoltaic', 'pv']),
+        ("Wind Energy", ['wind', 'turbine', 'offshore']),
+        ("Energy Storage", ['battery', 'storage', 'grid-scale']),
+        ("Energy Policy", ['policy', 'regulation', 'incentive', 'government']),
+        ("Clean Technology", ['ai', 'smart', 'technology', 'innovation']),
+        ("Energy Markets", ['investment', 'market', 'funding', 'finance'])
+    ]
+    
+    # Keyword groups in priority order, used by _determine_image_category
+    IMAGE_CATEGORY_KEYWORDS = [
+        ("solar", ["solar", "photovoltaic", "pv", "solar panel"]),
+        ("wind", ["wind", "turbine", "offshore wind", "onshore wind"]),
+        ("storage", ["battery", "storage", "grid storage", "energy storage"]),
+        ("policy", ["policy", "regulation", "government", "legislation"]),
+        ("technology", ["smart grid", "technology", "innovation", "ai"]),
+        ("markets", ["market", "investment", "finance", "cost"])
+    ]
+    
     def __init__(self, posts_dir: str = "posts"):
         self.posts_dir = Path(posts_dir)
         self.posts_dir.mkdir(exist_ok=True)
@@ -29,7 +57,7 @@ class AutomatedBlogGenerator:
         # Initialize uniqueness tracking
         self.used_images = set()
         self.used_topics = set()
-        self.used_titles = set()
+        self.used_titles = TitleIndex()
         self._load_existing_content()
         
         # Category mapping to website navigation structure - UPDATED WITH NEW CATEGORIES
@@ -566,42 +594,45 @@ class AutomatedBlogGenerator:
         """Load existing posts to track used images, topics, and titles for uniqueness"""
         print("🔍 Loading existing content for uniqueness tracking...")
         
-        # Scan all existing HTML files in posts directory
-        for category_folder in self.posts_dir.iterdir():
-            if category_folder.is_dir() and category_folder.name != '__pycache__':
-                for html_file in category_folder.glob("*.html"):
-                    if html_file.name == "index.html":  # Skip category index pages
-                        continue
-                    
-                    try:
-                        with open(html_file, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        # Extract title from filename and HTML
-                        title_from_filename = html_file.stem.replace('-', ' ').title()
-                        self.used_titles.add(title_from_filename.lower())
-                        
-                        # Extract title from HTML <title> tag
-                        import re
-                        title_match = re.search(r'<title>(.*?) - Renewable Power Insight</title>', content)
-                        if title_match:
-                            self.used_titles.add(title_match.group(1).lower())
-                        
-                        # Extract image URLs
-                        img_matches = re.findall(r'<img[^>]+src="([^"]+)"', content)
-                        for img_url in img_matches:
-                            self.used_images.add(img_url)
-                        
-                        # Extract topic keywords from content for uniqueness checking
-                        self._extract_topics_from_content(content.lower())
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error loading {html_file}: {e}")
+        # Only posts added or modified since the last run are re-parsed
+        self.content_index = ContentIndex(self.posts_dir, self._extract_uniqueness_data)
+        for entry in self.content_index.refresh().values():
+            self.used_titles.update(entry['titles'])
+            self.used_images.update(entry['images'])
+            self.used_topics.update(entry['topics'])
         
-        print(f"📊 Loaded uniqueness data: {len(self.used_titles)} titles, {len(self.used_images)} images, {len(self.used_topics)} topics")
+        index_stats = self.content_index.stats
+        print(f"📊 Loaded uniqueness data: {len(self.used_titles)} titles, {len(self.used_images)} images, {len(self.used_topics)} topics "
+              f"({index_stats['parsed']} parsed, {index_stats['reused']} cached)")
+    
+    def _extract_uniqueness_data(self, html_file: Path, content: str) -> Dict[str, List[str]]:
+        """Extract titles, image URLs and topics from a single post for the content index"""
+        titles = set()
+        
+        # Extract title from filename and HTML
+        title_from_filename = html_file.stem.replace('-', ' ').title()
+        titles.add(title_from_filename.lower())
+        
+        # Extract title from HTML <title> tag
+        title_match = re.search(r'<title>(.*?) - Renewable Power Insight</title>', content)
+        if title_match:
+            titles.add(title_match.group(1).lower())
+        
+        # Extract image URLs
+        images = set(re.findall(r'<img[^>]+src="([^"]+)"', content))
+        
+        return {
+            'titles': list(titles),
+            'images': list(images),
+            'topics': self._find_topics(content.lower())
+        }
     
     def _extract_topics_from_content(self, content_lower: str):
         """Extract topic keywords from content for uniqueness tracking"""
+        self.used_topics.update(self._find_topics(content_lower))
+    
+    def _find_topics(self, content_lower: str) -> List[str]:
+        """Return the tracked topic keywords that appear in the content"""
         topic_keywords = [
             # Solar topics
             'solar panel efficiency', 'floating solar', 'perovskite solar', 'rooftop solar', 
@@ -626,9 +657,8 @@ class AutomatedBlogGenerator:
             'carbon capture', 'microgrid technology', 'energy efficiency'
         ]
         
-        for topic in topic_keywords:
-            if topic in content_lower:
-                self.used_topics.add(topic)
+        found = get_matcher(topic_keywords).find_all(content_lower)
+        return [topic for topic in topic_keywords if topic in found]
     
     def check_content_uniqueness(self, title: str, content: str, image_url: str = None) -> Dict[str, any]:
         """
@@ -650,16 +680,11 @@ class AutomatedBlogGenerator:
         title_lower = title.lower()
         title_similarity_threshold = 0.8
         
-        for existing_title in self.used_titles:
-            # Simple similarity check - if more than 80% of words match, flag as too similar
-            title_words = set(title_lower.split())
-            existing_words = set(existing_title.split())
-            
-            if len(title_words) > 0:
-                similarity = len(title_words.intersection(existing_words)) / len(title_words.union(existing_words))
-                if similarity > title_similarity_threshold:
-                    issues.append(f"Title too similar to existing post: '{existing_title}'")
-                    suggestions.append(f"Try adding year/date, specific technology variant, or regional focus")
+        # If more than 80% of words match (Jaccard), flag as too similar; the title
+        # index only verifies titles sharing enough words to pass the threshold
+        for existing_title, similarity in self.used_titles.find_similar(title_lower, title_similarity_threshold):
+            issues.append(f"Title too similar to existing post: '{existing_title}'")
+            suggestions.append(f"Try adding year/date, specific technology variant, or regional focus")
         
         # Check image uniqueness
         if image_url and image_url in self.used_images:
@@ -667,11 +692,9 @@ class AutomatedBlogGenerator:
             suggestions.append("Select a different image variant from the available options")
         
         # Check topic uniqueness
-        content_lower = content.lower()
-        overlapping_topics = []
-        for topic in self.used_topics:
-            if topic in content_lower:
-                overlapping_topics.append(topic)
+        # used_topics only ever holds tracked topic keywords, so one scan finds them all
+        content_topics = set(self._find_topics(content.lower()))
+        overlapping_topics = [topic for topic in self.used_topics if topic in content_topics]
         
         if len(overlapping_topics) > 2:
             warnings.append(f"High topic overlap detected: {', '.join(overlapping_topics[:3])}")
@@ -723,21 +746,8 @@ class AutomatedBlogGenerator:
         """Determine the best image category based on content and category"""
         content_lower = content.lower()
         
-        # Check for specific keywords in content
-        if any(keyword in content_lower for keyword in ["solar", "photovoltaic", "pv", "solar panel"]):
-            return "solar"
-        elif any(keyword in content_lower for keyword in ["wind", "turbine", "offshore wind", "onshore wind"]):
-            return "wind"  
-        elif any(keyword in content_lower for keyword in ["battery", "storage", "grid storage", "energy storage"]):
-            return "storage"
-        elif any(keyword in content_lower for keyword in ["policy", "regulation", "government", "legislation"]):
-            return "policy"
-        elif any(keyword in content_lower for keyword in ["smart grid", "technology", "innovation", "ai"]):
-            return "technology"
-        elif any(keyword in content_lower for keyword in ["market", "investment", "finance", "cost"]):
-            return "markets"
-        else:
-            return "default"
+        # Check for specific keywords in content (first matching group wins)
+        return first_matching_group([content_lower], self.IMAGE_CATEGORY_KEYWORDS, "default")
     
     def generate_unique_content_variations(self, base_title: str, base_content: str, max_attempts: int = 5) -> Dict[str, str]:
         """
@@ -945,21 +955,8 @@ class AutomatedBlogGenerator:
         title_lower = title.lower()
         content_lower = content.lower()
         
-        # Check for category keywords
-        if any(word in title_lower or word in content_lower for word in ['solar', 'photovoltaic', 'pv']):
-            return "Solar Energy"
-        elif any(word in title_lower or word in content_lower for word in ['wind', 'turbine', 'offshore']):
-            return "Wind Energy"
-        elif any(word in title_lower or word in content_lower for word in ['battery', 'storage', 'grid-scale']):
-            return "Energy Storage"
-        elif any(word in title_lower or word in content_lower for word in ['policy', 'regulation', 'incentive', 'government']):
-            return "Energy Policy"
-        elif any(word in title_lower or word in content_lower for word in ['ai', 'smart', 'technology', 'innovation']):
-            return "Clean Technology"
-        elif any(word in title_lower or word in content_lower for word in ['investment', 'market', 'funding', 'finance']):
-            return "Energy Markets"
-        else:
-            return "Renewable Energy"
+        # Check for category keywords (first matching group wins)
+        return first_matching_group([title_lower, content_lower], self.CATEGORY_KEYWORDS, "Renewable Energy")
     
     def get_topic_image(self, content, category):
         """Determine the most appropriate hero image based on content and category."""
@@ -1291,22 +1288,33 @@ class AutomatedBlogGenerator:
                 # Add to tracking sets
                 self.used_titles.add(title.lower())
                 self._extract_topics_from_content(content.lower())
+                self.content_index.update_file(file_path, html_content)
+                self.content_index.save()
                 
                 # Update integration stats
                 self.integration_stats['posts_created'] += 1
                 self.integration_stats['last_integration'] = datetime.now().isoformat()
                 
                 # AUTOMATIC WEBSITE INTEGRATION
+                # Records the post in the manifest and re-renders only the pages it appears on
                 website_integrated = False
                 try:
-                    from website_integrator import WebsiteIntegrator
-                    integrator = WebsiteIntegrator(self.posts_dir)
-                    integration_success = integrator.integrate_new_post(file_path)
+                    from full_website_integrator import FullWebsiteIntegrator
+                    integrator = FullWebsiteIntegrator(self.posts_dir.parent)
+                    integration_success = integrator.integrate_post(file_path, html_content)['success']
                     
                     if integration_success:
                         print(f"🔗 Successfully integrated post into website structure")
                         website_integrated = True
                         self.integration_stats['website_integrations'] += 1
+                        
+                        # Keep the per-post entry in integration_log.json
+                        from website_integrator import WebsiteIntegrator
+                        WebsiteIntegrator(self.posts_dir).log_integration({
+                            'title': title,
+                            'file_path': str(file_path),
+                            'category': category_folder
+                        })
                     else:
                         print(f"⚠️ Post created but website integration failed")
                 except Exception as e:
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Generation Throughput Benchmark
+Compares posts/minute of the one-prompt-at-a-time loop against batched,
+left-padded generation in EnergyInference
+
+Run from the project root (nothing is written to posts/):
+    python -m ml_models.benchmark_generation --posts 8 --batch-sizes 2 4 8
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from .inference import EnergyInference
+
+BENCHMARK_TOPICS = [
+    "solar power innovations", "energy storage solutions", "electric vehicle infrastructure",
+    "offshore wind farms", "green hydrogen production", "smart grid modernization",
+    "battery recycling", "carbon capture technology", "geothermal energy", "community solar programs"
+]
+
+
+def _posts_per_minute(post_count: int, seconds: float) -> float:
+    return post_count * 60.0 / seconds if seconds > 0 else 0.0
+
+
+def run_benchmark(inference: EnergyInference, topics: List[str], batch_sizes: List[int],
+                  target_length: int) -> Dict[str, any]:
+    """Time the sequential loop and each batch size on the same topics"""
+    results = {
+        'device': str(inference.device),
+        'posts': len(topics),
+        'target_length': target_length,
+        'runs': []
+    }
+
+    print(f"⏱️ Sequential loop: {len(topics)} posts")
+    start = time.perf_counter()
+    for topic in topics:
+        inference.generate_blog_post(topic, target_length)
+    elapsed = time.perf_counter() - start
+    baseline = _posts_per_minute(len(topics), elapsed)
+    results['runs'].append({'mode': 'loop', 'batch_size': 1, 'seconds': elapsed, 'posts_per_minute': baseline})
+    print(f"   {elapsed:.1f}s, {baseline:.2f} posts/min")
+
+    for batch_size in batch_sizes:
+        print(f"⏱️ Batched generation: batch_size={batch_size}")
+        start = time.perf_counter()
+        inference.generate_blog_posts(topics, target_length, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        rate = _posts_per_minute(len(topics), elapsed)
+        results['runs'].append({
+            'mode': 'batched',
+            'batch_size': batch_size,
+            'seconds': elapsed,
+            'posts_per_minute': rate,
+            'speedup': rate / baseline if baseline else None
+        })
+        print(f"   {elapsed:.1f}s, {rate:.2f} posts/min ({rate / baseline:.2f}x)" if baseline else f"   {elapsed:.1f}s")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequential vs batched blog generation')
+    parser.add_argument('--model-path', default='ml_models/model_checkpoints', help='Checkpoint directory')
+    parser.add_argument('--posts', type=int, default=8, help='Number of posts per run')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[2, 4, 8], help='Micro-batch sizes to test')
+    parser.add_argument('--target-length', type=int, default=200, help='Generated tokens per post body')
+    parser.add_argument('--output', help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    topics = [BENCHMARK_TOPICS[i % len(BENCHMARK_TOPICS)] for i in range(args.posts)]
+    inference = EnergyInference(args.model_path)
+
+    results = run_benchmark(inference, topics, args.batch_sizes, args.target_length)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Post Metadata Extraction Benchmark
+Compares the BeautifulSoup extraction the integrators used to run against the
+streaming html.parser extractor over the posts/ tree, and checks that both
+produce the same fields
+
+Run from the project root (posts are only read):
+    python ml_models/benchmark_metadata.py --posts-dir posts --repeat 5
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from post_metadata import extract_post_fields
+
+# Fields each integrator requests
+FIELD_SETS = {
+    'full_website_integrator': ('title', 'post_title', 'post_meta', 'excerpt'),
+    'website_integrator': ('h1', 'title', 'first_paragraph', 'image', 'word_count')
+}
+
+# Malformed markup the streaming extractor must read the way BeautifulSoup does:
+# unclosed <p> elements end with their parent, a stray <p> runs to the end of the document
+EDGE_CASES = [
+    '<div class="post-content"><p>' + 'First unclosed paragraph. ' * 3 + '<p>' + 'Second one. ' * 5
+    + '</div><p>After the content</p>',
+    '<h1>Title</h1><p>Stray paragraph<div class="post-content"><p>' + 'Inside the content. ' * 4 + '</p></div>',
+    '<div class="post-content"><p>short<p>' + 'Nested paragraph text. ' * 3 + '</p></p></div>',
+    '<div class="post-meta">June <span>2024</div><div class="post-content"><p>too short</div>',
+]
+
+
+def _text(tag):
+    return tag.get_text() if tag else None
+
+
+def soup_fields(content: str, fields) -> Dict:
+    """The same fields read from a full BeautifulSoup tree (the previous extraction path)"""
+    soup = BeautifulSoup(content, 'html.parser')
+    result = {}
+    if 'title' in fields:
+        result['title'] = _text(soup.find('title'))
+    if 'h1' in fields:
+        result['h1'] = _text(soup.find('h1'))
+    if 'post_title' in fields:
+        result['post_title'] = _text(soup.find('h1', class_='post-title'))
+    if 'post_meta' in fields:
+        result['post_meta'] = _text(soup.find('div', class_='post-meta'))
+    if 'first_paragraph' in fields:
+        result['first_paragraph'] = _text(soup.find('p'))
+    if 'excerpt' in fields:
+        result['excerpt'] = None
+        content_div = soup.find('div', class_='post-content')
+        if content_div:
+            for p in content_div.find_all('p'):
+                text = p.get_text().strip()
+                if len(text) > 50:
+                    result['excerpt'] = text
+                    break
+    if 'image' in fields:
+        img_tag = soup.find('img')
+        result['image'] = (img_tag.get('src', ''), img_tag.get('alt', '')) if img_tag else None
+    if 'word_count' in fields:
+        result['word_count'] = len(soup.get_text().split())
+    return result
+
+
+def _time_extractor(extract, documents: List[str], fields, repeat: int) -> float:
+    """Best-of-repeat seconds to extract the fields from every document"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in documents:
+            extract(content, fields)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(posts_dir: Path, repeat: int) -> Dict[str, any]:
+    """Time both extractors for each integrator's field set on every post"""
+    post_files = sorted(p for p in posts_dir.rglob('*.html') if p.name != 'index.html')
+    documents = [p.read_text(encoding='utf-8') for p in post_files]
+    results = {
+        'posts': len(documents),
+        'bytes': sum(len(content.encode('utf-8')) for content in documents),
+        'repeat': repeat,
+        'runs': []
+    }
+    print(f"📄 {len(documents)} posts, {results['bytes'] / 1024:.0f} KiB")
+    if not documents:
+        return results
+
+    for name, fields in FIELD_SETS.items():
+        print(f"⏱️ {name}: {', '.join(fields)}")
+        run = {'integrator': name, 'fields': list(fields)}
+
+        streaming = _time_extractor(extract_post_fields, documents, fields, repeat)
+        run['streaming_ms_per_post'] = streaming * 1000 / len(documents)
+        print(f"   streaming: {run['streaming_ms_per_post']:.3f} ms/post")
+
+        if BS4_AVAILABLE:
+            soup = _time_extractor(soup_fields, documents, fields, repeat)
+            run['soup_ms_per_post'] = soup * 1000 / len(documents)
+            run['speedup'] = soup / streaming if streaming else None
+            mismatches = [
+                str(post_file) for post_file, content in zip(post_files, documents)
+                if extract_post_fields(content, fields) != soup_fields(content, fields)
+            ]
+            mismatches += [
+                f"edge case {n}" for n, content in enumerate(EDGE_CASES, 1)
+                if extract_post_fields(content, fields) != soup_fields(content, fields)
+            ]
+            run['mismatches'] = mismatches
+            print(f"   soup:      {run['soup_ms_per_post']:.3f} ms/post ({run['speedup']:.1f}x speedup)")
+            if mismatches:
+                print(f"   ⚠️ {len(mismatches)} posts differ, e.g. {mismatches[0]}")
+            else:
+                print("   ✅ identical fields on every post")
+        else:
+            print("   ⚠️ bs4 not installed, soup baseline skipped")
+        results['runs'].append(run)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark soup vs streaming post metadata extraction')
+    parser.add_argument('--posts-dir', default='posts', help='Posts directory to read')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes per extractor (best is kept)')
+    parser.add_argument('--output', help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    results = run_benchmark(Path(args.posts_dir), max(1, args.repeat))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
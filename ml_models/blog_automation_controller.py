@@ -26,13 +26,7 @@ except ImportError as e:
     print(f"⚠️  Website integration not available: {e}")
     HAS_WEBSITE_INTEGRATION = False
 
-try:
-    from inference import EnergyInference
-    HAS_ML = True
-except ImportError as e:
-    print(f"⚠️  ML dependencies not available: {e}")
-    print("📝 Running in demo mode with sample content generation")
-    HAS_ML = False
+from inference_client import InferenceClient
 
 class BlogAutomationController:
     """
@@ -56,16 +50,23 @@ class BlogAutomationController:
             self.website_integrator = None
             print("⚠️  Website integration disabled - posts will be created without integration")
         
-        # Initialize ML inference if available
-        if HAS_ML:
+        # Initialize ML inference, preferring a resident inference server so
+        # torch/transformers are only imported and loaded when none is running
+        self.ml_inference = None
+        inference_client = InferenceClient(posts_dir=str(self.posts_dir))
+        if inference_client.is_available():
+            self.ml_inference = inference_client
+            print(f"🔌 Using resident inference server at {inference_client.url}")
+        else:
             try:
+                from inference import EnergyInference
                 self.ml_inference = EnergyInference()
                 print("🤖 ML inference system loaded")
+            except ImportError as e:
+                print(f"⚠️  ML dependencies not available: {e}")
+                print("📝 Running in demo mode with sample content generation")
             except Exception as e:
                 print(f"⚠️  ML system failed to load: {e}")
-                self.ml_inference = None
-        else:
-            self.ml_inference = None
         
         # Create logs directory
         self.logs_dir = Path("automation_logs")
@@ -434,7 +435,7 @@ The continued innovation in {topic} represents a crucial step toward achieving g
         
         selected_topics = random.sample(self.energy_topics, min(count, len(self.energy_topics)))
         
-        if HAS_ML:
+        if self.ml_inference:
             return self.ml_inference.batch_generate_posts(selected_topics, target_length=800)
         else:
             return self._generate_demo_posts(selected_topics)
@@ -443,7 +444,7 @@ The continued innovation in {topic} represents a crucial step toward achieving g
         """Generate a single custom blog post"""
         print(f"📝 Generating custom post about: {topic}")
         
-        if HAS_ML:
+        if self.ml_inference:
             return self.ml_inference.generate_and_save_blog_post(topic, category=category)
         else:
             return self._generate_demo_post(topic, category)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Persistent Content Index for Uniqueness Tracking
+Caches the titles, images and topics extracted from each post so that
+generators only re-parse posts that changed since the last run
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+class ContentIndex:
+    """
+    JSON sidecar index of per-post uniqueness data
+    Entries are keyed by post path relative to the posts directory and are
+    reused as long as the file's mtime and size are unchanged
+    """
+
+    INDEX_VERSION = 1
+    INDEX_FILENAME = ".uniqueness_index.json"
+
+    def __init__(self, posts_dir, extractor: Callable[[Path, str], Dict[str, List[str]]],
+                 index_file=None):
+        """
+        Args:
+            posts_dir: Root posts directory containing category folders
+            extractor: Function (html_file, content) -> {'titles', 'images', 'topics'}
+            index_file: Override location of the sidecar file
+        """
+        self.posts_dir = Path(posts_dir)
+        self.extractor = extractor
+        self.index_file = Path(index_file) if index_file else self.posts_dir / self.INDEX_FILENAME
+        self.entries: Dict[str, Dict] = {}
+        self.stats = {"reused": 0, "parsed": 0, "removed": 0, "errors": 0}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """Load the sidecar file, discarding it if missing or from another version"""
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.INDEX_VERSION:
+                self.entries = data.get("entries", {})
+        except Exception as e:
+            print(f"⚠️ Could not read uniqueness index, rebuilding: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the index atomically if anything changed"""
+        if not self._dirty:
+            return
+        tmp_file = self.index_file.with_suffix(self.index_file.suffix + ".tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.INDEX_VERSION, "entries": self.entries}, f)
+            os.replace(tmp_file, self.index_file)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️ Could not save uniqueness index: {e}")
+
+    def iter_post_files(self):
+        """Yield every post file under the category folders (category index pages excluded)"""
+        for category_folder in self.posts_dir.iterdir():
+            if category_folder.is_dir() and category_folder.name != '__pycache__':
+                for html_file in category_folder.glob("*.html"):
+                    if html_file.name == "index.html":
+                        continue
+                    yield html_file
+
+    def update_file(self, html_file: Path, content: str = None, stat_result=None) -> Dict[str, List[str]]:
+        """Re-extract a single post and store its entry"""
+        html_file = Path(html_file)
+        if stat_result is None:
+            stat_result = html_file.stat()
+        if content is None:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+        extracted = self.extractor(html_file, content)
+        self.entries[self._key(html_file)] = {
+            "mtime": stat_result.st_mtime_ns,
+            "size": stat_result.st_size,
+            "titles": sorted(extracted.get("titles", [])),
+            "images": sorted(extracted.get("images", [])),
+            "topics": sorted(extracted.get("topics", []))
+        }
+        self._dirty = True
+        return extracted
+
+    def refresh(self) -> Dict[str, Dict]:
+        """
+        Bring the index in sync with the posts directory
+
+        Returns:
+            Mapping of relative post path to its cached entry
+        """
+        seen = set()
+        for html_file in self.iter_post_files():
+            key = self._key(html_file)
+            seen.add(key)
+            try:
+                stat_result = html_file.stat()
+                entry = self.entries.get(key)
+                if (entry and entry.get("mtime") == stat_result.st_mtime_ns
+                        and entry.get("size") == stat_result.st_size):
+                    self.stats["reused"] += 1
+                    continue
+                self.update_file(html_file, stat_result=stat_result)
+                self.stats["parsed"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️ Error loading {html_file}: {e}")
+
+        for key in [key for key in self.entries if key not in seen]:
+            del self.entries[key]
+            self.stats["removed"] += 1
+            self._dirty = True
+
+        self.save()
+        return self.entries
+
+    def _key(self, html_file: Path) -> str:
+        return Path(html_file).relative_to(self.posts_dir).as_posix()
@@ -5,13 +5,26 @@ Updates both homepage and blog index with real content
 """
 
 import os
+import sys
 import json
+import html
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment
 import re
 
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from post_manifest import PostManifest
+from post_metadata import extract_post_fields
+from site_renderer import SiteRenderer, JINJA2_AVAILABLE
+from site_writer import SiteWriter
+
+# Stands in for the article cards while the blog index template is serialized
+ARTICLES_PLACEHOLDER = "ARTICLES-GRID-POSTS"
+
 class FullWebsiteIntegrator:
     """
     Comprehensive website integration system that:
@@ -19,11 +32,18 @@ class FullWebsiteIntegrator:
     2. Updates the main homepage with real content
     3. Updates the blog index with all posts
     4. Creates proper navigation and categorization
+    
+    Post metadata is kept in a manifest (posts/.post_manifest.json), so only new or
+    edited posts are parsed, and a page is only re-rendered when its inputs change.
+    With workers > 1 those posts are parsed in a process pool. When Jinja2 is
+    installed, pages are rendered from compiled templates (site_renderer), which
+    also keeps the category index pages up to date.
     """
     
-    def __init__(self, project_root: Path = None):
+    def __init__(self, project_root: Path = None, workers: int = 1):
         self.project_root = project_root or Path(__file__).parent.parent
         self.posts_dir = self.project_root / "posts"
+        self.workers = workers
         self.integration_log = []
         
         # Category mapping
@@ -64,47 +84,67 @@ class FullWebsiteIntegrator:
                 "icon": "🌱"
             }
         }
+        
+        self.manifest = PostManifest(self.posts_dir, self.extract_post_metadata, categories=self.category_info)
+        # Pages are only written when their content changes, previous versions kept as deltas
+        self.writer = SiteWriter(self.project_root)
+        self.renderer = (SiteRenderer(self.project_root, self.category_info, writer=self.writer)
+                         if JINJA2_AVAILABLE else None)
+    
+    def __getstate__(self):
+        # Pool workers only extract metadata; don't ship them the manifest or renderer
+        state = self.__dict__.copy()
+        state['manifest'] = None
+        state['renderer'] = None
+        state['integration_log'] = []
+        return state
     
     def scan_all_posts(self) -> Dict[str, List[Dict]]:
-        """Scan all existing blog posts and extract metadata"""
+        """Scan all existing blog posts and extract metadata (new or edited posts only)"""
         print("🔍 Scanning all existing blog posts...")
         
-        all_posts = {}
-        total_posts = 0
+        self.manifest.refresh(self.workers)
+        all_posts = self.group_posts()
+        if self.manifest.last_scan is not None and self.workers != 1:
+            self.manifest.last_scan.print_timing()
         
-        for category_dir in self.posts_dir.iterdir():
-            if category_dir.is_dir() and category_dir.name in self.category_info:
-                category = category_dir.name
-                all_posts[category] = []
-                
-                for post_file in category_dir.glob("*.html"):
-                    try:
-                        post_data = self.extract_post_metadata(post_file)
-                        if post_data:
-                            all_posts[category].append(post_data)
-                            total_posts += 1
-                    except Exception as e:
-                        print(f"⚠️ Error reading {post_file}: {e}")
-                
-                # Sort posts by date (newest first)
-                all_posts[category].sort(key=lambda x: x.get('date_sort', ''), reverse=True)
-                
-                print(f"📁 {category}: Found {len(all_posts[category])} posts")
+        for category, posts in all_posts.items():
+            print(f"📁 {category}: Found {len(posts)} posts")
         
-        print(f"✅ Total posts found: {total_posts}")
+        stats = self.manifest.stats
+        print(f"✅ Total posts found: {sum(len(posts) for posts in all_posts.values())} "
+              f"({stats['parsed']} parsed, {stats['reused'] + stats['rehashed']} unchanged)")
         return all_posts
     
-    def extract_post_metadata(self, post_file: Path) -> Optional[Dict]:
+    def group_posts(self) -> Dict[str, List[Dict]]:
+        """Manifest posts by category, newest first"""
+        all_posts = {
+            category_dir.name: []
+            for category_dir in self.posts_dir.iterdir()
+            if category_dir.is_dir() and category_dir.name in self.category_info
+        }
+        for post in self.manifest.get_posts():
+            if post['category'] in all_posts:
+                all_posts[post['category']].append(post)
+        
+        # Sort posts by date (newest first)
+        for posts in all_posts.values():
+            posts.sort(key=lambda x: (x.get('date_sort', ''), x['url']), reverse=True)
+        return all_posts
+    
+    def extract_post_metadata(self, post_file: Path, content: str = None) -> Optional[Dict]:
         """Extract metadata from a blog post HTML file"""
         try:
-            with open(post_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(post_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
             
-            soup = BeautifulSoup(content, 'html.parser')
+            # Streaming parse: stops once the excerpt paragraph is read
+            fields = extract_post_fields(content, ('title', 'post_title', 'post_meta', 'excerpt'))
             
             # Extract title
-            title_elem = soup.find('h1', class_='post-title') or soup.find('title')
-            title = title_elem.get_text().strip() if title_elem else post_file.stem.replace('-', ' ').title()
+            title_text = fields['post_title'] if fields['post_title'] is not None else fields['title']
+            title = title_text.strip() if title_text is not None else post_file.stem.replace('-', ' ').title()
             
             # Clean up title (remove "- Renewable Power Insight" suffix)
             title = re.sub(r'\s*-\s*Renewable Power Insight.*$', '', title)
@@ -113,9 +153,8 @@ class FullWebsiteIntegrator:
             date_text = "Recent"
             date_sort = datetime.now().strftime("%Y-%m-%d")
             
-            meta_elem = soup.find('div', class_='post-meta')
-            if meta_elem:
-                date_match = re.search(r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}', meta_elem.get_text())
+            if fields['post_meta'] is not None:
+                date_match = re.search(r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}', fields['post_meta'])
                 if date_match:
                     date_text = date_match.group(0)
                     try:
@@ -124,17 +163,11 @@ class FullWebsiteIntegrator:
                     except:
                         pass
             
-            # Extract excerpt from content
-            content_div = soup.find('div', class_='post-content')
+            # Excerpt: first paragraph of the post content that's not very short
             excerpt = ""
-            if content_div:
-                # Get first paragraph that's not a heading
-                paragraphs = content_div.find_all('p')
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if len(text) > 50:  # Skip very short paragraphs
-                        excerpt = text[:200] + "..." if len(text) > 200 else text
-                        break
+            if fields['excerpt']:
+                text = fields['excerpt']
+                excerpt = text[:200] + "..." if len(text) > 200 else text
             
             if not excerpt:
                 excerpt = f"Comprehensive analysis of {title.lower()} and its impact on the renewable energy sector."
@@ -168,13 +201,7 @@ class FullWebsiteIntegrator:
         print("🏠 Updating homepage with real content...")
         
         try:
-            # Get the most recent posts across all categories for featured content
-            recent_posts = []
-            for category, posts in all_posts.items():
-                recent_posts.extend(posts[:2])  # Take top 2 from each category
-            
-            # Sort by date and take the most recent
-            recent_posts.sort(key=lambda x: x.get('date_sort', ''), reverse=True)
+            recent_posts = self.select_recent_posts(all_posts)
             
             # Use modern homepage template
             homepage_path = self.project_root / "index_modern.html"
@@ -204,16 +231,26 @@ class FullWebsiteIntegrator:
             self.update_sidebar_stats(soup, all_posts)
             
             # Save the updated homepage
-            with open(self.project_root / "index.html", 'w', encoding='utf-8') as f:
-                f.write(str(soup))
-            
-            print("✅ Homepage updated successfully")
+            if self.writer.write(self.project_root / "index.html", str(soup)):
+                print("✅ Homepage updated successfully")
+            else:
+                print("✅ Homepage already up to date")
             return True
             
         except Exception as e:
             print(f"❌ Error updating homepage: {e}")
             return False
     
+    def select_recent_posts(self, all_posts: Dict[str, List[Dict]]) -> List[Dict]:
+        """The most recent posts across all categories, for the homepage cards"""
+        recent_posts = []
+        for category, posts in all_posts.items():
+            recent_posts.extend(posts[:2])  # Take top 2 from each category
+        
+        # Sort by date and take the most recent
+        recent_posts.sort(key=lambda x: x.get('date_sort', ''), reverse=True)
+        return recent_posts
+    
     def update_featured_article(self, soup: BeautifulSoup, post: Dict):
         """Update the main featured article"""
         featured_card = soup.find('article', class_='article-card featured')
@@ -366,36 +403,40 @@ class FullWebsiteIntegrator:
                     if not article.has_attr('class') or 'coming-soon' not in article.get('class', []):
                         article.decompose()
                 
-                # Add real posts
-                all_posts_flat = []
-                for category, posts in all_posts.items():
-                    all_posts_flat.extend(posts)
-                
-                # Sort by date (newest first)
-                all_posts_flat.sort(key=lambda x: x.get('date_sort', ''), reverse=True)
-                
-                # Create article elements for each post
-                for post in all_posts_flat:
-                    article_html = self.create_blog_article_html(post)
-                    new_article = BeautifulSoup(article_html, 'html.parser')
-                    articles_grid.insert(0, new_article)  # Insert at beginning
+                # Cards go in as one string after serializing, not parsed one by one
+                articles_grid.insert(0, Comment(ARTICLES_PLACEHOLDER))
             
             # Update filter buttons with real counts
             self.update_filter_buttons(soup, all_posts)
             
-            # Save updated blog index
-            with open(self.project_root / "blog" / "index.html", 'w', encoding='utf-8') as f:
-                f.write(str(soup))
+            # Add real posts, newest first
+            articles_html = "".join(
+                self.create_blog_article_html(post) for post in self.flatten_posts(all_posts)
+            )
+            page = str(soup).replace(f"<!--{ARTICLES_PLACEHOLDER}-->", articles_html, 1)
             
-            print("✅ Blog index updated successfully")
+            # Save updated blog index
+            if self.writer.write(self.project_root / "blog" / "index.html", page):
+                print("✅ Blog index updated successfully")
+            else:
+                print("✅ Blog index already up to date")
             return True
             
         except Exception as e:
             print(f"❌ Error updating blog index: {e}")
             return False
     
+    def flatten_posts(self, all_posts: Dict[str, List[Dict]]) -> List[Dict]:
+        """All posts in one list, sorted by date (newest first)"""
+        all_posts_flat = []
+        for category, posts in all_posts.items():
+            all_posts_flat.extend(posts)
+        all_posts_flat.sort(key=lambda x: (x.get('date_sort', ''), x['url']), reverse=True)
+        return all_posts_flat
+    
     def create_blog_article_html(self, post: Dict) -> str:
         """Create HTML for a blog article card"""
+        post = {key: html.escape(str(value)) for key, value in post.items()}
         return f'''
         <article class="grid-article" data-category="{post['category']}">
             <div class="article-image">
@@ -437,22 +478,101 @@ class FullWebsiteIntegrator:
                 elif category in all_posts:
                     count_span.string = f"({len(all_posts[category])})"
     
-    def perform_full_integration(self) -> Dict[str, any]:
-        """Perform complete website integration"""
+    def render_changed_sections(self, all_posts: Dict[str, List[Dict]], force: bool = False) -> Dict[str, Dict]:
+        """
+        Re-render the homepage, blog index (and category pages, with the compiled
+        renderer) only if the posts they show changed
+        
+        The homepage depends on the most recent posts and the category counts, the
+        blog index on every post, a category page on its posts; each page's inputs
+        (and template) are hashed and compared with the manifest's record of the last render.
+        
+        Args:
+            all_posts: Posts by category, newest first
+            force: Render every page regardless
+            
+        Returns:
+            Dict of section -> {'success', 'rendered'}
+        """
+        counts = {category: len(posts) for category, posts in all_posts.items()}
+        recent_posts = self.select_recent_posts(all_posts)
+        if self.renderer:
+            # Every page from one set of contexts, each with its compiled template
+            sections = {
+                name: (partial(self.renderer.write_page, name, context), self.renderer.page_output(name),
+                       (context, self.renderer.template_signature(name)))
+                for name, context in self.renderer.pages(all_posts, recent_posts, self.flatten_posts(all_posts)).items()
+            }
+        else:
+            sections = {}
+            for name, render, template, output, inputs in (
+                ('homepage', self.update_homepage, self.project_root / "index_modern.html",
+                 self.project_root / "index.html", (recent_posts[:7], counts)),
+                ('blog_index', self.update_blog_index, self.project_root / "blog" / "index_modern.html",
+                 self.project_root / "blog" / "index.html", (self.flatten_posts(all_posts), counts))
+            ):
+                template_stat = template.stat() if template.exists() else None
+                sections[name] = (partial(render, all_posts), output,
+                                  (inputs, template_stat and (template_stat.st_mtime_ns, template_stat.st_size)))
+        
+        results = {}
+        for name, (render, output, inputs) in sections.items():
+            signature = PostManifest.signature(*inputs)
+            if not force and output.exists() and self.manifest.section_is_current(name, signature):
+                print(f"⏭️ {name} unchanged, skipped")
+                results[name] = {'success': True, 'rendered': False}
+                continue
+            success = render()
+            if success:
+                self.manifest.mark_rendered(name, signature)
+            results[name] = {'success': success, 'rendered': True}
+        
+        self.manifest.save()
+        return results
+    
+    def perform_full_integration(self, force: bool = False) -> Dict[str, any]:
+        """Perform complete website integration (pages whose posts did not change are skipped)"""
         print("🚀 Starting full website integration...")
         
         # Scan all posts
         all_posts = self.scan_all_posts()
+        return self._integrate(all_posts, force)
+    
+    def integrate_post(self, post_file: Path, content: str = None) -> Dict[str, any]:
+        """
+        Integrate one new or edited post without scanning the posts directory
         
+        Falls back to a full scan when the manifest does not cover every post on
+        disk (e.g. no manifest yet on a fresh checkout).
+        
+        Args:
+            post_file: Post HTML file inside a category folder
+            content: The file's content if already in memory
+        """
+        print(f"🔗 Integrating post: {Path(post_file).name}")
+        self.manifest.update_file(post_file, content)
+        if self.manifest.unrecorded_files():
+            # No manifest yet (fresh checkout) or posts added outside the generator:
+            # the listings would only show the posts the manifest knows about
+            print("🔍 Post manifest is missing posts, scanning the posts directory")
+            return self._integrate(self.scan_all_posts())
+        return self._integrate(self.group_posts())
+    
+    def _integrate(self, all_posts: Dict[str, List[Dict]], force: bool = False) -> Dict[str, any]:
         if not any(posts for posts in all_posts.values()):
             print("❌ No blog posts found to integrate")
             return {'success': False, 'error': 'No posts found'}
         
-        # Update homepage
-        homepage_success = self.update_homepage(all_posts)
+        # Never render the listings from fewer posts than the posts directory holds
+        unrecorded = self.manifest.unrecorded_files()
+        if unrecorded:
+            print(f"❌ {len(unrecorded)} posts are missing from the post manifest, pages not rendered")
+            return {'success': False, 'error': f'{len(unrecorded)} posts missing from the post manifest'}
         
-        # Update blog index
-        blog_success = self.update_blog_index(all_posts)
+        # Update homepage and blog index
+        sections = self.render_changed_sections(all_posts, force)
+        homepage_success = sections['homepage']['success']
+        blog_success = sections['blog_index']['success']
         
         # Create integration summary
         total_posts = sum(len(posts) for posts in all_posts.values())
@@ -463,6 +583,10 @@ class FullWebsiteIntegrator:
             'categories': len([cat for cat, posts in all_posts.items() if posts]),
             'homepage_updated': homepage_success,
             'blog_index_updated': blog_success,
+            'sections_rendered': [name for name, section in sections.items() if section['rendered']],
+            'posts_parsed': self.manifest.stats['parsed'],
+            'files_written': self.writer.stats['written'],
+            'files_unchanged': self.writer.stats['unchanged'],
             'posts_by_category': {cat: len(posts) for cat, posts in all_posts.items() if posts},
             'timestamp': datetime.now().isoformat()
         }
@@ -493,8 +617,9 @@ if __name__ == "__main__":
     print("🔗 Full Website Integration System")
     print("==================================")
     
-    integrator = FullWebsiteIntegrator()
-    result = integrator.perform_full_integration()
+    workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+    integrator = FullWebsiteIntegrator(workers=workers)
+    result = integrator.perform_full_integration(force='--force' in sys.argv)
     
     if result['success']:
         print("\n🎉 Integration Summary:")
@@ -502,6 +627,7 @@ if __name__ == "__main__":
         print(f"   📁 Categories: {result['categories']}")
         print(f"   🏠 Homepage updated: {result['homepage_updated']}")
         print(f"   📝 Blog index updated: {result['blog_index_updated']}")
+        print(f"   🔄 Pages re-rendered: {', '.join(result['sections_rendered']) or 'none (no changes)'}")
         print("\n📊 Posts by category:")
         for category, count in result['posts_by_category'].items():
             print(f"   {category}: {count} posts")
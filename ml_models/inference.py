@@ -17,14 +17,94 @@ import re
 
 # Import our automated blog generator
 from .automated_blog_generator import AutomatedBlogGenerator
+from .prefix_cache import PrefixKVCache
+from .model_quantization import QUANTIZED_SUFFIX, load_or_quantize
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def truncate_at_stop(text: str, stop_sequences: Optional[List[str]] = None) -> str:
+    """Cut text at the earliest occurrence of any stop sequence"""
+    for stop in stop_sequences or []:
+        if stop in text:
+            text = text[:text.index(stop)]
+    return text
+
+def generate_batched(model, tokenizer, prompts: List[str], device, max_new_tokens: int,
+                     batch_size: int = 8, max_prompt_tokens: int = 512, max_total_tokens: int = 1024,
+                     stop_sequences: Optional[List[str]] = None, **generation_kwargs) -> List[str]:
+    """
+    Generate continuations for many prompts using left-padded micro-batches
+    
+    Prompts are grouped by length to keep padding small. Each row stops on its own
+    EOS (finished rows are padded until the batch completes) and is cut at the
+    first of ``stop_sequences``. Only the newly generated text is returned.
+    
+    Args:
+        model: Causal LM exposing a Hugging Face style ``generate``
+        tokenizer: Matching tokenizer
+        prompts: Prompts to complete
+        device: Device holding the model
+        max_new_tokens: Maximum number of generated tokens per prompt
+        batch_size: Number of prompts per ``generate`` call
+        max_prompt_tokens: Prompts are truncated to this many tokens
+        max_total_tokens: Model context size (prompt + generated tokens)
+        stop_sequences: Optional strings that end a row's output
+        **generation_kwargs: Sampling parameters passed to ``generate``
+        
+    Returns:
+        Generated texts in the same order as ``prompts``
+    """
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    # Generation needs left padding; the tokenizer is shared, so put its setting back after
+    padding_side = tokenizer.padding_side
+    tokenizer.padding_side = 'left'
+    try:
+        results = [''] * len(prompts)
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+        
+        for start in range(0, len(order), max(1, batch_size)):
+            chunk = order[start:start + max(1, batch_size)]
+            encoded = tokenizer(
+                [prompts[i] for i in chunk],
+                return_tensors='pt',
+                padding=True,
+                truncation=True,
+                max_length=max_prompt_tokens
+            ).to(device)
+            prompt_length = encoded['input_ids'].shape[1]
+        
+            with torch.no_grad():
+                outputs = model.generate(
+                    input_ids=encoded['input_ids'],
+                    attention_mask=encoded['attention_mask'],
+                    max_new_tokens=max(1, min(max_new_tokens, max_total_tokens - prompt_length)),
+                    pad_token_id=tokenizer.pad_token_id,
+                    eos_token_id=tokenizer.eos_token_id,
+                    **generation_kwargs
+                )
+        
+            for row, i in zip(outputs, chunk):
+                text = tokenizer.decode(row[prompt_length:], skip_special_tokens=True)
+                results[i] = truncate_at_stop(text, stop_sequences).strip()
+    finally:
+        tokenizer.padding_side = padding_side
+    
+    return results
+
 class EnergyInference:
-    def __init__(self, model_path: str = 'ml_models/model_checkpoints'):
-        """Initialize the inference engine"""
+    def __init__(self, model_path: str = 'ml_models/model_checkpoints', use_prefix_cache: bool = True,
+                 quantize: bool = False):
+        """
+        Initialize the inference engine
+        
+        Args:
+            model_path: Directory containing best_model.pth
+            use_prefix_cache: Reuse past_key_values of the shared energy-context prefixes
+            quantize: Run a dynamic int8 copy of the model (CPU only, cached on disk)
+        """
         self.model_path = Path(model_path)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
@@ -52,6 +132,28 @@ class EnergyInference:
         self.model = None
         self.tokenizer = None
         self.load_model()
+        
+        self.quantized = False
+        if quantize:
+            self._quantize_model()
+        
+        self.prefix_cache = PrefixKVCache(self.model, self.tokenizer, self.device) if use_prefix_cache else None
+        
+        # Set by stream_text: generated_tokens, emitted_words, stop_reason
+        self.last_stream_stats = None
+    
+    def _quantize_model(self):
+        """Swap in the dynamic int8 model, reusing the on-disk copy when it is current"""
+        if self.device.type != 'cpu':
+            logger.warning("Int8 dynamic quantization is CPU-only; keeping the fp32 model")
+            return
+        
+        checkpoint = self.model_path / 'best_model.pth'
+        if checkpoint.exists():
+            self.model = load_or_quantize(self.model, self.model_path / f"best_model{QUANTIZED_SUFFIX}", checkpoint)
+        else:
+            self.model = load_or_quantize(self.model, self.model_path / f"gpt2_base{QUANTIZED_SUFFIX}")
+        self.quantized = True
     
     def load_model(self):
         """Load the trained model and tokenizer"""
@@ -105,16 +207,18 @@ class EnergyInference:
         """Generate content based on a prompt"""
         try:
             # Ensure prompt is energy-related
-            energy_prompt = self._enhance_prompt(prompt)
+            energy_context, prompt_body = self._split_enhanced_prompt(prompt)
+            energy_prompt = energy_context + prompt_body
             
-            # Tokenize input
-            inputs = self.tokenizer.encode(energy_prompt, return_tensors='pt', max_length=512, truncation=True)
-            inputs = inputs.to(self.device)
+            # Tokenize input, reusing the cached key/values of the shared context prefix
+            inputs, past_key_values = self._encode_prompt(energy_context, prompt_body)
             
             # Generate with controlled parameters
             with torch.no_grad():
                 outputs = self.model.generate(
                     inputs,
+                    past_key_values=past_key_values,
+                    attention_mask=torch.ones_like(inputs),
                     max_length=min(max_length + len(inputs[0]), 1024),
                     temperature=temperature,
                     do_sample=True,
@@ -145,8 +249,70 @@ class EnergyInference:
             logger.error(f"Error generating content: {e}")
             return self._generate_fallback_content(prompt)
     
+    def generate_content_batch(self, prompts: List[str], max_length: int = 800, temperature: float = 0.8,
+                               batch_size: int = 4) -> List[str]:
+        """Batched equivalent of generate_content, results are returned in input order"""
+        energy_prompts = [self._enhance_prompt(prompt) for prompt in prompts]
+        
+        try:
+            contents = generate_batched(
+                self.model, self.tokenizer, energy_prompts, self.device,
+                max_new_tokens=max_length,
+                batch_size=batch_size,
+                temperature=temperature,
+                do_sample=True,
+                top_p=0.9,
+                top_k=50,
+                repetition_penalty=1.2
+            )
+        except Exception as e:
+            logger.error(f"Batched generation failed, generating one prompt at a time: {e}")
+            return [self.generate_content(prompt, max_length, temperature) for prompt in prompts]
+        
+        contents = [self._clean_generated_content(content) for content in contents]
+        
+        # Extend short outputs in a second batched pass (same rule as generate_content)
+        short = [i for i, content in enumerate(contents) if len(content.split()) < 100]
+        if short:
+            extended_prompts = [f"{energy_prompts[i]}\n\n{contents[i]}\n\nFurthermore," for i in short]
+            try:
+                extended = generate_batched(
+                    self.model, self.tokenizer, extended_prompts, self.device,
+                    max_new_tokens=max_length,
+                    batch_size=batch_size,
+                    temperature=0.7,
+                    do_sample=True,
+                    top_p=0.9,
+                    repetition_penalty=1.3
+                )
+                for i, content in zip(short, extended):
+                    contents[i] = self._clean_generated_content(content)
+            except Exception as e:
+                logger.error(f"Error generating extended content: {e}")
+                for i in short:
+                    contents[i] = self._generate_fallback_content("energy technology developments")
+        
+        return contents
+    
+    def _encode_prompt(self, energy_context: str, prompt_body: str):
+        """Return (input_ids, past_key_values) for a prompt, using the prefix cache when enabled"""
+        if self.prefix_cache is not None:
+            try:
+                return self.prefix_cache.prepare(energy_context, prompt_body, max_prompt_tokens=512)
+            except Exception as e:
+                logger.warning(f"Prefix cache unavailable, encoding full prompts: {e}")
+                self.prefix_cache = None
+        
+        inputs = self.tokenizer.encode(energy_context + prompt_body, return_tensors='pt', max_length=512, truncation=True)
+        return inputs.to(self.device), None
+    
     def _enhance_prompt(self, prompt: str) -> str:
         """Enhance the prompt with energy-specific context"""
+        energy_context, prompt_body = self._split_enhanced_prompt(prompt)
+        return energy_context + prompt_body
+    
+    def _split_enhanced_prompt(self, prompt: str):
+        """Return the energy-context prefix and the prompt-specific remainder"""
         energy_context = random.choice([
             "In the rapidly evolving energy sector,",
             "Recent advances in renewable energy technology show that",
@@ -157,11 +323,15 @@ class EnergyInference:
         
         # Ensure the prompt mentions energy if it doesn't already
         if not any(topic in prompt.lower() for topic in ['energy', 'power', 'electric', 'renewable', 'solar', 'wind']):
-            enhanced_prompt = f"{energy_context} {prompt} in the energy sector"
+            prompt_body = f" {prompt} in the energy sector"
         else:
-            enhanced_prompt = f"{energy_context} {prompt}"
+            prompt_body = f" {prompt}"
         
-        return enhanced_prompt
+        return energy_context, prompt_body
+    
+    def get_prefix_cache_stats(self) -> Dict[str, any]:
+        """Hit/miss counters of the energy-context prefix cache"""
+        return self.prefix_cache.get_stats() if self.prefix_cache else {"enabled": False}
     
     def _clean_generated_content(self, content: str) -> str:
         """Clean and format the generated content"""
@@ -251,13 +421,40 @@ class EnergyInference:
                 'word_count': len(self._generate_fallback_content(topic).split())
             }
     
+    def generate_blog_posts(self, topics: List[str], target_length: int = 600, batch_size: int = 4) -> List[Dict[str, str]]:
+        """Generate several blog posts with batched model calls, in the same order as topics"""
+        titles = self.generate_content_batch(
+            [f"Blog post title about {topic} in energy sector:" for topic in topics],
+            max_length=50, temperature=0.7, batch_size=batch_size
+        )
+        contents = self.generate_content_batch(
+            [f"Write a comprehensive blog post about {topic} covering recent developments, market trends, and future outlook" for topic in topics],
+            max_length=target_length, temperature=0.8, batch_size=batch_size
+        )
+        
+        posts = []
+        for topic, title, content in zip(topics, titles, contents):
+            title = title.split('\n')[0].strip() or f"Energy Insights: {topic.title()}"
+            structured_content = self._structure_blog_content(content, topic)
+            posts.append({
+                'title': title,
+                'content': structured_content,
+                'topic': topic,
+                'word_count': len(structured_content.split())
+            })
+        
+        return posts
+    
     def generate_and_save_blog_post(self, topic: str, target_length: int = 600, category: str = None) -> Dict[str, str]:
         """Generate a blog post and automatically save it to the posts folder"""
         print(f"🤖 Generating blog post about: {topic}")
         
         # Generate the blog post content
         blog_data = self.generate_blog_post(topic, target_length)
-        
+        return self.save_blog_post(blog_data, category)
+    
+    def save_blog_post(self, blog_data: Dict[str, str], category: str = None) -> Dict[str, str]:
+        """Save generated blog data to the posts folder"""
         # Save to posts folder using the automated blog generator
         try:
             post_info = self.blog_generator.create_blog_post(
@@ -282,21 +479,34 @@ class EnergyInference:
             logger.error(f"Error saving blog post: {e}")
             return blog_data
     
-    def batch_generate_posts(self, topics: List[str], target_length: int = 600) -> List[Dict[str, str]]:
-        """Generate multiple blog posts and save them all"""
+    def batch_generate_posts(self, topics: List[str], target_length: int = 600, batch_size: int = 4) -> List[Dict[str, str]]:
+        """
+        Generate multiple blog posts and save them all
+        
+        Args:
+            topics: Topics to write about
+            target_length: Target generation length in tokens
+            batch_size: Prompts per model call; 1 generates posts one at a time
+        """
         print(f"🚀 Starting batch generation of {len(topics)} blog posts...")
         
         generated_posts = []
         
-        for i, topic in enumerate(topics, 1):
-            print(f"\n📝 Generating post {i}/{len(topics)}: {topic}")
-            
-            post_result = self.generate_and_save_blog_post(topic, target_length)
-            generated_posts.append(post_result)
-            
-            # Small delay between generations to avoid overwhelming the system
-            import time
-            time.sleep(1)
+        if batch_size <= 1:
+            for i, topic in enumerate(topics, 1):
+                print(f"\n📝 Generating post {i}/{len(topics)}: {topic}")
+                
+                post_result = self.generate_and_save_blog_post(topic, target_length)
+                generated_posts.append(post_result)
+                
+                # Small delay between generations to avoid overwhelming the system
+                import time
+                time.sleep(1)
+        else:
+            print(f"📦 Generating in micro-batches of {batch_size}")
+            for i, blog_data in enumerate(self.generate_blog_posts(topics, target_length, batch_size), 1):
+                print(f"\n📝 Saving post {i}/{len(topics)}: {blog_data['topic']}")
+                generated_posts.append(self.save_blog_post(blog_data))
         
         print(f"\n🎉 Batch generation complete! Generated {len(generated_posts)} posts.")
         return generated_posts
@@ -370,16 +580,51 @@ import re
 
 logger = logging.getLogger(__name__)
 
+def _sample_next_token(logits: torch.Tensor, seen_ids: List[int], gen_params: Dict) -> int:
+    """Pick the next token id from last-position logits using generate()-style parameters"""
+    logits = logits.clone()
+    
+    # Repetition penalty (CTRL style, as in transformers)
+    penalty = gen_params.get('repetition_penalty', 1.0)
+    if penalty != 1.0 and seen_ids:
+        ids = torch.tensor(sorted(set(seen_ids)), device=logits.device)
+        scores = logits[ids]
+        logits[ids] = torch.where(scores < 0, scores * penalty, scores / penalty)
+    
+    if not gen_params.get('do_sample', False):
+        return int(torch.argmax(logits))
+    
+    logits = logits / max(gen_params.get('temperature', 1.0), 1e-5)
+    
+    top_k = gen_params.get('top_k', 0)
+    if top_k and top_k < logits.shape[-1]:
+        kth_value = torch.topk(logits, top_k).values[-1]
+        logits[logits < kth_value] = float('-inf')
+    
+    top_p = gen_params.get('top_p', 1.0)
+    if top_p < 1.0:
+        sorted_logits, sorted_ids = torch.sort(logits, descending=True)
+        cumulative = torch.cumsum(F.softmax(sorted_logits, dim=-1), dim=-1)
+        remove = cumulative > top_p
+        remove[1:] = remove[:-1].clone()
+        remove[0] = False
+        logits[sorted_ids[remove]] = float('-inf')
+    
+    return int(torch.multinomial(F.softmax(logits, dim=-1), num_samples=1))
+
 class EnergyLLMInference:
     """Inference engine for Energy Language Model"""
     
-    def __init__(self, model_path: str, device: Optional[str] = None):
+    def __init__(self, model_path: str, device: Optional[str] = None, use_prefix_cache: bool = True,
+                 quantize: bool = False):
         """
         Initialize inference engine
         
         Args:
             model_path: Path to trained model directory
             device: Device to run inference on ('cpu', 'cuda', or None for auto)
+            use_prefix_cache: Reuse past_key_values of the energy-context prompt prefixes
+            quantize: Run a dynamic int8 copy of the model (CPU only, cached in model_path)
         """
         self.model_path = Path(model_path)
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
@@ -391,6 +636,16 @@ class EnergyLLMInference:
         self.config = None
         self._load_model()
         
+        self.quantized = False
+        if quantize:
+            if self.device == 'cpu':
+                self.model = load_or_quantize(self.model, self.model_path / f"model{QUANTIZED_SUFFIX}", self.model_path)
+                self.quantized = True
+            else:
+                logger.warning("Int8 dynamic quantization is CPU-only; keeping the fp32 model")
+        
+        self.prefix_cache = PrefixKVCache(self.model, self.tokenizer, self.device) if use_prefix_cache else None
+        
         # Energy-specific prompts and templates
         self.energy_prompts = {
             'news_analysis': "Analyze the following energy industry development:",
@@ -474,7 +729,9 @@ class EnergyLLMInference:
         max_length: int = 512,
         style: str = 'analytical',
         energy_context: Optional[str] = None,
-        custom_params: Optional[Dict] = None
+        custom_params: Optional[Dict] = None,
+        word_target: Optional[int] = None,
+        stop_sequences: Optional[List[str]] = None
     ) -> str:
         """
         Generate text using the Energy LLM
@@ -485,33 +742,35 @@ class EnergyLLMInference:
             style: Generation style ('creative', 'analytical', 'factual', 'conservative')
             energy_context: Optional energy domain context to prepend
             custom_params: Custom generation parameters
+            word_target: Stop as soon as this many words are generated (uses stream_text)
+            stop_sequences: Cut the raw output at the first stop string, before post-processing
             
         Returns:
             Generated text
         """
+        if word_target:
+            sentences = self.stream_text(
+                prompt, max_length, style, energy_context, custom_params,
+                unit='sentence', word_target=word_target
+            )
+            return self._post_process_text(truncate_at_stop(' '.join(sentences), stop_sequences))
+        
         if self.model is None or self.tokenizer is None:
             raise RuntimeError("Model not loaded. Check initialization.")
         
-        # Prepare full prompt
-        full_prompt = self._prepare_prompt(prompt, energy_context)
-        
         # Get generation parameters
         gen_params = self.generation_configs.get(style, self.generation_configs['analytical'])
         if custom_params:
             gen_params.update(custom_params)
         
-        # Tokenize input
-        input_ids = self.tokenizer.encode(
-            full_prompt,
-            return_tensors='pt',
-            truncation=True,
-            max_length=self.model.config.max_position_embeddings - max_length
-        ).to(self.device)
+        full_prompt, input_ids, past_key_values = self._encode_generation_prompt(prompt, energy_context, max_length)
         
         # Generate
         with torch.no_grad():
             generated_ids = self.model.generate(
                 input_ids,
+                past_key_values=past_key_values,
+                attention_mask=torch.ones_like(input_ids),
                 max_length=input_ids.shape[1] + max_length,
                 pad_token_id=self.tokenizer.eos_token_id,
                 **gen_params
@@ -524,10 +783,171 @@ class EnergyLLMInference:
         )
         
         # Extract only the new content
-        new_content = generated_text[len(full_prompt):].strip()
+        new_content = truncate_at_stop(generated_text[len(full_prompt):], stop_sequences).strip()
         
         return self._post_process_text(new_content)
     
+    def stream_text(
+        self,
+        prompt: str,
+        max_length: int = 512,
+        style: str = 'analytical',
+        energy_context: Optional[str] = None,
+        custom_params: Optional[Dict] = None,
+        unit: str = 'token',
+        word_target: Optional[int] = None,
+        max_repeat: int = 3
+    ):
+        """
+        Generate text incrementally, yielding pieces as they are decoded
+        
+        Decoding stops at EOS, after ``max_length`` tokens, once ``word_target``
+        words have been produced, or when the output starts repeating (the same
+        word ``max_repeat`` times in a row, or a sentence already emitted). The
+        reason is stored in ``self.last_stream_stats``.
+        
+        Args:
+            prompt: Input text prompt
+            max_length: Maximum number of tokens to generate
+            style: Generation style ('creative', 'analytical', 'factual', 'conservative')
+            energy_context: Optional energy domain context to prepend
+            custom_params: Custom generation parameters
+            unit: 'token' yields decoded text fragments; 'sentence' yields complete
+                sentences and drops a trailing incomplete one
+            word_target: Stop once this many words have been generated
+            max_repeat: Repetition threshold, as in _remove_repetitions
+            
+        Yields:
+            Text fragments or sentences
+        """
+        if self.model is None or self.tokenizer is None:
+            raise RuntimeError("Model not loaded. Check initialization.")
+        
+        gen_params = dict(self.generation_configs.get(style, self.generation_configs['analytical']))
+        if custom_params:
+            gen_params.update(custom_params)
+        
+        _, input_ids, past_key_values = self._encode_generation_prompt(prompt, energy_context, max_length)
+        # With a prefix cache only the last prompt token is still unprocessed
+        next_input = input_ids[:, -1:] if past_key_values is not None else input_ids
+        seen_ids = input_ids[0].tolist()
+        
+        generated_ids = []
+        text = ''
+        # Only generated_ids[prefix_offset:] is decoded per token; prefix_offset..read_offset
+        # is context for tokenizers whose decoding depends on the previous token
+        prefix_offset = read_offset = 0
+        words = []
+        word_start = 0
+        emitted_chars = 0
+        emitted_words = 0
+        sentence_start = 0
+        emitted_sentences = set()
+        stop_reason = 'max_length'
+        
+        with torch.no_grad():
+            for _ in range(max_length):
+                outputs = self.model(next_input, past_key_values=past_key_values, use_cache=True)
+                past_key_values = outputs.past_key_values
+                token_id = _sample_next_token(outputs.logits[0, -1, :], seen_ids, gen_params)
+                
+                if token_id == self.tokenizer.eos_token_id:
+                    stop_reason = 'eos'
+                    break
+                
+                generated_ids.append(token_id)
+                seen_ids.append(token_id)
+                next_input = torch.tensor([[token_id]], device=input_ids.device)
+                
+                prefix_text = self.tokenizer.decode(generated_ids[prefix_offset:read_offset], skip_special_tokens=True)
+                new_text = self.tokenizer.decode(generated_ids[prefix_offset:], skip_special_tokens=True)
+                if len(new_text) <= len(prefix_text) or new_text.endswith('\ufffd'):
+                    continue  # wait for the rest of a multi-byte character
+                text += new_text[len(prefix_text):]
+                prefix_offset, read_offset = read_offset, len(generated_ids)
+                
+                # Re-split only from the start of the last (possibly unfinished) word
+                if words:
+                    words.pop()
+                words.extend(text[word_start:].split())
+                if words:
+                    word_start = len(text.rstrip()) - len(words[-1])
+                if unit == 'sentence':
+                    # A sentence is complete once whitespace follows its punctuation
+                    base = sentence_start
+                    for match in re.finditer(r'[^.!?]*[.!?]+(?=\s)', text[base:]):
+                        sentence_start = base + match.end()
+                        sentence = match.group(0).strip()
+                        if not sentence:
+                            continue
+                        if sentence.lower() in emitted_sentences:
+                            stop_reason = 'repetition'
+                            break
+                        emitted_sentences.add(sentence.lower())
+                        emitted_words += len(sentence.split())
+                        yield sentence
+                    if stop_reason == 'repetition':
+                        break
+                else:
+                    yield text[emitted_chars:]
+                    emitted_chars = len(text)
+                    emitted_words = len(words)
+                
+                if len(words) > max_repeat and words[-max_repeat - 1:-1].count(words[-1]) >= max_repeat:
+                    stop_reason = 'repetition'
+                    break
+                if word_target and emitted_words >= word_target:
+                    stop_reason = 'word_target'
+                    break
+        
+        # Flush a final sentence that ended exactly at EOS / max_length
+        if unit == 'sentence' and stop_reason in ('eos', 'max_length'):
+            remainder = text[sentence_start:].strip()
+            if re.search(r'[.!?]$', remainder) and remainder.lower() not in emitted_sentences:
+                emitted_words += len(remainder.split())
+                yield remainder
+        
+        self.last_stream_stats = {
+            'generated_tokens': len(generated_ids),
+            'emitted_words': emitted_words,
+            'stop_reason': stop_reason
+        }
+    
+    def _encode_generation_prompt(self, prompt: str, energy_context: Optional[str], max_length: int):
+        """Return (full_prompt, input_ids, past_key_values), reusing the cached energy-context prefix"""
+        full_prompt = self._prepare_prompt(prompt, energy_context)
+        
+        # Tokenize input, reusing the cached key/values of the energy-context prefix
+        max_prompt_tokens = self._max_prompt_tokens(max_length)
+        context_prompt = self.energy_prompts.get(energy_context) if energy_context else None
+        if context_prompt and self.prefix_cache is not None:
+            try:
+                input_ids, past_key_values = self.prefix_cache.prepare(
+                    context_prompt, full_prompt[len(context_prompt):], max_prompt_tokens
+                )
+                return full_prompt, input_ids, past_key_values
+            except Exception as e:
+                logger.warning(f"Prefix cache unavailable, encoding full prompts: {e}")
+                self.prefix_cache = None
+        
+        input_ids = self.tokenizer.encode(
+            full_prompt,
+            return_tensors='pt',
+            truncation=True,
+            max_length=max_prompt_tokens
+        ).to(self.device)
+        return full_prompt, input_ids, None
+    
+    def _max_prompt_tokens(self, max_length: int) -> int:
+        """Tokens left for the prompt once ``max_length`` new tokens fit in the context"""
+        max_positions = self.model.config.max_position_embeddings
+        if not 0 < max_length < max_positions:
+            raise ValueError(
+                f"max_length must be between 1 and {max_positions - 1} "
+                f"(the model context is {max_positions} tokens), got {max_length}"
+            )
+        return max_positions - max_length
+    
     def _prepare_prompt(self, prompt: str, energy_context: Optional[str] = None) -> str:
         """Prepare the full prompt with energy context"""
         if energy_context and energy_context in self.energy_prompts:
@@ -701,29 +1121,89 @@ class EnergyLLMInference:
             energy_context=insight_type
         )
     
-    def batch_generate(self, prompts: List[str], **kwargs) -> List[str]:
+    def batch_generate(
+        self,
+        prompts: List[str],
+        batch_size: int = 8,
+        word_target: Optional[int] = None,
+        stop_sequences: Optional[List[str]] = None,
+        **kwargs
+    ) -> List[str]:
         """
         Generate text for multiple prompts
         
+        Prompts are left-padded and generated ``batch_size`` at a time; results
+        are returned in input order. ``batch_size=1`` generates one prompt at a time,
+        as does ``word_target`` (it stops each prompt early through stream_text).
+        
         Args:
             prompts: List of prompts
-            **kwargs: Generation parameters
+            batch_size: Number of prompts per model call
+            word_target: Stop each output once this many words are generated
+            stop_sequences: Cut each raw output at the first stop string, before
+                post-processing (on both the batched and the per-prompt path)
+            **kwargs: Other generation parameters, as for generate_text
             
         Returns:
             List of generated texts
         """
+        if self.model is not None:
+            # An impossible max_length fails the whole call, not each prompt
+            self._max_prompt_tokens(kwargs.get('max_length', 512))
+        
+        if batch_size > 1 and len(prompts) > 1 and not word_target:
+            try:
+                return self._generate_text_batch(prompts, batch_size, stop_sequences=stop_sequences, **kwargs)
+            except RuntimeError as e:
+                # Model-side failures (e.g. out of memory); bad arguments still raise
+                logger.error(f"Batched generation failed, generating one prompt at a time: {e}")
+        
         results = []
         
         for prompt in prompts:
             try:
-                result = self.generate_text(prompt, **kwargs)
-                results.append(result)
+                results.append(self.generate_text(
+                    prompt, word_target=word_target, stop_sequences=stop_sequences, **kwargs
+                ))
             except Exception as e:
                 logger.error(f"Error generating text for prompt '{prompt[:50]}...': {e}")
                 results.append(f"Error generating text: {str(e)}")
         
         return results
     
+    def _generate_text_batch(
+        self,
+        prompts: List[str],
+        batch_size: int,
+        max_length: int = 512,
+        style: str = 'analytical',
+        energy_context: Optional[str] = None,
+        custom_params: Optional[Dict] = None,
+        stop_sequences: Optional[List[str]] = None
+    ) -> List[str]:
+        """Batched counterpart of generate_text"""
+        if self.model is None or self.tokenizer is None:
+            raise RuntimeError("Model not loaded. Check initialization.")
+        
+        gen_params = dict(self.generation_configs.get(style, self.generation_configs['analytical']))
+        if custom_params:
+            gen_params.update(custom_params)
+        
+        max_prompt_tokens = self._max_prompt_tokens(max_length)
+        generated = generate_batched(
+            self.model, self.tokenizer,
+            [self._prepare_prompt(prompt, energy_context) for prompt in prompts],
+            self.device,
+            max_new_tokens=max_length,
+            batch_size=batch_size,
+            max_prompt_tokens=max_prompt_tokens,
+            max_total_tokens=self.model.config.max_position_embeddings,
+            stop_sequences=stop_sequences,
+            **gen_params
+        )
+        
+        return [self._post_process_text(text) for text in generated]
+    
     def get_model_info(self) -> Dict:
         """Get information about the loaded model"""
         if self.model is None:
@@ -732,6 +1212,7 @@ class EnergyLLMInference:
         info = {
             "model_path": str(self.model_path),
             "device": self.device,
+            "quantized": self.quantized,
             "vocab_size": len(self.tokenizer) if self.tokenizer else None,
             "max_length": getattr(self.model.config, 'max_position_embeddings', None),
             "model_size": self.model.get_model_size() if hasattr(self.model, 'get_model_size') else None
@@ -740,20 +1221,24 @@ class EnergyLLMInference:
         if self.config:
             info["training_config"] = self.config
         
+        if self.prefix_cache:
+            info["prefix_cache"] = self.prefix_cache.get_stats()
+        
         return info
 
-def load_energy_llm(model_path: str, device: Optional[str] = None) -> EnergyLLMInference:
+def load_energy_llm(model_path: str, device: Optional[str] = None, quantize: bool = False) -> EnergyLLMInference:
     """
     Convenience function to load Energy LLM for inference
     
     Args:
         model_path: Path to trained model
         device: Device to use
+        quantize: Use the cached dynamic int8 model (CPU only)
         
     Returns:
         EnergyLLMInference instance
     """
-    return EnergyLLMInference(model_path, device)
+    return EnergyLLMInference(model_path, device, quantize=quantize)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Thin Client for the Resident Inference Server
+Mirrors the EnergyInference generation API over localhost HTTP without
+importing torch/transformers; generated posts are still saved locally
+"""
+
+import os
+import sys
+import json
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class InferenceClient:
+    """Drop-in stand-in for EnergyInference backed by inference_server"""
+
+    def __init__(self, url: str = None, timeout: float = 900, posts_dir: str = None):
+        """
+        Args:
+            url: Server base URL (defaults to $ENERGY_INFERENCE_URL or localhost:8765)
+            timeout: Seconds to wait for a generation request
+            posts_dir: Posts directory used when saving generated posts
+        """
+        self.url = (url or os.environ.get("ENERGY_INFERENCE_URL")
+                    or f"http://{DEFAULT_HOST}:{DEFAULT_PORT}").rstrip('/')
+        self.timeout = timeout
+        self.posts_dir = posts_dir or str(Path(__file__).parent.parent / "posts")
+        self._blog_generator = None
+
+    def _request(self, path: str, payload: Dict = None, timeout: float = None) -> Dict:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={'Content-Type': 'application/json'},
+            method='POST' if data is not None else 'GET'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', errors='replace')
+            raise RuntimeError(f"Inference server error {e.code}: {detail}") from e
+
+    def is_available(self) -> bool:
+        """Return True if a server is listening and healthy"""
+        try:
+            return self._request('/health', timeout=2).get('status') == 'ok'
+        except Exception:
+            return False
+
+    def health(self) -> Dict:
+        return self._request('/health', timeout=5)
+
+    def generate_content(self, prompt: str, max_length: int = 800, temperature: float = 0.8) -> str:
+        return self._request('/generate_content', {
+            'prompt': prompt, 'max_length': max_length, 'temperature': temperature
+        })['content']
+
+    def generate_blog_post(self, topic: str, target_length: int = 600) -> Dict[str, str]:
+        return self._request('/generate_blog_post', {'topic': topic, 'target_length': target_length})
+
+    def generate_blog_posts(self, topics: List[str], target_length: int = 600, batch_size: int = 4) -> List[Dict[str, str]]:
+        return self._request('/generate_blog_posts', {
+            'topics': topics, 'target_length': target_length, 'batch_size': batch_size
+        })['posts']
+
+    @property
+    def blog_generator(self):
+        """Local AutomatedBlogGenerator, created on first save"""
+        if self._blog_generator is None:
+            from automated_blog_generator import AutomatedBlogGenerator
+            self._blog_generator = AutomatedBlogGenerator(self.posts_dir)
+        return self._blog_generator
+
+    def save_blog_post(self, blog_data: Dict[str, str], category: str = None) -> Dict[str, str]:
+        """Save server-generated blog data to the posts folder"""
+        try:
+            post_info = self.blog_generator.create_blog_post(
+                title=blog_data['title'],
+                content=blog_data['content'],
+                custom_category=category
+            )
+            result = {**blog_data, **post_info}
+            print(f"✅ Blog post saved successfully!")
+            print(f"   📄 Title: {result['title']}")
+            print(f"   📁 File: {result['filename']}")
+            return result
+        except Exception as e:
+            print(f"⚠️ Error saving blog post: {e}")
+            return blog_data
+
+    def generate_and_save_blog_post(self, topic: str, target_length: int = 600, category: str = None) -> Dict[str, str]:
+        print(f"🤖 Generating blog post about: {topic} (inference server)")
+        return self.save_blog_post(self.generate_blog_post(topic, target_length), category)
+
+    def batch_generate_posts(self, topics: List[str], target_length: int = 600, batch_size: int = 4) -> List[Dict[str, str]]:
+        print(f"🚀 Starting batch generation of {len(topics)} blog posts (inference server)...")
+        generated_posts = [self.save_blog_post(blog_data)
+                           for blog_data in self.generate_blog_posts(topics, target_length, batch_size)]
+        print(f"\n🎉 Batch generation complete! Generated {len(generated_posts)} posts.")
+        return generated_posts
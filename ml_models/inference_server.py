@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Resident Inference Server for Energy Content Generation
+Loads EnergyInference once and serves generation requests over localhost HTTP,
+so scheduled runs and CLI tools skip the torch import and model load entirely
+
+Run from the project root:
+    python -m ml_models.inference_server --port 8765
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from .inference import EnergyInference
+from .inference_client import DEFAULT_HOST, DEFAULT_PORT
+
+logger = logging.getLogger(__name__)
+
+
+class EnergyInferenceServer:
+    """Keeps one EnergyInference instance resident and dispatches JSON requests to it"""
+
+    def __init__(self, model_path: str = 'ml_models/model_checkpoints', host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT, quantize: bool = False):
+        self.host = host
+        self.port = port
+
+        load_start = time.perf_counter()
+        self.inference = EnergyInference(model_path, quantize=quantize)
+        self.load_seconds = time.perf_counter() - load_start
+
+        # The model is not safe to drive from several threads at once
+        self.model_lock = threading.Lock()
+        self.started_at = time.time()
+        self.stats = {"requests": 0, "errors": 0, "generation_seconds": 0.0}
+
+        self.routes = {
+            '/generate_content': self._generate_content,
+            '/generate_blog_post': self._generate_blog_post,
+            '/generate_blog_posts': self._generate_blog_posts
+        }
+
+    def _generate_content(self, payload: Dict) -> Dict:
+        content = self.inference.generate_content(
+            payload['prompt'],
+            max_length=payload.get('max_length', 800),
+            temperature=payload.get('temperature', 0.8)
+        )
+        return {'content': content}
+
+    def _generate_blog_post(self, payload: Dict) -> Dict:
+        return self.inference.generate_blog_post(payload['topic'], payload.get('target_length', 600))
+
+    def _generate_blog_posts(self, payload: Dict) -> Dict:
+        posts = self.inference.generate_blog_posts(
+            payload['topics'],
+            payload.get('target_length', 600),
+            batch_size=payload.get('batch_size', 4)
+        )
+        return {'posts': posts}
+
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'device': str(self.inference.device),
+            'quantized': self.inference.quantized,
+            'model_path': str(self.inference.model_path),
+            'model_load_seconds': round(self.load_seconds, 2),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'prefix_cache': self.inference.get_prefix_cache_stats(),
+            **self.stats
+        }
+
+    def handle(self, path: str, payload: Dict) -> Dict:
+        """Run one generation request under the model lock"""
+        handler = self.routes[path]
+        with self.model_lock:
+            start = time.perf_counter()
+            try:
+                return handler(payload)
+            finally:
+                self.stats['requests'] += 1
+                self.stats['generation_seconds'] += time.perf_counter() - start
+
+    def serve_forever(self):
+        server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        print(f"🤖 Inference server ready on http://{self.host}:{self.port} "
+              f"(model loaded in {self.load_seconds:.1f}s)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("🛑 Inference server stopped")
+        finally:
+            server.server_close()
+
+
+def _make_handler(app: EnergyInferenceServer):
+    class InferenceRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: Dict):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, app.health())
+            else:
+                self._send_json(404, {'error': f'Unknown endpoint: {self.path}'})
+
+        def do_POST(self):
+            if self.path not in app.routes:
+                self._send_json(404, {'error': f'Unknown endpoint: {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                self._send_json(200, app.handle(self.path, payload))
+            except KeyError as e:
+                app.stats['errors'] += 1
+                self._send_json(400, {'error': f'Missing field: {e}'})
+            except Exception as e:
+                app.stats['errors'] += 1
+                logger.error(f"Inference request failed: {e}")
+                self._send_json(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logger.info("%s - %s", self.address_string(), format % args)
+
+    return InferenceRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resident energy content inference server')
+    parser.add_argument('--model-path', default='ml_models/model_checkpoints', help='Checkpoint directory')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address (keep on localhost)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--quantize', action='store_true', help='Serve the dynamic int8 model (CPU)')
+    args = parser.parse_args()
+
+    EnergyInferenceServer(args.model_path, args.host, args.port, args.quantize).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Single-Pass Multi-Keyword Matcher for Content Scanning
+Finds every occurrence of a fixed keyword list in one scan of the text
+(Aho-Corasick automaton when pyahocorasick is installed, compiled trie
+regex otherwise) instead of one substring search per keyword
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+# Try to import the C Aho-Corasick automaton, use regex fallback if not available
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher for a fixed set of keywords
+
+    Matching uses plain substring semantics, so ``find_all`` agrees with
+    ``keyword in text`` and ``counts`` agrees with ``text.count(keyword)``
+    for every keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            # The lookahead reports the longest keyword starting at each position;
+            # shorter keywords starting there are exactly its keyword prefixes
+            self._pattern = re.compile('(?=(' + self._trie_regex(self.keywords) + '))') if self.keywords else None
+            keyword_set = set(self.keywords)
+            self._prefixes = {
+                keyword: [keyword[:i] for i in range(len(keyword) - 1, 0, -1) if keyword[:i] in keyword_set]
+                for keyword in self.keywords
+            }
+
+    @staticmethod
+    def _trie_regex(keywords: Sequence[str]) -> str:
+        """Build a regex from a character trie so the engine never backtracks across siblings"""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            # Greedy optional group keeps the longest keyword at each position
+            return f'(?:{body})?' if '' in node else body
+
+        return build(trie)
+
+    def iter_matches(self, text: str):
+        """Yield (start, keyword) for every, possibly overlapping, keyword occurrence"""
+        if not self.keywords:
+            return
+        if self._automaton is not None:
+            for end, keyword in self._automaton.iter(text):
+                yield end - len(keyword) + 1, keyword
+        else:
+            for match in self._pattern.finditer(text):
+                start = match.start()
+                longest = match.group(1)
+                yield start, longest
+                for keyword in self._prefixes[longest]:
+                    yield start, keyword
+
+    def find_all(self, text: str) -> Set[str]:
+        """Return the set of keywords that occur anywhere in the text"""
+        found = set()
+        for _, keyword in self.iter_matches(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Return non-overlapping occurrence counts per keyword, like str.count"""
+        counts = dict.fromkeys(self.keywords, 0)
+        next_free = {}
+        for start, keyword in self.iter_matches(text):
+            if start >= next_free.get(keyword, 0):
+                counts[keyword] += 1
+                next_free[keyword] = start + len(keyword)
+        return counts
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """Return a shared compiled matcher for the keyword list"""
+    return _cached_matcher(tuple(keywords))
+
+
+def first_matching_group(texts: Iterable[str], groups: Sequence[Tuple[str, List[str]]], default: str) -> str:
+    """
+    Return the name of the first group with a keyword in any of the texts
+
+    Args:
+        texts: Lower-cased texts to scan (scanned separately, never concatenated)
+        groups: Ordered (name, keywords) pairs, checked in priority order
+        default: Value returned when no group matches
+
+    Returns:
+        Name of the highest priority matching group or ``default``
+    """
+    matcher = get_matcher(keyword for _, keywords in groups for keyword in keywords)
+    found = set()
+    for text in texts:
+        found |= matcher.find_all(text)
+    for name, keywords in groups:
+        if any(keyword in found for keyword in keywords):
+            return name
+    return default
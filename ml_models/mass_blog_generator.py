@@ -5,10 +5,12 @@ Generates posts in batches of 10 with quality checks and adjustments
 """
 
 import os
+import re
 import sys
 import time
 import json
 import subprocess
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -19,13 +21,102 @@ sys.path.append(str(Path(__file__).parent))
 
 from seo_automation import SEOBlogAutomation
 from enhanced_ml_trainer import EnhancedMLTrainer
+from parallel_scan import scan_files
+
+
+def verify_post_quality(post_path: str, quality_requirements: Dict[str, float]) -> Dict[str, any]:
+    """Verify a post meets quality requirements (module-level so scan workers can run it)"""
+    try:
+        with open(post_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Extract post content between articleBody tags
+        start_marker = '<div class="post-content" itemprop="articleBody">'
+        end_marker = '<script type="application/ld+json">'
+        
+        start_idx = content.find(start_marker)
+        end_idx = content.find(end_marker)
+        
+        if start_idx == -1 or end_idx == -1:
+            return {"valid": False, "error": "Could not find post content"}
+        
+        post_content = content[start_idx + len(start_marker):end_idx]
+        
+        # Count words (excluding HTML tags)
+        text_only = re.sub(r'<[^>]*>', ' ', post_content)
+        text_only = re.sub(r'\s+', ' ', text_only).strip()
+        words = [w for w in text_only.split() if w and len(w) > 1]
+        word_count = len(words)
+        
+        # Count images
+        image_count = post_content.count('<img ')
+        
+        # Extract SEO score from content
+        seo_score = 75.0  # Default if can't extract
+        seo_match = re.search(r'Grade: [A-F][+]? \((\d+\.?\d*)%\)', content)
+        if seo_match:
+            seo_score = float(seo_match.group(1))
+        
+        # Check requirements
+        requirements_met = {
+            "word_count": word_count >= quality_requirements["min_word_count"],
+            "images": image_count >= quality_requirements["min_images"],
+            "seo_score": seo_score >= quality_requirements["min_seo_score"]
+        }
+        
+        all_requirements_met = all(requirements_met.values())
+        
+        return {
+            "valid": True,
+            "word_count": word_count,
+            "image_count": image_count,
+            "seo_score": seo_score,
+            "requirements_met": requirements_met,
+            "all_requirements_met": all_requirements_met,
+            "quality_grade": get_quality_grade(seo_score, word_count, image_count)
+        }
+        
+    except Exception as e:
+        return {"valid": False, "error": str(e)}
+
+
+def get_quality_grade(seo_score: float, word_count: int, image_count: int) -> str:
+    """Calculate overall quality grade"""
+    score = 0
+    
+    # SEO score component (50% weight)
+    if seo_score >= 90: score += 50
+    elif seo_score >= 80: score += 40
+    elif seo_score >= 70: score += 30
+    elif seo_score >= 60: score += 20
+    else: score += 10
+    
+    # Word count component (30% weight)
+    if word_count >= 600: score += 30
+    elif word_count >= 500: score += 25
+    elif word_count >= 400: score += 15
+    else: score += 5
+    
+    # Image count component (20% weight)
+    if image_count >= 2: score += 20
+    elif image_count >= 1: score += 10
+    
+    # Convert to grade
+    if score >= 90: return "A+"
+    elif score >= 85: return "A"
+    elif score >= 80: return "B+"
+    elif score >= 70: return "B"
+    elif score >= 60: return "C+"
+    elif score >= 50: return "C"
+    else: return "D"
 
 
 class MassBlogGenerator:
     """Mass blog post generation with quality monitoring"""
     
-    def __init__(self):
+    def __init__(self, workers: int = 1):
         self.project_root = Path(__file__).parent.parent
+        self.workers = workers  # processes for post verification (1 = serial, 0 = one per core)
         self.log_file = self.project_root / "ml_models" / "automation_logs" / "mass_generation.log"
         self.stats_file = self.project_root / "ml_models" / "automation_logs" / "mass_stats.json"
         
@@ -136,89 +227,19 @@ class MassBlogGenerator:
     
     def verify_post_quality(self, post_path: str) -> Dict[str, any]:
         """Verify a post meets quality requirements"""
-        try:
-            with open(post_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract post content between articleBody tags
-            import re
-            start_marker = '<div class="post-content" itemprop="articleBody">'
-            end_marker = '<script type="application/ld+json">'
-            
-            start_idx = content.find(start_marker)
-            end_idx = content.find(end_marker)
-            
-            if start_idx == -1 or end_idx == -1:
-                return {"valid": False, "error": "Could not find post content"}
-            
-            post_content = content[start_idx + len(start_marker):end_idx]
-            
-            # Count words (excluding HTML tags)
-            text_only = re.sub(r'<[^>]*>', ' ', post_content)
-            text_only = re.sub(r'\s+', ' ', text_only).strip()
-            words = [w for w in text_only.split() if w and len(w) > 1]
-            word_count = len(words)
-            
-            # Count images
-            image_count = post_content.count('<img ')
-            
-            # Extract SEO score from content
-            seo_score = 75.0  # Default if can't extract
-            seo_match = re.search(r'Grade: [A-F][+]? \((\d+\.?\d*)%\)', content)
-            if seo_match:
-                seo_score = float(seo_match.group(1))
-            
-            # Check requirements
-            requirements_met = {
-                "word_count": word_count >= self.quality_requirements["min_word_count"],
-                "images": image_count >= self.quality_requirements["min_images"],
-                "seo_score": seo_score >= self.quality_requirements["min_seo_score"]
-            }
-            
-            all_requirements_met = all(requirements_met.values())
-            
-            return {
-                "valid": True,
-                "word_count": word_count,
-                "image_count": image_count,
-                "seo_score": seo_score,
-                "requirements_met": requirements_met,
-                "all_requirements_met": all_requirements_met,
-                "quality_grade": self.get_quality_grade(seo_score, word_count, image_count)
-            }
-            
-        except Exception as e:
-            return {"valid": False, "error": str(e)}
+        return verify_post_quality(post_path, self.quality_requirements)
+    
+    def verify_posts_quality(self, post_paths: List[str]) -> List[Dict[str, any]]:
+        """Verify several posts, in a process pool when self.workers != 1 (results keep input order)"""
+        scan = scan_files(post_paths, partial(verify_post_quality, quality_requirements=self.quality_requirements),
+                          workers=self.workers)
+        if self.workers != 1:
+            scan.print_timing()
+        return [result.value or {"valid": False, "error": result.error} for result in scan]
     
     def get_quality_grade(self, seo_score: float, word_count: int, image_count: int) -> str:
         """Calculate overall quality grade"""
-        score = 0
-        
-        # SEO score component (50% weight)
-        if seo_score >= 90: score += 50
-        elif seo_score >= 80: score += 40
-        elif seo_score >= 70: score += 30
-        elif seo_score >= 60: score += 20
-        else: score += 10
-        
-        # Word count component (30% weight)
-        if word_count >= 600: score += 30
-        elif word_count >= 500: score += 25
-        elif word_count >= 400: score += 15
-        else: score += 5
-        
-        # Image count component (20% weight)
-        if image_count >= 2: score += 20
-        elif image_count >= 1: score += 10
-        
-        # Convert to grade
-        if score >= 90: return "A+"
-        elif score >= 85: return "A"
-        elif score >= 80: return "B+"
-        elif score >= 70: return "B"
-        elif score >= 60: return "C+"
-        elif score >= 50: return "C"
-        else: return "D"
+        return get_quality_grade(seo_score, word_count, image_count)
     
     def analyze_batch_quality(self, batch_results: List[Dict]) -> Dict[str, any]:
         """Analyze quality of a completed batch"""
@@ -233,10 +254,8 @@ class MassBlogGenerator:
         total_images = 0
         total_seo = 0
         
-        for post in successful_posts:
-            # Verify each post
-            verification = self.verify_post_quality(post["filename"])
-            
+        verifications = self.verify_posts_quality([post["filename"] for post in successful_posts])
+        for verification in verifications:
             if verification["valid"]:
                 quality_scores.append(verification["seo_score"])
                 total_words += verification["word_count"]
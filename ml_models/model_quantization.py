@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Dynamic INT8 Quantization for CPU Inference
+Quantizes the Linear layers of the energy GPT-2 models, caches the quantized
+model on disk, and reports speed, memory and perplexity against fp32
+
+Compare fp32 and int8 on a held-out sample (run from the project root):
+    python -m ml_models.model_quantization --model-path ml_models/model_checkpoints
+"""
+
+import argparse
+import copy
+import io
+import json
+import logging
+import math
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_SUFFIX = ".int8.pt"
+
+
+def _convert_conv1d_to_linear(model: nn.Module) -> nn.Module:
+    """
+    Replace transformers' GPT-2 Conv1D projections with equivalent nn.Linear layers
+
+    Conv1D stores its weight as (in_features, out_features); dynamic quantization
+    only knows nn.Linear, so without this only lm_head would be quantized.
+    """
+    for name, child in list(model.named_children()):
+        if type(child).__name__ == 'Conv1D':
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data.clone()
+            setattr(model, name, linear)
+        else:
+            _convert_conv1d_to_linear(child)
+    return model
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    """Return a dynamically int8-quantized copy of the model for CPU inference"""
+    model = _convert_conv1d_to_linear(copy.deepcopy(model).cpu())
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _source_fingerprint(source: Optional[Path]) -> Dict:
+    """Identify the fp32 weights a cached quantized model was built from"""
+    fingerprint = {"torch_version": torch.__version__}
+    if source is None or not Path(source).exists():
+        fingerprint["source"] = "gpt2-base"
+        return fingerprint
+
+    source = Path(source)
+    files = [source] if source.is_file() else sorted(
+        f for f in source.iterdir() if f.is_file() and not f.name.endswith((QUANTIZED_SUFFIX, QUANTIZED_SUFFIX + ".json"))
+    )
+    fingerprint["source"] = str(source)
+    fingerprint["files"] = {f.name: [f.stat().st_mtime_ns, f.stat().st_size] for f in files}
+    return fingerprint
+
+
+def load_or_quantize(model: nn.Module, cache_file: Path, source: Optional[Path] = None) -> nn.Module:
+    """
+    Load a cached quantized model, or quantize ``model`` and cache the result
+
+    The cache is reused only while the fp32 source (checkpoint file or model
+    directory) and the torch version are unchanged.
+
+    Args:
+        model: Loaded fp32 model (used when the cache is missing or stale)
+        cache_file: Where the quantized model is stored
+        source: Checkpoint file or directory the fp32 model was loaded from
+
+    Returns:
+        Quantized model in eval mode
+    """
+    cache_file = Path(cache_file)
+    meta_file = cache_file.with_name(cache_file.name + ".json")
+    fingerprint = _source_fingerprint(source)
+
+    if cache_file.exists() and meta_file.exists():
+        try:
+            with open(meta_file, 'r') as f:
+                if json.load(f) == fingerprint:
+                    quantized = torch.load(cache_file, map_location='cpu', weights_only=False)
+                    quantized.eval()
+                    logger.info(f"✅ Loaded cached int8 model from {cache_file}")
+                    return quantized
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized cache {cache_file}: {e}")
+
+    logger.info("Quantizing model to int8 (dynamic, Linear layers)...")
+    quantized = quantize_model(model)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(quantized, cache_file)
+        with open(meta_file, 'w') as f:
+            json.dump(fingerprint, f, indent=2)
+        logger.info(f"💾 Cached int8 model at {cache_file}")
+    except Exception as e:
+        logger.warning(f"Could not cache quantized model: {e}")
+    return quantized
+
+
+def model_size_mb(model: nn.Module) -> float:
+    """Serialized state_dict size, which counts packed int8 weights correctly"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def perplexity(model: nn.Module, tokenizer, texts: List[str], max_tokens: int = 512) -> float:
+    """Token-weighted perplexity of the model over the texts"""
+    total_loss, total_tokens = 0.0, 0
+    with torch.no_grad():
+        for text in texts:
+            input_ids = tokenizer.encode(text, return_tensors='pt', truncation=True, max_length=max_tokens)
+            if input_ids.shape[1] < 2:
+                continue
+            loss = model(input_ids, labels=input_ids).loss
+            tokens = input_ids.shape[1] - 1
+            total_loss += loss.item() * tokens
+            total_tokens += tokens
+    return math.exp(total_loss / total_tokens) if total_tokens else float('nan')
+
+
+def generation_latency(model: nn.Module, tokenizer, prompt: str, new_tokens: int = 64, runs: int = 3) -> float:
+    """Median seconds to greedily generate ``new_tokens`` tokens"""
+    input_ids = tokenizer.encode(prompt, return_tensors='pt')
+    timings = []
+    with torch.no_grad():
+        for _ in range(runs):
+            start = time.perf_counter()
+            model.generate(
+                input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.eos_token_id
+            )
+            timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def compare_models(fp32_model: nn.Module, int8_model: nn.Module, tokenizer, texts: List[str],
+                   prompt: str = "Recent advances in renewable energy technology show that") -> Dict:
+    """Report speed, size and perplexity of the int8 model relative to fp32"""
+    fp32_latency = generation_latency(fp32_model, tokenizer, prompt)
+    int8_latency = generation_latency(int8_model, tokenizer, prompt)
+    fp32_ppl = perplexity(fp32_model, tokenizer, texts)
+    int8_ppl = perplexity(int8_model, tokenizer, texts)
+    fp32_size = model_size_mb(fp32_model)
+    int8_size = model_size_mb(int8_model)
+
+    return {
+        'fp32': {'latency_seconds': fp32_latency, 'size_mb': fp32_size, 'perplexity': fp32_ppl},
+        'int8': {'latency_seconds': int8_latency, 'size_mb': int8_size, 'perplexity': int8_ppl},
+        'speedup': fp32_latency / int8_latency if int8_latency else None,
+        'size_reduction': 1 - int8_size / fp32_size if fp32_size else None,
+        'perplexity_delta': int8_ppl - fp32_ppl,
+        'sample_texts': len(texts)
+    }
+
+
+def load_held_out_sample(posts_dir: Path, max_posts: int = 20) -> List[str]:
+    """Plain-text paragraphs from published posts, used when no sample file is given"""
+    texts = []
+    for html_file in sorted(Path(posts_dir).glob("*/*.html"))[:max_posts * 2]:
+        if html_file.name == "index.html":
+            continue
+        content = html_file.read_text(encoding='utf-8', errors='ignore')
+        paragraphs = [re.sub(r'<[^>]+>', '', p).strip() for p in re.findall(r'<p[^>]*>(.*?)</p>', content, re.S)]
+        text = ' '.join(p for p in paragraphs if len(p.split()) > 20)
+        if text:
+            texts.append(text)
+        if len(texts) >= max_posts:
+            break
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare fp32 and dynamic int8 energy models on CPU')
+    parser.add_argument('--model-path', default='ml_models/model_checkpoints', help='Checkpoint directory')
+    parser.add_argument('--sample-file', help='Held-out text file (one sample per paragraph)')
+    parser.add_argument('--output', help='Optional JSON file for the report')
+    args = parser.parse_args()
+
+    from .inference import EnergyInference
+
+    fp32 = EnergyInference(args.model_path, use_prefix_cache=False)
+    int8 = EnergyInference(args.model_path, use_prefix_cache=False, quantize=True)
+
+    if args.sample_file:
+        texts = [t.strip() for t in Path(args.sample_file).read_text(encoding='utf-8').split('\n\n') if t.strip()]
+    else:
+        texts = load_held_out_sample(Path(__file__).parent.parent / "posts")
+
+    report = compare_models(fp32.model, int8.model, fp32.tokenizer, texts)
+    print(f"⚡ Latency: fp32 {report['fp32']['latency_seconds']:.2f}s, int8 {report['int8']['latency_seconds']:.2f}s "
+          f"({report['speedup']:.2f}x)")
+    print(f"💾 Size: fp32 {report['fp32']['size_mb']:.0f}MB, int8 {report['int8']['size_mb']:.0f}MB "
+          f"({report['size_reduction']:.0%} smaller)")
+    print(f"📉 Perplexity: fp32 {report['fp32']['perplexity']:.2f}, int8 {report['int8']['perplexity']:.2f} "
+          f"(delta {report['perplexity_delta']:+.2f})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Parallel Post Scanning
+Runs a per-file function over a list of posts in a process pool, in chunks,
+returning results in input order with the time spent on every file
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional
+
+# Below this many files a pool costs more to start than it saves
+MIN_PARALLEL_FILES = 64
+
+# Chunks per worker, so a slow chunk near the end does not leave the other cores idle
+CHUNKS_PER_WORKER = 4
+
+_worker_fn: Optional[Callable] = None
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Worker count for a --workers value (0 or None = one per core)"""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+class FileResult:
+    """Outcome of the scan function on one file"""
+
+    __slots__ = ('item', 'value', 'seconds', 'error')
+
+    def __init__(self, item, value, seconds: float, error: Optional[str] = None):
+        self.item = item
+        self.value = value
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def label(self) -> str:
+        return str(self.item[0] if isinstance(self.item, tuple) else self.item)
+
+
+class ScanResult:
+    """Per-file results of a scan, in the order the files were given"""
+
+    def __init__(self, results: List[FileResult], workers: int, wall_seconds: float):
+        self.results = results
+        self.workers = workers
+        self.wall_seconds = wall_seconds
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    def values(self) -> List[Any]:
+        return [result.value for result in self.results]
+
+    @property
+    def errors(self) -> List[FileResult]:
+        return [result for result in self.results if result.error]
+
+    def timing_summary(self, slowest: int = 5) -> dict:
+        """Totals plus the slowest files, for logs and JSON reports"""
+        seconds = [result.seconds for result in self.results]
+        total = sum(seconds)
+        return {
+            'files': len(seconds),
+            'workers': self.workers,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'file_seconds': round(total, 3),
+            'mean_ms': round(total * 1000 / len(seconds), 3) if seconds else 0.0,
+            'max_ms': round(max(seconds) * 1000, 3) if seconds else 0.0,
+            'slowest': [
+                {'file': result.label, 'ms': round(result.seconds * 1000, 3)}
+                for result in sorted(self.results, key=lambda r: r.seconds, reverse=True)[:slowest]
+            ]
+        }
+
+    def print_timing(self, slowest: int = 5):
+        summary = self.timing_summary(slowest)
+        print(f"⏱️ Scanned {summary['files']} files in {summary['wall_seconds']:.2f}s "
+              f"with {summary['workers']} worker(s) "
+              f"(mean {summary['mean_ms']:.2f} ms/file, max {summary['max_ms']:.2f} ms)")
+        for entry in summary['slowest']:
+            print(f"   {entry['ms']:8.2f} ms  {entry['file']}")
+
+
+def _run_one(fn: Callable, item) -> FileResult:
+    start = time.perf_counter()
+    try:
+        value, error = fn(item), None
+    except Exception as e:
+        value, error = None, str(e)
+    return FileResult(item, value, time.perf_counter() - start, error)
+
+
+def _init_worker(fn: Callable):
+    # Installed once per process, so chunks only carry their file names
+    global _worker_fn
+    _worker_fn = fn
+
+
+def _run_chunk(items: List) -> List[FileResult]:
+    return [_run_one(_worker_fn, item) for item in items]
+
+
+def scan_files(items: Iterable, fn: Callable, workers: Optional[int] = 1,
+               chunk_size: Optional[int] = None, min_parallel: int = MIN_PARALLEL_FILES) -> ScanResult:
+    """
+    Apply fn to every item (usually a post path) and time each call
+
+    fn must be picklable (a module-level function, a functools.partial of one, or
+    a bound method of a picklable object). It runs once per item; an exception is
+    recorded on that item's result instead of stopping the scan.
+
+    Args:
+        items: Files (or tuples starting with a file) to scan; results keep this order
+        fn: Function called with one item
+        workers: Processes to use (1 = serial in this process, 0/None = one per core)
+        chunk_size: Items per task (default: spread over CHUNKS_PER_WORKER chunks per worker)
+        min_parallel: Scan serially when there are fewer items than this
+
+    Returns:
+        ScanResult with a FileResult per item
+    """
+    items = list(items)
+    workers = min(resolve_workers(workers), max(1, len(items)))
+    start = time.perf_counter()
+
+    if workers > 1 and len(items) >= min_parallel:
+        chunk_size = chunk_size or max(1, -(-len(items) // (workers * CHUNKS_PER_WORKER)))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fn,)) as pool:
+                # map() yields chunk results in submission order, whatever order they finish in
+                results = [result for chunk in pool.map(_run_chunk, chunks) for result in chunk]
+            return ScanResult(results, workers, time.perf_counter() - start)
+        except (OSError, BrokenProcessPool) as e:
+            print(f"⚠️ Process pool unavailable ({e}), scanning serially", file=sys.stderr)
+            start = time.perf_counter()
+
+    results = [_run_one(fn, item) for item in items]
+    return ScanResult(results, 1, time.perf_counter() - start)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Persistent Post Manifest for Website Integration
+Keeps the listing metadata and a content hash of every post, so site integration
+only re-parses posts that changed and only re-renders the pages they appear on
+"""
+
+import os
+import sys
+import json
+import hashlib
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from parallel_scan import scan_files
+
+
+def read_post(extractor: Callable, item) -> tuple:
+    """
+    Hash a post and extract its metadata unless the hash matches the known one
+    (module-level so process pool workers can run it)
+
+    Args:
+        extractor: Function (html_file, content) -> post metadata
+        item: (html_file, sha256 recorded in the manifest or None)
+
+    Returns:
+        (sha256, metadata or None if unchanged, changed)
+    """
+    html_file, known_digest = item
+    with open(html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    if digest == known_digest:
+        return digest, None, False
+    return digest, extractor(Path(html_file), content), True
+
+
+class PostManifest:
+    """
+    JSON sidecar of per-post metadata plus render signatures of the site sections
+    Entries are keyed by post path relative to the posts directory; a post is
+    re-parsed only when its mtime/size changed and its content hash differs
+    """
+
+    MANIFEST_VERSION = 1
+    MANIFEST_FILENAME = ".post_manifest.json"
+
+    def __init__(self, posts_dir, extractor: Callable[[Path, str], Optional[Dict[str, Any]]],
+                 categories: Iterable[str] = None, manifest_file=None):
+        """
+        Args:
+            posts_dir: Root posts directory containing category folders
+            extractor: Function (html_file, content) -> post metadata (None to skip the file)
+            categories: Category folders to include (all folders by default)
+            manifest_file: Override location of the sidecar file
+        """
+        self.posts_dir = Path(posts_dir)
+        self.extractor = extractor
+        self.categories = set(categories) if categories is not None else None
+        self.manifest_file = Path(manifest_file) if manifest_file else self.posts_dir / self.MANIFEST_FILENAME
+        self.entries: Dict[str, Dict] = {}
+        self.sections: Dict[str, str] = {}
+        self.stats = {"reused": 0, "rehashed": 0, "parsed": 0, "removed": 0, "errors": 0}
+        self.changes = {"added": [], "changed": [], "removed": []}
+        self.last_scan = None
+        self.unreadable = set()      # post files the last refresh could not read
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """Load the sidecar file, discarding it if missing or from another version"""
+        if not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.MANIFEST_VERSION:
+                self.entries = data.get("entries", {})
+                self.sections = data.get("sections", {})
+        except Exception as e:
+            print(f"⚠️ Could not read post manifest, rebuilding: {e}")
+            self.entries, self.sections = {}, {}
+
+    def save(self):
+        """Write the manifest atomically if anything changed"""
+        if not self._dirty:
+            return
+        tmp_file = self.manifest_file.with_suffix(self.manifest_file.suffix + ".tmp")
+        try:
+            # json.dumps uses the C encoder, json.dump to a file does not
+            data = json.dumps({"version": self.MANIFEST_VERSION, "entries": self.entries,
+                               "sections": self.sections}, ensure_ascii=False)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_file, self.manifest_file)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️ Could not save post manifest: {e}")
+
+    def iter_post_files(self):
+        """Yield every post file under the category folders (category index pages excluded)"""
+        for _, entry in self._scan():
+            yield Path(entry.path)
+
+    def _scan(self):
+        """(key, DirEntry) of every post file, without building Path objects per file"""
+        for category_folder in os.scandir(self.posts_dir):
+            if not category_folder.is_dir() or category_folder.name == '__pycache__':
+                continue
+            if self.categories is not None and category_folder.name not in self.categories:
+                continue
+            for entry in os.scandir(category_folder.path):
+                if entry.name.endswith(".html") and entry.name != "index.html" and entry.is_file():
+                    yield f"{category_folder.name}/{entry.name}", entry
+
+    def update_file(self, html_file: Path, content: str = None, stat_result=None) -> Optional[str]:
+        """
+        Record a single post, re-extracting its metadata only if the content changed
+
+        Returns:
+            'added' or 'changed', or None if the post's content is unchanged
+        """
+        html_file = Path(html_file)
+        if stat_result is None:
+            stat_result = html_file.stat()
+        if content is None:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        entry = self.entries.get(self._key(html_file))
+        if entry and entry.get("sha256") == digest:
+            return self._record(html_file, stat_result, digest, None, False)
+        return self._record(html_file, stat_result, digest, self.extractor(html_file, content), True)
+
+    def _record(self, html_file: Path, stat_result, digest: str, metadata, changed: bool) -> Optional[str]:
+        key = self._key(html_file)
+        entry = self.entries.get(key)
+        self._dirty = True
+        if not changed:
+            # Touched but not edited: keep the metadata
+            entry["mtime"], entry["size"] = stat_result.st_mtime_ns, stat_result.st_size
+            self.stats["rehashed"] += 1
+            return None
+
+        self.entries[key] = {
+            "mtime": stat_result.st_mtime_ns,
+            "size": stat_result.st_size,
+            "sha256": digest,
+            "metadata": metadata
+        }
+        self.stats["parsed"] += 1
+        change = "changed" if entry else "added"
+        self.changes[change].append(key)
+        return change
+
+    def remove_file(self, html_file: Path) -> bool:
+        """Forget a deleted post"""
+        key = self._key(html_file)
+        if self.entries.pop(key, None) is None:
+            return False
+        self.changes["removed"].append(key)
+        self.stats["removed"] += 1
+        self._dirty = True
+        return True
+
+    def refresh(self, workers: int = 1) -> Dict[str, Dict]:
+        """
+        Bring the manifest in sync with the posts directory
+
+        Args:
+            workers: Processes for parsing new or edited posts (1 = serial, 0 = one per core)
+
+        Returns:
+            Mapping of relative post path to its entry
+        """
+        seen, stale = set(), []
+        self.last_scan = None
+        for key, dir_entry in self._scan():
+            seen.add(key)
+            try:
+                stat_result = dir_entry.stat()
+                entry = self.entries.get(key)
+                if (entry and entry.get("mtime") == stat_result.st_mtime_ns
+                        and entry.get("size") == stat_result.st_size):
+                    self.stats["reused"] += 1
+                    continue
+                stale.append((dir_entry.path, stat_result, entry.get("sha256") if entry else None))
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.unreadable.add(key)
+                print(f"⚠️ Error reading {dir_entry.path}: {e}")
+
+        if stale:
+            stale.sort(key=lambda item: item[0])
+            self.last_scan = scan_files([(path, digest) for path, _, digest in stale],
+                                        partial(read_post, self.extractor), workers=workers)
+            for (path, stat_result, _), result in zip(stale, self.last_scan):
+                if result.error:
+                    self.stats["errors"] += 1
+                    self.unreadable.add(self._key(Path(path)))
+                    print(f"⚠️ Error reading {path}: {result.error}")
+                    continue
+                digest, metadata, changed = result.value
+                self._record(Path(path), stat_result, digest, metadata, changed)
+
+        for key in [key for key in self.entries if key not in seen]:
+            self.remove_file(self.posts_dir / key)
+
+        self.save()
+        return self.entries
+
+    def unrecorded_files(self) -> List[str]:
+        """Keys of post files on disk the manifest has no entry for (unreadable posts excluded)"""
+        return [key for key, _ in self._scan() if key not in self.entries and key not in self.unreadable]
+
+    def get_posts(self) -> List[Dict[str, Any]]:
+        """Metadata of every post in the manifest"""
+        return [entry["metadata"] for entry in self.entries.values() if entry.get("metadata")]
+
+    @staticmethod
+    def signature(*inputs) -> str:
+        """Stable hash of the data a section is rendered from (metadata keys keep extractor order)"""
+        payload = json.dumps(inputs, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def section_is_current(self, name: str, signature: str) -> bool:
+        """True if the section was last rendered from exactly these inputs"""
+        return self.sections.get(name) == signature
+
+    def mark_rendered(self, name: str, signature: str):
+        self.sections[name] = signature
+        self._dirty = True
+
+    def _key(self, html_file: Path) -> str:
+        return Path(html_file).relative_to(self.posts_dir).as_posix()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Streaming Post Metadata Extraction
+Reads the listing fields of a blog post from html.parser events instead of a
+BeautifulSoup DOM, and stops parsing as soon as every requested field is known
+"""
+
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Optional
+
+# Fields extract_post_fields() can return:
+#   title            text of the first <title>
+#   h1               text of the first <h1>
+#   post_title       text of the first <h1 class="post-title">
+#   post_meta        text of the first <div class="post-meta">
+#   first_paragraph  text of the first <p>
+#   excerpt          stripped text of the first <p> in the first <div class="post-content">
+#                    longer than min_excerpt_chars
+#   image            (src, alt) of the first <img>
+#   word_count       words of the document text, as len(soup.get_text().split())
+FIELDS = ('title', 'h1', 'post_title', 'post_meta', 'first_paragraph', 'excerpt', 'image', 'word_count')
+
+# Strings inside these are not document text (BeautifulSoup's get_text() skips them too)
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+# Whitespace-only strings are collapsed to '\n' or ' ' outside these, as BeautifulSoup does
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+# Elements without content or end tag (BeautifulSoup's HTML empty-element tags)
+VOID_TAGS = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr',
+             'image', 'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid',
+             'param', 'source', 'spacer', 'track', 'wbr'}
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class _FieldsComplete(Exception):
+    """Raised from a parser callback to stop feeding once every field is resolved"""
+
+
+class PostMetadataParser(HTMLParser):
+    """html.parser event handler that captures only the requested fields"""
+
+    def __init__(self, fields: Iterable[str] = FIELDS, min_excerpt_chars: int = 50):
+        super().__init__(convert_charrefs=True)
+        self.wanted = set(fields)
+        unknown = self.wanted - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(sorted(unknown))}")
+        self.min_excerpt_chars = min_excerpt_chars
+        self.result: Dict[str, Any] = {}
+        self._pending = self.wanted - {'word_count'}
+        self._open = []                  # [tag, captures] of open elements, outermost first
+        self._captures = []              # [field, text parts, final text] of elements being read
+        self._excerpts = []              # excerpt captures in document order
+        self._content = None             # open element of the post-content div
+        self._content_seen = False
+        self._non_text = 0
+        self._preserve = 0
+        self._text = [] if 'word_count' in self.wanted else None
+
+    def _resolve(self, field: str, value):
+        self.result[field] = value
+        self._pending.discard(field)
+        if not self._pending and self._text is None:
+            raise _FieldsComplete()
+
+    def _capture(self, field: str) -> list:
+        capture = [field, [], None]
+        self._open[-1][1].append(capture)
+        self._captures.append(capture)
+        return capture
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == 'img' and 'image' in self._pending:
+                attrs = dict(attrs)
+                self._resolve('image', (attrs.get('src') or '', attrs.get('alt') or ''))
+            return
+
+        element = [tag, []]
+        self._open.append(element)
+        if tag in NON_TEXT_TAGS:
+            self._non_text += 1
+            return
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve += 1
+            return
+        if tag not in ('title', 'h1', 'div', 'p'):
+            return
+
+        classes = (dict(attrs).get('class') or '').split()
+        if tag == 'title' and 'title' in self._pending and not self._capturing('title'):
+            self._capture('title')
+        elif tag == 'h1':
+            if 'h1' in self._pending and not self._capturing('h1'):
+                self._capture('h1')
+            if 'post_title' in self._pending and 'post-title' in classes and not self._capturing('post_title'):
+                self._capture('post_title')
+        elif tag == 'div':
+            if 'post_meta' in self._pending and 'post-meta' in classes and not self._capturing('post_meta'):
+                self._capture('post_meta')
+            if 'excerpt' in self._pending and 'post-content' in classes and not self._content_seen:
+                self._content_seen = True
+                self._content = element
+        elif tag == 'p':
+            if 'first_paragraph' in self._pending and not self._capturing('first_paragraph'):
+                self._capture('first_paragraph')
+            if self._content is not None and 'excerpt' in self._pending:
+                self._excerpts.append(self._capture('excerpt'))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index][0] == tag:
+                break
+        else:
+            return
+        # As in BeautifulSoup, an end tag also closes every element opened after
+        # its start tag (a <p> left open ends with its parent div); stray end tags are ignored
+        while len(self._open) > index:
+            self._close_element(self._open.pop())
+
+    def close(self):
+        super().close()
+        # Elements still open at the end of the document end there
+        while self._open:
+            self._close_element(self._open.pop())
+
+    def _close_element(self, element):
+        if element[0] in NON_TEXT_TAGS:
+            self._non_text -= 1
+        elif element[0] in PRESERVE_WHITESPACE_TAGS:
+            self._preserve -= 1
+        for capture in element[1]:
+            self._captures = [c for c in self._captures if c is not capture]
+            field, text = capture[0], ''.join(capture[1])
+            if field == 'excerpt':
+                capture[2] = text.strip()
+                self._next_excerpt()
+            elif field in self._pending:
+                self._resolve(field, text)
+
+        if element is self._content:
+            # Only the first post-content div is searched
+            self._content = None
+            if 'excerpt' in self._pending:
+                self._resolve('excerpt', None)
+
+    def _next_excerpt(self):
+        """Check closed paragraphs in document order (a nested <p> closes before the one around it)"""
+        while self._excerpts and self._excerpts[0][2] is not None:
+            text = self._excerpts.pop(0)[2]
+            if len(text) > self.min_excerpt_chars and 'excerpt' in self._pending:
+                self._excerpts = []
+                self._resolve('excerpt', text)
+
+    def handle_data(self, data):
+        if self._non_text:
+            return
+        if not self._preserve and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if self._text is not None:
+            self._text.append(data)
+        for capture in self._captures:
+            capture[1].append(data)
+
+    def _capturing(self, field: str) -> bool:
+        return any(capture[0] == field for capture in self._captures)
+
+    def fields(self) -> Dict[str, Any]:
+        """Requested fields, None for those the document does not have"""
+        result = {field: self.result.get(field) for field in self.wanted}
+        if self._text is not None:
+            result['word_count'] = len(''.join(self._text).split())
+        return result
+
+
+def extract_post_fields(content: str, fields: Iterable[str] = FIELDS,
+                        min_excerpt_chars: int = 50) -> Dict[str, Optional[Any]]:
+    """
+    Extract listing fields from a post's HTML in one streaming pass
+
+    Parsing stops at the first point where every requested field is resolved;
+    word_count needs the whole document, so requesting it reads to the end.
+
+    Args:
+        content: Post HTML
+        fields: Names from FIELDS
+        min_excerpt_chars: The excerpt is the first post-content paragraph longer than this
+
+    Returns:
+        Dict of field -> value (str, (src, alt) for image, int for word_count, or None)
+    """
+    parser = PostMetadataParser(fields, min_excerpt_chars)
+    try:
+        parser.feed(content)
+        parser.close()
+    except _FieldsComplete:
+        pass
+    return parser.fields()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+KV-Cache Reuse for Shared Prompt Prefixes
+The inference engines prepend one of a few fixed energy-context strings to
+every prompt; this caches the model's past_key_values for each such prefix
+so generation only has to encode the topic-specific part of the prompt
+"""
+
+import copy
+import logging
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixKVCache:
+    """LRU cache of prefix token ids and past_key_values, keyed by prefix text"""
+
+    def __init__(self, model, tokenizer, device, max_entries: int = 16):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[torch.Tensor, object]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "prefix_tokens_reused": 0}
+
+    def _get(self, prefix: str) -> Tuple[torch.Tensor, object]:
+        entry = self._entries.get(prefix)
+        if entry is not None:
+            self._entries.move_to_end(prefix)
+            self.stats["hits"] += 1
+            self.stats["prefix_tokens_reused"] += entry[0].shape[1]
+            return entry
+
+        self.stats["misses"] += 1
+        prefix_ids = self.tokenizer.encode(prefix, return_tensors='pt').to(self.device)
+        with torch.no_grad():
+            past = self.model(prefix_ids, use_cache=True).past_key_values
+        entry = (prefix_ids, past)
+
+        self._entries[prefix] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return entry
+
+    def prepare(self, prefix: str, suffix: str, max_prompt_tokens: int = 512) -> Tuple[torch.Tensor, object]:
+        """
+        Build generate() inputs for prefix + suffix reusing the cached prefix state
+
+        The returned cache covers every prompt token except the last, which is what
+        ``generate`` expects when handed ``past_key_values`` alongside full input ids.
+
+        Args:
+            prefix: Shared context string (cached)
+            suffix: Prompt-specific remainder, appended directly after the prefix
+            max_prompt_tokens: Total prompt length limit; the suffix is truncated to fit
+
+        Returns:
+            Tuple of (full input ids, past_key_values for all but the last token,
+            or None if the suffix is empty)
+        """
+        prefix_ids, prefix_past = self._get(prefix)
+        suffix_ids = self.tokenizer.encode(suffix, return_tensors='pt').to(self.device)
+        suffix_ids = suffix_ids[:, :max(1, max_prompt_tokens - prefix_ids.shape[1])]
+        if suffix_ids.shape[1] == 0:
+            return prefix_ids, None
+        input_ids = torch.cat([prefix_ids, suffix_ids], dim=1)
+
+        # Generation mutates cache objects in place, so every call works on a copy
+        past = copy.deepcopy(prefix_past)
+        if suffix_ids.shape[1] > 1:
+            with torch.no_grad():
+                past = self.model(
+                    suffix_ids[:, :-1],
+                    past_key_values=past,
+                    attention_mask=torch.ones_like(input_ids[:, :-1]),
+                    use_cache=True
+                ).past_key_values
+
+        return input_ids, past
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Compiled Site Renderer
+Renders the homepage, blog index and category index pages from the post manifest
+with compiled Jinja2 templates instead of editing each page's DOM on every run
+
+The page templates are still the HTML files designers edit (index_modern.html,
+blog/index_modern.html, posts/<category>/index.html). Each one is converted once
+into a Jinja2 template (the article cards and counters become template slots),
+the converted source is cached by the page's content hash, and Jinja2 keeps the
+compiled template in a bytecode cache, so a rebuild only runs the compiled code
+and writes the output.
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from site_writer import SiteWriter
+
+# Try to import Jinja2, the integrators keep their BeautifulSoup path if not available
+try:
+    from jinja2 import Environment, FileSystemBytecodeCache, FunctionLoader
+    JINJA2_AVAILABLE = True
+except ImportError:
+    JINJA2_AVAILABLE = False
+
+# Stands in for the card loop while a converted page is serialized
+CARDS_PLACEHOLDER = "SITE-RENDERER-CARDS"
+
+# Same markup as FullWebsiteIntegrator.create_blog_article_html (card fields arrive escaped)
+BLOG_CARD = '''
+        <article class="grid-article" data-category="{{ post['category'] }}">
+            <div class="article-image">
+                <img src="../assets/images/blog/placeholder-{{ post['category'] }}.jpg" 
+                     alt="{{ post['title'] }}" 
+                     loading="lazy">
+                <span class="category-badge">{{ post['category_name'] }}</span>
+            </div>
+            <div class="article-content">
+                <h2 class="article-title">
+                    <a href="../{{ post['url'] }}">
+                        {{ post['title'] }}
+                    </a>
+                </h2>
+                <p class="article-excerpt">
+                    {{ post['excerpt'] }}
+                </p>
+                <div class="article-meta">
+                    <span class="reading-time">{{ post['reading_time'] }}</span>
+                    <span>•</span>
+                    <time datetime="{{ post['date_sort'] }}">{{ post['date'] }}</time>
+                </div>
+            </div>
+        </article>'''
+
+# Same markup as the hand-written cards of the category pages; data-generated tells
+# rendered cards apart from the hand-written ones when the page is converted again
+CATEGORY_CARD = '''
+                    <article class="grid-article" data-generated>
+                        <div class="article-image">
+                            <img src="../../assets/images/blog/placeholder-{{ post['category'] }}.svg" alt="{{ post['title'] }}" loading="lazy">
+                            <span class="category-badge">{{ post['category_name'] }}</span>
+                        </div>
+                        <div class="article-content">
+                            <h2 class="article-title">
+                                <a href="{{ post['filename'] }}">{{ post['title'] }}</a>
+                            </h2>
+                            <p class="article-excerpt">
+                                {{ post['excerpt'] }}
+                            </p>
+                            <div class="article-meta">
+                                <span class="reading-time">{{ post['reading_time'] }}</span>
+                                <span>•</span>
+                                <time datetime="{{ post['date_sort'] }}">{{ post['date'] }}</time>
+                            </div>
+                        </div>
+                    </article>'''
+
+# Post fields the cards print; they are escaped once per post and the card
+# loops run with autoescape off, instead of escaping every field of every card
+CARD_FIELDS = ('category', 'category_name', 'title', 'url', 'filename', 'excerpt', 'reading_time', 'date_sort', 'date')
+
+# Cached template sources are only reused if made by this version of the converter
+with open(__file__, 'rb') as _f:
+    _CONVERTER_KEY = hashlib.sha256(_f.read()).hexdigest()
+
+_JINJA_SYNTAX = re.compile(r'{[{%#]')
+_SLUG = re.compile(r'[\w-]+')
+
+
+def _protect(soup: BeautifulSoup):
+    """Wrap page text and attributes that look like Jinja syntax in raw blocks"""
+    for string in soup.find_all(string=_JINJA_SYNTAX):
+        string.replace_with(type(string)('{% raw %}' + str(string) + '{% endraw %}'))
+    for tag in soup.find_all(True):
+        for name, value in tag.attrs.items():
+            if isinstance(value, str) and _JINJA_SYNTAX.search(value):
+                tag[name] = '{% raw %}' + value + '{% endraw %}'
+
+
+def _slot_text(elem, condition: Optional[str], expression: str):
+    """Replace an element's content with an expression (the original content when the condition is false)"""
+    if elem is None:
+        return
+    if condition is None:
+        elem.string = '{{ ' + expression + ' }}'
+        return
+    original = list(elem.contents)
+    elem.clear()
+    elem.append(NavigableString('{% if ' + condition + ' %}{{ ' + expression + ' }}{% else %}'))
+    for child in original:
+        elem.append(child)
+    elem.append(NavigableString('{% endif %}'))
+
+
+def _slot_attr(elem, attr: str, condition: str, expression: str):
+    if elem is None:
+        return
+    elem[attr] = '{% if ' + condition + ' %}{{ ' + expression + ' }}{% else %}' + (elem.get(attr) or '') + '{% endif %}'
+
+
+def _slot_card(card, var: str, excerpt: bool):
+    """Article card slots, as FullWebsiteIntegrator.update_featured_article and friends fill them"""
+    title_elem = card.find('h3', class_='article-title')
+    link = title_elem.find('a') if title_elem else None
+    _slot_text(link, var, f'{var}.title')
+    _slot_attr(link, 'href', var, f'{var}.url')
+    if excerpt:
+        _slot_text(card.find('p', class_='article-excerpt'), var, f'{var}.excerpt')
+    meta_elem = card.find('div', class_='article-meta')
+    if meta_elem:
+        time_elem = meta_elem.find('time')
+        _slot_text(time_elem, var, f'{var}.date')
+        _slot_attr(time_elem, 'datetime', var, f'{var}.date_sort')
+        _slot_text(meta_elem.find('span', class_='reading-time'), var, f'{var}.reading_time')
+    _slot_text(card.find('span', class_='category-badge'), var, f'{var}.category_name')
+
+
+class _CategorySlotLocator(HTMLParser):
+    """
+    Finds the character ranges of a category page's dynamic content: the article
+    grid, the post count and the other categories' article counts, plus the cards
+    in the grid
+    """
+
+    def __init__(self, html: str, categories: List[str]):
+        super().__init__(convert_charrefs=True)
+        self.categories = categories
+        self.slots = []              # (start, end, kind, category)
+        self.cards = []              # (start, end, generated, post link) of the grid's articles
+        self._html = html
+        self._line_offsets = [0]
+        for line in html.splitlines(keepends=True):
+            self._line_offsets.append(self._line_offsets[-1] + len(line))
+        self._depth = {'div': 0, 'span': 0, 'a': 0, 'article': 0}
+        self._open = []              # [tag, depth, content start, kind, category]
+        self._stats_depth = None     # div depth of the open category-stats block
+        self._card = None            # (a depth, category) of the open category card
+        self._article = None         # [start, generated, post link] of the open grid article
+        self._seen = set()
+        self.feed(html)
+        self.close()
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in self._depth:
+            return
+        self._depth[tag] += 1
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        content_start = self._offset() + len(self.get_starttag_text())
+        kind, category = None, None
+        if tag == 'div' and 'articles-grid' in classes and 'grid' not in self._seen:
+            kind = 'grid'
+        elif tag == 'article' and self._depth['article'] == 1 and any(s[3] == 'grid' for s in self._open):
+            self._article = [self._offset(), 'data-generated' in attrs, None]
+        elif tag == 'a' and self._article and self._article[2] is None:
+            self._article[2] = attrs.get('href') or ''
+        elif tag == 'div' and 'category-stats' in classes and self._stats_depth is None:
+            self._stats_depth = self._depth['div']
+        elif tag == 'a' and 'category-card' in classes:
+            href = attrs.get('href') or ''
+            self._card = (self._depth['a'], next((c for c in self.categories if f"/posts/{c}/" in href), None))
+        elif tag == 'span' and 'stat-number' in classes and self._stats_depth is not None and 'count' not in self._seen:
+            kind = 'count'
+        elif tag == 'span' and 'article-count' in classes and self._card and self._card[1]:
+            kind, category = 'article_count', self._card[1]
+        if kind:
+            self._seen.add(kind)
+            self._open.append([tag, self._depth[tag], content_start, kind, category])
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags have no content to replace
+        pass
+
+    def handle_endtag(self, tag):
+        if tag not in self._depth or not self._depth[tag]:
+            return
+        for slot in [s for s in self._open if s[0] == tag and s[1] == self._depth[tag]]:
+            self._open.remove(slot)
+            self.slots.append((slot[2], self._offset(), slot[3], slot[4]))
+        if tag == 'div' and self._stats_depth == self._depth['div']:
+            self._stats_depth = -1   # only the first block
+        if tag == 'a' and self._card and self._card[0] == self._depth['a']:
+            self._card = None
+        if tag == 'article' and self._article and self._depth['article'] == 1:
+            end = self._html.index('>', self._offset()) + 1
+            self.cards.append((self._article[0], end, self._article[1], self._article[2]))
+            self._article = None
+        self._depth[tag] -= 1
+
+
+def _raw(text: str) -> str:
+    """Page text as Jinja2 template source"""
+    if not _JINJA_SYNTAX.search(text):
+        return text
+    return '{% raw %}' + text.replace('{% endraw %}', "{% endraw %}{{ '{% endraw %}' }}{% raw %}") + '{% endraw %}'
+
+
+class SiteRenderer:
+    """Converts the site's page templates to Jinja2 once and renders them from manifest data"""
+
+    def __init__(self, project_root: Path, categories, cache_dir: Path = None, writer: SiteWriter = None):
+        """
+        Args:
+            project_root: Website root
+            categories: Category folder names (keys of the integrator's category table)
+            cache_dir: Where converted template sources and Jinja2 bytecode are kept
+            writer: Writes the rendered pages (default: a SiteWriter for project_root)
+        """
+        if not JINJA2_AVAILABLE:
+            raise ImportError("SiteRenderer requires Jinja2 (pip install jinja2)")
+        self.project_root = Path(project_root)
+        self.categories = list(categories)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.project_root / ".template_cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.writer = writer or SiteWriter(self.project_root)
+        self._sources: Dict[str, tuple] = {}
+        self.env = Environment(
+            loader=FunctionLoader(self._load_template),
+            autoescape=True,
+            keep_trailing_newline=True,
+            bytecode_cache=FileSystemBytecodeCache(str(self.cache_dir)),
+            auto_reload=True
+        )
+
+    def page_source(self, name: str) -> Path:
+        """HTML file a page template is converted from"""
+        if name == 'homepage':
+            return self.project_root / "index_modern.html"
+        if name == 'blog_index':
+            return self.project_root / "blog" / "index_modern.html"
+        return self.project_root / "posts" / name.split('/', 1)[1] / "index.html"
+
+    def page_output(self, name: str) -> Path:
+        if name == 'homepage':
+            return self.project_root / "index.html"
+        if name == 'blog_index':
+            return self.project_root / "blog" / "index.html"
+        # Category pages are their own template
+        return self.page_source(name)
+
+    def pages(self, all_posts: Dict[str, List[Dict]], recent_posts: List[Dict],
+              flat_posts: List[Dict]) -> Dict[str, Dict]:
+        """
+        Context of every page to render, built once for the whole site
+
+        Args:
+            all_posts: Posts by category, newest first
+            recent_posts: Homepage selection, newest first
+            flat_posts: Every post, newest first
+
+        Returns:
+            Dict of page name -> template context
+        """
+        counts = {category: len(posts) for category, posts in all_posts.items()}
+        # Escaped card fields, shared by the blog index and the post's category page
+        escaped = {
+            id(post): {field: html.escape(str(post.get(field, ''))) for field in CARD_FIELDS}
+            for post in flat_posts
+        }
+        pages = {
+            'homepage': {
+                'featured': recent_posts[0] if recent_posts else None,
+                'sidebar': recent_posts[1:3],
+                'grid': recent_posts[3:7],
+                'counts': counts
+            },
+            'blog_index': {'posts': [escaped[id(post)] for post in flat_posts], 'total': len(flat_posts), 'counts': counts}
+        }
+        for category, posts in all_posts.items():
+            if (self.project_root / "posts" / category / "index.html").exists():
+                pages[f"category/{category}"] = {'posts': [escaped[id(post)] for post in posts], 'counts': counts}
+        return pages
+
+    def template_signature(self, name: str) -> Optional[str]:
+        """Hash of the converted template (None if the page source is missing)"""
+        source = self._converted(name)
+        return source[1] if source else None
+
+    def render(self, name: str, context: Dict) -> str:
+        return self.env.get_template(name).render(context)
+
+    def write_page(self, name: str, context: Dict) -> bool:
+        """Render a page and write it to its output file"""
+        converted = self._converted(name)
+        if converted is None:
+            print(f"❌ Template for {name} not found: {self.page_source(name)}")
+            return False
+        try:
+            page = self.render(name, context)
+            output = self.page_output(name)
+            written = self.writer.write(output, page)
+            if written and output == self.page_source(name):
+                # The rendered page converts back to the same template: remember
+                # that instead of parsing it again on the next run
+                self._store_converted(name, page, converted, rendered=True)
+                stat_result = output.stat()
+                self._sources[name] = ((stat_result.st_mtime_ns, stat_result.st_size), converted)
+            print(f"✅ Rendered {name}" if written else f"✅ Rendered {name} (unchanged)")
+            return True
+        except Exception as e:
+            print(f"❌ Error rendering {name}: {e}")
+            return False
+
+    def _load_template(self, name: str):
+        converted = self._converted(name)
+        if converted is None:
+            return None
+        source_file = self.page_source(name)
+        digest = converted[1]
+        return converted[0], str(source_file), lambda: self.template_signature(name) == digest
+
+    def _converted(self, name: str) -> Optional[tuple]:
+        """(Jinja2 source, its sha256) of a page, converting the page only when its content changed"""
+        source_file = self.page_source(name)
+        try:
+            stat_result = source_file.stat()
+        except OSError:
+            return None
+
+        # Same page file as last time in this process
+        cached = self._sources.get(name)
+        if cached and cached[0] == (stat_result.st_mtime_ns, stat_result.st_size):
+            return cached[1]
+
+        with open(source_file, 'r', encoding='utf-8') as f:
+            html = f.read()
+        page_digest = self._page_digest(html)
+        converted = None
+        try:
+            with open(self._cache_file(name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if page_digest in (data.get("page_sha256"), data.get("rendered_sha256")):
+                converted = (data["source"], data["sha256"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if converted is None:
+            source = self._convert(name, html)
+            converted = (source, hashlib.sha256(source.encode('utf-8')).hexdigest())
+            self._store_converted(name, html, converted)
+
+        self._sources[name] = ((stat_result.st_mtime_ns, stat_result.st_size), converted)
+        return converted
+
+    @staticmethod
+    def _page_digest(html: str) -> str:
+        return hashlib.sha256(f"{_CONVERTER_KEY}:{html}".encode('utf-8')).hexdigest()
+
+    def _cache_file(self, name: str) -> Path:
+        return self.cache_dir / (name.replace('/', '--') + ".source.json")
+
+    def _store_converted(self, name: str, html: str, converted: tuple, rendered: bool = False):
+        """Cache a converted template under the page it came from (or a page rendered from it)"""
+        cache_file = self._cache_file(name)
+        data = {"page_sha256": None, "rendered_sha256": None}
+        if rendered:
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                pass
+        data[("rendered_sha256" if rendered else "page_sha256")] = self._page_digest(html)
+        data["source"], data["sha256"] = converted
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data))
+        os.replace(tmp_file, cache_file)
+
+    def _convert(self, name: str, html: str) -> str:
+        """Turn a page into a Jinja2 template (the only HTML parse of a rebuild)"""
+        if name.startswith('category/'):
+            return self._convert_category_index(html)
+
+        soup = BeautifulSoup(html, 'html.parser')
+        _protect(soup)
+        cards = None
+        if name == 'homepage':
+            self._convert_homepage(soup)
+        else:
+            cards = self._convert_blog_index(soup)
+
+        source = str(soup)
+        if cards:
+            source = source.replace(f"<!--{CARDS_PLACEHOLDER}-->", cards, 1)
+        return source
+
+    def _convert_homepage(self, soup: BeautifulSoup):
+        featured_card = soup.find('article', class_='article-card featured')
+        if featured_card:
+            _slot_card(featured_card, 'featured', excerpt=True)
+
+        sidebar_div = soup.find('div', class_='featured-sidebar')
+        if sidebar_div:
+            for i, article in enumerate(sidebar_div.find_all('article', class_='article-card')[:2]):
+                _slot_card(article, f'sidebar[{i}]', excerpt=False)
+
+        articles_grid = soup.find('div', class_='articles-grid')
+        if articles_grid:
+            for i, article in enumerate(articles_grid.find_all('article', class_='grid-article')[:4]):
+                _slot_card(article, f'grid[{i}]', excerpt=True)
+
+        # Category counts, matched on the link the same way update_sidebar_stats does
+        sidebar = soup.find('aside', class_='sidebar')
+        if sidebar:
+            for item in sidebar.find_all('li', class_='sidebar-item'):
+                link = item.find('a')
+                href = link.get('href', '') if link else ''
+                category = next((c for c in self.categories if f"/posts/{c}/" in href), None)
+                meta_div = item.find('div', class_='sidebar-meta')
+                if category and meta_div:
+                    _slot_text(meta_div.find('span'), f"'{category}' in counts",
+                               f"counts['{category}'] ~ ' articles'")
+
+    def _convert_blog_index(self, soup: BeautifulSoup) -> str:
+        articles_grid = soup.find('div', class_='articles-grid', id='articles-grid')
+        if articles_grid:
+            # Sample cards make way for the posts, the "coming soon" card stays
+            for article in articles_grid.find_all('article', class_='grid-article'):
+                if 'coming-soon' not in article.get('class', []):
+                    article.decompose()
+            articles_grid.insert(0, Comment(CARDS_PLACEHOLDER))
+
+        for button in soup.find_all('button', class_='filter-btn'):
+            category = button.get('data-category', '')
+            count_span = button.find('span', class_='count')
+            if not count_span:
+                continue
+            if category == 'all':
+                _slot_text(count_span, None, "'(' ~ total ~ ')'")
+            elif _SLUG.fullmatch(category):
+                _slot_text(count_span, f"'{category}' in counts", f"'(' ~ counts['{category}'] ~ ')'")
+
+        return "{% autoescape false %}{% for post in posts %}" + BLOG_CARD + "{% endfor %}{% endautoescape %}"
+
+    def _convert_category_index(self, html: str) -> str:
+        """
+        Category pages are edited by hand and are also the render output, so their
+        markup is kept byte for byte: only the slot contents are replaced. Counts
+        are always known here, so the slots keep no fallback and converting a
+        rendered page gives back the same template.
+
+        The hand-written cards in the grid stay; a card is generated after them
+        for every other post of the category.
+        """
+        locator = _CategorySlotLocator(html, self.categories)
+        parts, position = [], 0
+        for start, end, kind, category in sorted(locator.slots):
+            if start < position:
+                continue  # nested in a slot already replaced
+            parts.append(_raw(html[position:start]))
+            if kind == 'article_count':
+                parts.append("{{ counts.get('" + category + "', 0) }} articles")
+            elif kind == 'count':
+                parts.append("{{ posts|length }}")
+            else:
+                parts.append(self._category_grid(html, start, end, locator.cards))
+            position = end
+        parts.append(_raw(html[position:]))
+        return ''.join(parts)
+
+    @staticmethod
+    def _category_grid(page: str, start: int, end: int, cards: List[tuple]) -> str:
+        """Grid content: the hand-written cards, then the card loop where the last rendered run was"""
+        cards = [card for card in cards if start <= card[0] and card[1] <= end]
+        written = [card for card in cards if not card[2]]
+        generated = [card for card in cards if card[2]]
+        if generated:
+            # Rendered cards follow the last hand-written card before them
+            cut_start = max([card[1] for card in written if card[1] <= generated[0][0]], default=start)
+            cut_end = generated[-1][1]
+        else:
+            cut_start = cut_end = max([card[1] for card in written], default=start)
+
+        # Posts that already have a hand-written card are not listed twice
+        linked = sorted({
+            html.escape(card[3].rsplit('/', 1)[-1])
+            for card in written if card[3] and '://' not in card[3]
+        })
+        condition = f" if post['filename'] not in {json.dumps(linked)}" if linked else ""
+        loop = ("{% autoescape false %}{% for post in posts" + condition + " %}" + CATEGORY_CARD
+                + "{% endfor %}{% endautoescape %}")
+        return _raw(page[start:cut_start]) + loop + _raw(page[cut_end:end])
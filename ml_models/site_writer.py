@@ -0,0 +1,349 @@
+"""
+Atomic, content-addressed writes for generated site files
+
+A page is only written when the hash of the new output differs from the file on
+disk, so deploy sync and the git commit step only see real changes. Changed
+files are written to a temp file next to the target and renamed into place, so a
+reader never sees a half-written page. The previous version of each file is kept
+as a compact reverse delta in .site_backups/ instead of a full .backup copy.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+BACKUP_DIR_NAME = ".site_backups"
+
+# Changed regions without anchor lines are stored whole past this size (lines x lines)
+MAX_DIFF_CELLS = 1000000
+
+
+def content_hash(data: Union[str, bytes]) -> str:
+    """sha256 of the UTF-8 encoded content"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class _DeltaBuilder:
+    """Collects delta ops, merging neighbouring copies and inserts"""
+
+    def __init__(self, new_lines: List[str], old_lines: List[str]):
+        self.new_lines = new_lines
+        self.old_lines = old_lines
+        self.ops = []
+
+    def copy(self, start: int, end: int):
+        if end <= start:
+            return
+        if self.ops and not isinstance(self.ops[-1], str) and self.ops[-1][1] == start:
+            self.ops[-1][1] = end
+        else:
+            self.ops.append([start, end])
+
+    def insert(self, start: int, end: int):
+        if end <= start:
+            return
+        text = "".join(self.old_lines[start:end])
+        if self.ops and isinstance(self.ops[-1], str):
+            self.ops[-1] += text
+        else:
+            self.ops.append(text)
+
+    def diff(self, n0: int, n1: int, o0: int, o1: int):
+        """Diff new_lines[n0:n1] against old_lines[o0:o1]"""
+        new_lines, old_lines = self.new_lines, self.old_lines
+
+        # Generated pages mostly change in a few places: trim what is equal at both ends
+        start = n0
+        while n0 < n1 and o0 < o1 and new_lines[n0] == old_lines[o0]:
+            n0 += 1
+            o0 += 1
+        self.copy(start, n0)
+        suffix = 0
+        while n1 - suffix > n0 and o1 - suffix > o0 and new_lines[n1 - suffix - 1] == old_lines[o1 - suffix - 1]:
+            suffix += 1
+        n1, o1 = n1 - suffix, o1 - suffix
+
+        anchors = self._anchors(n0, n1, o0, o1) if n0 < n1 and o0 < o1 else []
+        if anchors:
+            for i, j in anchors:
+                self.diff(n0, i, o0, j)
+                self.copy(i, i + 1)
+                n0, o0 = i + 1, j + 1
+            self.diff(n0, n1, o0, o1)
+        elif n1 - n0 == o1 - o0:
+            # Same line count (in-place edits such as the fix_* substitutions)
+            for i in range(n1 - n0):
+                if new_lines[n0 + i] == old_lines[o0 + i]:
+                    self.copy(n0 + i, n0 + i + 1)
+                else:
+                    self.insert(o0 + i, o0 + i + 1)
+        elif (n1 - n0) * (o1 - o0) <= MAX_DIFF_CELLS:
+            matcher = SequenceMatcher(None, new_lines[n0:n1], old_lines[o0:o1], autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == 'equal':
+                    self.copy(n0 + i1, n0 + i2)
+                else:
+                    self.insert(o0 + j1, o0 + j2)
+        else:
+            self.insert(o0, o1)
+
+        self.copy(n1, n1 + suffix)
+
+    def _anchors(self, n0: int, n1: int, o0: int, o1: int) -> List:
+        """
+        Lines that occur exactly once on both sides, in the longest run that keeps
+        their order (patience diff), as (new index, old index) pairs
+        """
+        counts = {}
+        for line in self.new_lines[n0:n1]:
+            counts[line] = counts.get(line, 0) + 1
+        unique_new = {line: n0 + i for i, line in enumerate(self.new_lines[n0:n1]) if counts[line] == 1}
+        old_counts = {}
+        for line in self.old_lines[o0:o1]:
+            if line in unique_new:
+                old_counts[line] = old_counts.get(line, 0) + 1
+        pairs = [(unique_new[line], o0 + j) for j, line in enumerate(self.old_lines[o0:o1])
+                 if old_counts.get(line) == 1]
+        if not pairs:
+            return []
+
+        # Longest increasing run of new indexes, pairs being in old order
+        pairs.sort(key=lambda pair: pair[1])
+        tails, tail_pairs, previous = [], [], [None] * len(pairs)
+        for k, (i, _) in enumerate(pairs):
+            pos = bisect_left(tails, i)
+            previous[k] = tail_pairs[pos - 1] if pos else None
+            if pos == len(tails):
+                tails.append(i)
+                tail_pairs.append(k)
+            else:
+                tails[pos] = i
+                tail_pairs[pos] = k
+        anchors = []
+        k = tail_pairs[-1]
+        while k is not None:
+            anchors.append(pairs[k])
+            k = previous[k]
+        return anchors[::-1]
+
+
+def make_delta(new: str, old: str) -> List:
+    """
+    Delta that rebuilds old from new
+
+    Args:
+        new: Content the delta is applied to
+        old: Content the delta rebuilds
+
+    Returns:
+        List of ops: [start, end] copies lines of new, a string is inserted as is
+    """
+    builder = _DeltaBuilder(new.splitlines(keepends=True), old.splitlines(keepends=True))
+    builder.diff(0, len(builder.new_lines), 0, len(builder.old_lines))
+    return builder.ops
+
+
+def apply_delta(new: str, ops: List) -> str:
+    """Rebuild the older content from new and a delta made by make_delta"""
+    new_lines = new.splitlines(keepends=True)
+    return "".join(op if isinstance(op, str) else "".join(new_lines[op[0]:op[1]]) for op in ops)
+
+
+class SiteWriter:
+    """
+    Writes generated files only when their content changes
+
+    Each changed file gets a backup record in <root>/.site_backups/<path>.json
+    holding up to keep_backups reverse deltas, newest first. Each delta rebuilds a
+    version from the version after it, so restore() can step back several writes.
+    """
+
+    def __init__(self, root: Union[str, Path] = None, backup_dir: Union[str, Path] = None,
+                 keep_backups: int = 5):
+        self.root = Path(root or os.getcwd()).resolve()
+        self.backup_dir = Path(backup_dir) if backup_dir else self.root / BACKUP_DIR_NAME
+        self.keep_backups = keep_backups
+        self.stats = {'written': 0, 'unchanged': 0, 'backups': 0}
+
+    def write(self, path: Union[str, Path], content: str, backup: bool = True) -> bool:
+        """
+        Write content to path unless the file already holds it
+
+        Args:
+            path: File to write
+            content: New file content
+            backup: Keep a delta of the previous version
+
+        Returns:
+            True if the file was written, False if it was already up to date
+        """
+        path = Path(path)
+        data = content.encode('utf-8')
+        old_data = None
+        try:
+            # A size mismatch already proves a change without reading the file
+            if path.stat().st_size == len(data) or backup:
+                old_data = path.read_bytes()
+        except FileNotFoundError:
+            pass
+
+        if old_data is not None and content_hash(old_data) == content_hash(data):
+            self.stats['unchanged'] += 1
+            return False
+
+        if backup and old_data is not None:
+            self._store_backup(path, content, old_data)
+        self._replace(path, data)
+        self.stats['written'] += 1
+        return True
+
+    def _replace(self, path: Path, data: bytes):
+        """Write data to a temp file next to path and rename it into place"""
+        tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            if path.exists():
+                shutil.copymode(path, tmp_file)
+            os.replace(tmp_file, path)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+    def backup_file(self, path: Union[str, Path]) -> Optional[Path]:
+        """Backup record of a file (None if it lies outside the site root)"""
+        try:
+            relative = Path(path).resolve().relative_to(self.root)
+        except ValueError:
+            return None
+        return self.backup_dir / relative.parent / f"{relative.name}.json"
+
+    def backups(self, path: Union[str, Path]) -> List[Dict]:
+        """Stored deltas of a file, newest first"""
+        backup_file = self.backup_file(path)
+        if backup_file is None or not backup_file.exists():
+            return []
+        try:
+            with open(backup_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("versions", [])
+        except Exception as e:
+            print(f"⚠️ Could not read backups of {path}: {e}")
+            return []
+
+    def _store_backup(self, path: Path, content: str, old_data: bytes):
+        backup_file = self.backup_file(path)
+        if backup_file is None:
+            return
+        try:
+            old = old_data.decode('utf-8')
+        except UnicodeDecodeError:
+            print(f"⚠️ Not backing up non-UTF-8 file: {path}")
+            return
+
+        old_hash = content_hash(old_data)
+        versions = self.backups(path)
+        if versions and versions[0].get("base_sha256") != old_hash:
+            # The file was edited outside the writer: older deltas no longer apply
+            versions = []
+        versions.insert(0, {
+            "base_sha256": content_hash(content),
+            "sha256": old_hash,
+            "ops": make_delta(content, old)
+        })
+
+        try:
+            backup_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = backup_file.with_suffix(".json.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"versions": versions[:self.keep_backups]}, ensure_ascii=False))
+            os.replace(tmp_file, backup_file)
+            self.stats['backups'] += 1
+        except Exception as e:
+            print(f"⚠️ Could not save backup of {path}: {e}")
+
+    def restore(self, path: Union[str, Path], steps: int = 1) -> bool:
+        """
+        Put back the version of a file from `steps` writes ago
+
+        The restored file is written through write(), so the current version
+        becomes the newest backup and the restore can itself be undone.
+
+        Returns:
+            True if the file was restored
+        """
+        path = Path(path)
+        versions = self.backups(path)
+        if steps < 1 or steps > len(versions):
+            print(f"❌ {path} has {len(versions)} backup(s), cannot go back {steps}")
+            return False
+
+        content = path.read_text(encoding='utf-8')
+        for version in versions[:steps]:
+            if content_hash(content) != version["base_sha256"]:
+                print(f"❌ {path} was changed outside the site writer; its backups no longer apply")
+                return False
+            content = apply_delta(content, version["ops"])
+        if content_hash(content) != versions[steps - 1]["sha256"]:
+            print(f"❌ Backup of {path} is corrupt")
+            return False
+
+        self.write(path, content)
+        return True
+
+    def print_summary(self):
+        print(f"💾 Files written: {self.stats['written']}, unchanged: {self.stats['unchanged']}, "
+              f"backups: {self.stats['backups']}")
+
+
+def write_if_changed(path: Union[str, Path], content: str, root: Union[str, Path] = None,
+                     backup: bool = True) -> bool:
+    """
+    One-off SiteWriter.write for scripts
+
+    Args:
+        path: File to write
+        content: New file content
+        root: Site root the backups are kept under (default: current directory)
+        backup: Keep a delta of the previous version
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    return SiteWriter(root).write(path, content, backup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List or restore backups kept by the site writer')
+    parser.add_argument('command', choices=['list', 'restore'])
+    parser.add_argument('path', help='Site file, e.g. index.html')
+    parser.add_argument('--steps', type=int, default=1, help='Writes to go back (restore)')
+    parser.add_argument('--root', default=None, help='Site root (default: current directory)')
+    args = parser.parse_args()
+
+    writer = SiteWriter(args.root)
+    if args.command == 'list':
+        versions = writer.backups(args.path)
+        if not versions:
+            print(f"No backups of {args.path}")
+        for steps, version in enumerate(versions, 1):
+            size = len(json.dumps(version["ops"]))
+            print(f"  --steps {steps}: sha256 {version['sha256'][:12]} ({size:,} byte delta)")
+        return 0
+
+    if writer.restore(args.path, args.steps):
+        print(f"✅ Restored {args.path} from {args.steps} write(s) ago")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
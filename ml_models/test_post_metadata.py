@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test: the streaming post_metadata extractor reads the same fields as BeautifulSoup
+(documents with CDATA sections are not covered)
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from post_metadata import FIELDS, extract_post_fields
+from benchmark_metadata import BS4_AVAILABLE, EDGE_CASES, FIELD_SETS, soup_fields
+
+POSTS_DIR = Path(__file__).parent.parent / "posts"
+
+# Markup the streaming parser tracks by hand: void and unclosed tags, raw text
+# elements, entities and whitespace-only strings
+DOCUMENTS = EDGE_CASES + [
+    '<title>A &amp; B</title><h1 class="post-title">Solar <em>now</em></h1><br/><p/>'
+    '<div class="post-meta">By <b>Staff</b></div><img src="a.png" alt="Panels"><img src="b.png">',
+    '<script>var p = "<p>not a paragraph</p>";</script><template><p>hidden</p></template>'
+    '<textarea>  kept  <p>as text</textarea><pre>\n  code\n</pre><p>' + 'Visible words. ' * 5,
+    '<div class="post-content"><p>  </p><p>\n' + 'Spaced   out\n\ttext. ' * 6 + '</p></div>',
+    '<h1>One</h1><h1 class="post-title">Two</h1><p>First</p></span></b><div>unclosed <p>tail',
+]
+
+
+def test_matches_soup():
+    """Every field set the integrators request, over the edge cases and sample posts"""
+
+    if not BS4_AVAILABLE:
+        raise unittest.SkipTest("BeautifulSoup is not installed")
+
+    print("🧪 Testing streaming extraction against BeautifulSoup")
+    posts = sorted(POSTS_DIR.glob("*/*.html"))[:20]
+    documents = DOCUMENTS + [post.read_text(encoding='utf-8') for post in posts]
+    for n, content in enumerate(documents, 1):
+        for fields in list(FIELD_SETS.values()) + [FIELDS]:
+            assert extract_post_fields(content, fields) == soup_fields(content, fields), f"document {n}"
+    print(f"   ✅ {len(DOCUMENTS)} edge cases and {len(posts)} posts match")
+
+
+if __name__ == "__main__":
+    test_matches_soup()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for site_writer: reverse deltas rebuild the old content, and restore()
+steps back through a file's writes
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from site_writer import SiteWriter, apply_delta, make_delta
+
+PAGE = ''.join(f'<p>Paragraph {n}</p>\n' for n in range(40))
+
+# (new, old) pairs: edits, moves, repeated lines, missing final newlines, empty files
+DELTA_CASES = [
+    (PAGE, PAGE),
+    (PAGE.replace('Paragraph 7<', 'Edited paragraph<'), PAGE),
+    (PAGE, PAGE.replace('Paragraph 7<', 'Edited paragraph<')),
+    ('<h1>New</h1>\n' + PAGE, PAGE + '<footer>Old</footer>'),
+    (''.join(reversed(PAGE.splitlines(keepends=True))), PAGE),
+    ('<br>\n' * 10 + PAGE, PAGE + '<br>\n' * 3),
+    (PAGE.rstrip('\n'), PAGE),
+    ('', PAGE),
+    (PAGE, ''),
+]
+
+
+def test_delta_roundtrip():
+    """apply_delta(new, make_delta(new, old)) gives back old"""
+
+    print("🧪 Testing reverse delta roundtrips")
+    for n, (new, old) in enumerate(DELTA_CASES, 1):
+        assert apply_delta(new, make_delta(new, old)) == old, f"case {n}"
+    print(f"   ✅ {len(DELTA_CASES)} delta cases rebuild the old content")
+
+
+def test_restore():
+    """restore() steps back several writes and can itself be undone"""
+
+    print("🧪 Testing SiteWriter.restore")
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SiteWriter(tmp)
+        page = Path(tmp) / "blog" / "index.html"
+        page.parent.mkdir()
+        versions = [PAGE, PAGE.replace('Paragraph 3<', 'Third<'), '<h1>Redesign</h1>\n' + PAGE[:200]]
+
+        for content in versions:
+            assert writer.write(page, content)
+        assert not writer.write(page, versions[-1])
+        print(f"   📊 {writer.stats}")
+
+        assert writer.restore(page, steps=2)
+        assert page.read_text(encoding='utf-8') == versions[0]
+        # The restore is a write too, so one step back undoes it
+        assert writer.restore(page)
+        assert page.read_text(encoding='utf-8') == versions[-1]
+
+        # Backups do not apply once the file is edited by hand
+        page.write_text('hand edit', encoding='utf-8')
+        assert not writer.restore(page)
+    print("   ✅ Restored the version from two writes ago and undid the restore")
+
+
+if __name__ == "__main__":
+    test_delta_roundtrip()
+    test_restore()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Inverted Word Index for Near-Duplicate Title Detection
+Finds existing titles whose word-set Jaccard similarity exceeds a threshold
+without comparing the candidate against every tracked title
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class TitleIndex:
+    """
+    Set of normalized titles backed by a word -> titles inverted index
+
+    Behaves like the plain set previously used for ``used_titles`` (add, update,
+    discard, clear, membership, iteration, len) and adds ``find_similar``.
+    """
+
+    def __init__(self, titles: Iterable[str] = ()):
+        self._words: Dict[str, frozenset] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self.update(titles)
+
+    def add(self, title: str):
+        if title in self._words:
+            return
+        words = frozenset(title.split())
+        self._words[title] = words
+        self._order[title] = self._next_order
+        self._next_order += 1
+        for word in words:
+            self._postings.setdefault(word, set()).add(title)
+
+    def update(self, titles: Iterable[str]):
+        for title in titles:
+            self.add(title)
+
+    def discard(self, title: str):
+        words = self._words.pop(title, None)
+        if words is None:
+            return
+        del self._order[title]
+        for word in words:
+            posting = self._postings[word]
+            posting.discard(title)
+            if not posting:
+                del self._postings[word]
+
+    def clear(self):
+        self._words.clear()
+        self._postings.clear()
+        self._order.clear()
+
+    def __contains__(self, title) -> bool:
+        return title in self._words
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def find_similar(self, title: str, threshold: float = 0.8) -> List[Tuple[str, float]]:
+        """
+        Return tracked titles whose Jaccard similarity with ``title`` is above ``threshold``
+
+        A match must share more than threshold * |words| words with the query, so
+        at least one of any (|words| - min_overlap + 1) query words must appear in
+        it. Only the postings of the rarest such words are scanned for candidates,
+        which are then verified exactly.
+
+        Args:
+            title: Lower-cased candidate title
+            threshold: Minimum (exclusive) Jaccard similarity
+
+        Returns:
+            List of (existing_title, similarity) in insertion order
+        """
+        title_words = set(title.split())
+        if not title_words:
+            return []
+
+        min_overlap = max(1, int(threshold * len(title_words)))
+        probe_count = len(title_words) - min_overlap + 1
+        probe_words = sorted(title_words, key=lambda word: len(self._postings.get(word, ())))[:probe_count]
+
+        candidates = set()
+        for word in probe_words:
+            candidates.update(self._postings.get(word, ()))
+
+        matches = []
+        for existing_title in candidates:
+            existing_words = self._words[existing_title]
+            similarity = len(title_words.intersection(existing_words)) / len(title_words.union(existing_words))
+            if similarity > threshold:
+                matches.append((existing_title, similarity))
+
+        matches.sort(key=lambda match: self._order[match[0]])
+        return matches
@@ -2,8 +2,14 @@
 
 import os
 import re
+import sys
+import argparse
 from pathlib import Path
 
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from parallel_scan import scan_files
+
 def count_links_and_images(file_path):
     """Count links and images using the same method as validation"""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -17,8 +23,13 @@ def count_links_and_images(file_path):
     
     return image_count, external_link_count
 
-def verify_all_posts():
-    """Verify all posts in the posts directory and its category subfolders"""
+def verify_all_posts(workers: int = 1):
+    """
+    Verify all posts in the posts directory and its category subfolders
+
+    Args:
+        workers: Processes to scan with (1 = serial, 0 = one per core)
+    """
     posts_dir = Path("../posts")
     
     print("=== ACCURATE POST VERIFICATION ===")
@@ -27,29 +38,29 @@ def verify_all_posts():
     total_posts = 0
     
     # Check both root directory and category subdirectories
+    groups = []
     for category_folder in ["solar", "wind", "battery", "grid-tech", "markets", "policy", "general"]:
         category_path = posts_dir / category_folder
         if category_path.exists():
-            html_files = list(category_path.glob("*.html"))
+            html_files = sorted(category_path.glob("*.html"))
             if html_files:
-                print(f"\n📁 {category_folder.upper()} Category:")
-                for html_file in html_files:
-                    images, links = count_links_and_images(html_file)
-                    
-                    is_valid = images >= 1 and 3 <= links <= 5
-                    if not is_valid:
-                        all_valid = False
-                    
-                    status = "✅ VALID" if is_valid else "❌ INVALID"
-                    print(f"  {status} - {html_file.name} - Images: {images}, Links: {links}")
-                    total_posts += 1
+                groups.append((f"{category_folder.upper()} Category", html_files))
     
     # Also check root directory for any remaining files
-    root_html_files = list(posts_dir.glob("*.html"))
+    root_html_files = sorted(posts_dir.glob("*.html"))
     if root_html_files:
-        print(f"\n📁 ROOT Directory (to be migrated):")
-        for html_file in root_html_files:
-            images, links = count_links_and_images(html_file)
+        groups.append(("ROOT Directory (to be migrated)", root_html_files))
+    
+    scan = scan_files([html_file for _, html_files in groups for html_file in html_files],
+                      count_links_and_images, workers=workers)
+    results = iter(scan)
+    for heading, html_files in groups:
+        print(f"\n📁 {heading}:")
+        for html_file in html_files:
+            result = next(results)
+            if result.error:
+                raise RuntimeError(f"{html_file}: {result.error}")
+            images, links = result.value
             
             is_valid = images >= 1 and 3 <= links <= 5
             if not is_valid:
@@ -61,7 +72,11 @@ def verify_all_posts():
     
     print(f"\n📊 SUMMARY: {total_posts} total posts")
     print(f"{'✅ ALL POSTS VALID' if all_valid else '❌ SOME POSTS INVALID'}")
+    if workers != 1:
+        scan.print_timing()
     return all_valid
 
 if __name__ == "__main__":
-    verify_all_posts()
+    parser = argparse.ArgumentParser(description='Verify image and link counts of every post')
+    parser.add_argument('--workers', type=int, default=1, help='Processes to scan with (0 = one per core)')
+    verify_all_posts(parser.parse_args().workers)
@@ -6,19 +6,27 @@ Automatically integrates ML-generated blog posts into the website structure
 
 import os
 import re
+import sys
 import json
 import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
-from bs4 import BeautifulSoup
 import html
 
+# Add current directory to path
+sys.path.append(str(Path(__file__).parent))
+from post_metadata import extract_post_fields
+from parallel_scan import scan_files
+from site_writer import SiteWriter
+
 class WebsiteIntegrator:
-    def __init__(self, posts_dir: str, website_root: str = None):
+    def __init__(self, posts_dir: str, website_root: str = None, workers: int = 1):
         self.posts_dir = Path(posts_dir)
         self.website_root = Path(website_root) if website_root else self.posts_dir.parent
         self.index_file = self.website_root / "index.html"
+        self.workers = workers  # processes for get_all_posts (1 = serial, 0 = one per core)
+        self.writer = SiteWriter(self.website_root)  # skips unchanged pages, keeps delta backups
         
         # Category mapping for navigation
         self.category_mapping = {
@@ -41,20 +49,19 @@ class WebsiteIntegrator:
             with open(post_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            soup = BeautifulSoup(content, 'html.parser')
+            # One streaming pass (the word count needs the whole document, but no DOM)
+            fields = extract_post_fields(content, ('h1', 'title', 'first_paragraph', 'image', 'word_count'))
             
             # Extract title
-            title_tag = soup.find('h1') or soup.find('title')
-            title = title_tag.get_text().strip() if title_tag else post_path.stem.replace('-', ' ').title()
+            title_text = fields['h1'] if fields['h1'] is not None else fields['title']
+            title = title_text.strip() if title_text is not None else post_path.stem.replace('-', ' ').title()
             
             # Extract excerpt from first paragraph
-            first_p = soup.find('p')
-            excerpt = first_p.get_text()[:200] + "..." if first_p else ""
+            first_p = fields['first_paragraph']
+            excerpt = first_p[:200] + "..." if first_p is not None else ""
             
             # Extract image
-            img_tag = soup.find('img')
-            image_url = img_tag.get('src', '') if img_tag else ''
-            image_alt = img_tag.get('alt', '') if img_tag else ''
+            image_url, image_alt = fields['image'] or ('', '')
             
             # Get file stats
             stats = post_path.stat()
@@ -76,8 +83,8 @@ class WebsiteIntegrator:
                 'filename': post_path.name,
                 'created_date': created_date,
                 'modified_date': modified_date,
-                'word_count': len(soup.get_text().split()),
-                'reading_time': max(1, len(soup.get_text().split()) // 200)  # Assume 200 WPM
+                'word_count': fields['word_count'],
+                'reading_time': max(1, fields['word_count'] // 200)  # Assume 200 WPM
             }
             
             return metadata
@@ -88,13 +95,12 @@ class WebsiteIntegrator:
     
     def get_all_posts(self) -> List[Dict]:
         """Get metadata for all blog posts"""
-        posts = []
-        
         # Search all HTML files in posts directory and subdirectories
-        for post_file in self.posts_dir.rglob("*.html"):
-            metadata = self.extract_post_metadata(post_file)
-            if metadata:
-                posts.append(metadata)
+        post_files = sorted(self.posts_dir.rglob("*.html"))
+        scan = scan_files(post_files, self.extract_post_metadata, workers=self.workers)
+        posts = [metadata for metadata in scan.values() if metadata]
+        if self.workers != 1:
+            scan.print_timing()
         
         # Sort by created date (newest first)
         posts.sort(key=lambda x: x['created_date'], reverse=True)
@@ -181,13 +187,6 @@ class WebsiteIntegrator:
             with open(self.index_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Backup the original
-            backup_file = self.index_file.with_suffix('.html.backup')
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"💾 Created backup: {backup_file}")
-            
             # Generate new content sections
             if posts:
                 hero_post = posts[0]  # Most recent post as hero
@@ -217,11 +216,11 @@ class WebsiteIntegrator:
                 
                 content = self.replace_content_section(content, "recent-posts", recent_posts_html)
             
-            # Write updated content
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"✅ Updated index.html with {len(posts)} posts")
+            # Write updated content (the previous version is kept as a delta backup)
+            if self.writer.write(self.index_file, content):
+                print(f"✅ Updated index.html with {len(posts)} posts")
+            else:
+                print(f"✅ index.html already up to date with {len(posts)} posts")
             return True
             
         except Exception as e:
@@ -297,10 +296,10 @@ class WebsiteIntegrator:
             blog_index_file = self.website_root / "blog" / "index.html"
             blog_index_file.parent.mkdir(exist_ok=True)
             
-            with open(blog_index_file, 'w', encoding='utf-8') as f:
-                f.write(blog_index_content)
-            
-            print(f"✅ Created blog index page: {blog_index_file}")
+            if self.writer.write(blog_index_file, blog_index_content):
+                print(f"✅ Created blog index page: {blog_index_file}")
+            else:
+                print(f"✅ Blog index page already up to date: {blog_index_file}")
             return True
             
         except Exception as e:
@@ -460,6 +459,9 @@ class WebsiteIntegrator:
                     logs = json.load(f)
             except:
                 logs = []
+        if not isinstance(logs, list):
+            # FullWebsiteIntegrator saves its last run's summary to the same file
+            logs = [logs]
         
         # Add new entry
         logs.append(log_entry)
@@ -8,8 +8,14 @@ and tests that the target files exist to prevent 404 errors.
 
 import os
 import re
+import sys
+import argparse
 from pathlib import Path
 
+# Add ml_models to path
+sys.path.append(str(Path(__file__).parent / "ml_models"))
+from parallel_scan import scan_files
+
 def find_links_in_html(content):
     """
     Extract all href links from HTML content using regex
@@ -25,12 +31,70 @@ def find_links_in_html(content):
     matches = re.findall(pattern, content, re.IGNORECASE)
     return matches
 
-def verify_navigation_links(base_dir):
+def check_html_file(html_file):
+    """
+    Check the links of one HTML file
+    
+    Args:
+        html_file: Path of the HTML file
+    
+    Returns:
+        Dict with the report lines and link counters for the file
+    """
+    report = {'lines': [], 'total_links': 0, 'broken_links': 0, 'fixed_links': 0, 'absolute_paths': 0}
+    lines = report['lines']
+    
+    with open(html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Find all links
+    links = find_links_in_html(content)
+    file_dir = os.path.dirname(html_file)
+    
+    for href in links:
+        report['total_links'] += 1
+        
+        # Skip external links, email links, and anchors
+        if (href.startswith('http') or 
+            href.startswith('mailto:') or 
+            href.startswith('#') or
+            href.startswith('tel:')):
+            continue
+        
+        # Check if it's an absolute path (which we want to avoid)
+        if href.startswith('/'):
+            lines.append(f"  ⚠️  Still has absolute path: {href}")
+            report['absolute_paths'] += 1
+            continue
+        
+        # For relative paths, check if target exists
+        if not href.startswith('http'):
+            # Resolve relative path
+            target_path = os.path.normpath(os.path.join(file_dir, href))
+            
+            if os.path.exists(target_path):
+                report['fixed_links'] += 1
+                lines.append(f"  ✓ Valid link: {href}")
+            else:
+                lines.append(f"  ✗ Broken link: {href} -> {target_path}")
+                report['broken_links'] += 1
+                
+                # Suggest fix if it's a common pattern
+                if '/index.html' not in href and not href.endswith('.html'):
+                    suggested = href.rstrip('/') + '/index.html'
+                    suggested_path = os.path.normpath(os.path.join(file_dir, suggested))
+                    if os.path.exists(suggested_path):
+                        lines.append(f"    💡 Suggestion: {suggested}")
+    
+    return report
+
+def verify_navigation_links(base_dir, workers=1):
     """
     Verify all navigation links in HTML files
     
     Args:
         base_dir: Base directory of the website
+        workers: Processes to check files with (1 = serial, 0 = one per core)
     """
     print(f"Verifying navigation links in: {base_dir}")
     print("=" * 60)
@@ -54,55 +118,22 @@ def verify_navigation_links(base_dir):
     fixed_links = 0
     absolute_paths = 0
     
-    for html_file in sorted(html_files):
-        print(f"\nChecking: {os.path.relpath(html_file, base_dir)}")
-        
-        try:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find all links
-            links = find_links_in_html(content)
-            file_dir = os.path.dirname(html_file)
-            
-            for href in links:
-                total_links += 1
-                
-                # Skip external links, email links, and anchors
-                if (href.startswith('http') or 
-                    href.startswith('mailto:') or 
-                    href.startswith('#') or
-                    href.startswith('tel:')):
-                    continue
-                
-                # Check if it's an absolute path (which we want to avoid)
-                if href.startswith('/'):
-                    print(f"  ⚠️  Still has absolute path: {href}")
-                    absolute_paths += 1
-                    continue
-                
-                # For relative paths, check if target exists
-                if not href.startswith('http'):
-                    # Resolve relative path
-                    target_path = os.path.normpath(os.path.join(file_dir, href))
-                    
-                    if os.path.exists(target_path):
-                        fixed_links += 1
-                        print(f"  ✓ Valid link: {href}")
-                    else:
-                        print(f"  ✗ Broken link: {href} -> {target_path}")
-                        broken_links += 1
-                        
-                        # Suggest fix if it's a common pattern
-                        if '/index.html' not in href and not href.endswith('.html'):
-                            suggested = href.rstrip('/') + '/index.html'
-                            suggested_path = os.path.normpath(os.path.join(file_dir, suggested))
-                            if os.path.exists(suggested_path):
-                                print(f"    💡 Suggestion: {suggested}")
-        
-        except Exception as e:
-            print(f"  ✗ Error processing file: {e}")
+    # Files are checked in a process pool when workers != 1; reports print in file order
+    scan = scan_files(sorted(html_files), check_html_file, workers=workers)
+    for result in scan:
+        print(f"\nChecking: {os.path.relpath(result.item, base_dir)}")
+        if result.error:
+            print(f"  ✗ Error processing file: {result.error}")
             broken_links += 1
+            continue
+        
+        report = result.value
+        for line in report['lines']:
+            print(line)
+        total_links += report['total_links']
+        broken_links += report['broken_links']
+        fixed_links += report['fixed_links']
+        absolute_paths += report['absolute_paths']
     
     print("\n" + "=" * 60)
     print("VERIFICATION SUMMARY")
@@ -125,11 +156,18 @@ def verify_navigation_links(base_dir):
         print("These should be converted to relative paths.")
     else:
         print(f"\n⚠️  Found {broken_links} broken links that need attention.")
+    
+    if workers != 1:
+        scan.print_timing()
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Verify navigation links in all HTML files')
+    parser.add_argument('--workers', type=int, default=1, help='Processes to check files with (0 = one per core)')
+    args = parser.parse_args()
+    
     base_dir = os.getcwd()
-    verify_navigation_links(base_dir)
+    verify_navigation_links(base_dir, args.workers)
 
 if __name__ == "__main__":
     main()